@@ -0,0 +1,51 @@
+"""
+Benchmark: CPU cost of response compression against bytes saved.
+
+Encodes list_orders pages of typical sizes with the shared encoder and
+compresses them with gzip at several levels (and Brotli when installed).
+
+    python benchmarks/bench_compression.py
+"""
+import os
+import sys
+import timeit
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/layers/common/python'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from orders_common import responses
+from bench_responses import make_orders
+
+PAGE_SIZES = [10, 50, 100, 1000]
+GZIP_LEVELS = [1, 5, 6, 9]
+
+
+def gzip_compress(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def measure(func, data):
+    runs = max(5, int(2000000 / max(len(data), 1)))
+    seconds = min(timeit.repeat(lambda: func(data), number=runs, repeat=3)) / runs
+    return len(func(data)), seconds
+
+
+def main():
+    codecs = [(f'gzip-{level}', lambda data, level=level: gzip_compress(data, level)) for level in GZIP_LEVELS]
+    if responses.brotli is not None:
+        codecs += [(f'br-{quality}', lambda data, quality=quality: responses.brotli.compress(data, quality=quality))
+                   for quality in (1, 4, 6)]
+
+    print(f"{'orders':>6} {'codec':>8} {'raw KB':>8} {'out KB':>8} {'ratio':>6} {'ms':>8} {'MB/s':>8}")
+    for page_size in PAGE_SIZES:
+        data = responses.dumps({'orders': make_orders(page_size), 'count': page_size}).encode('utf-8')
+        for name, func in codecs:
+            size, seconds = measure(func, data)
+            print(f"{page_size:>6} {name:>8} {len(data) / 1024:8.1f} {size / 1024:8.1f} "
+                  f"{len(data) / size:6.1f} {seconds * 1000:8.3f} {len(data) / seconds / 1e6:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
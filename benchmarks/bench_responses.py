@@ -0,0 +1,68 @@
+"""
+Microbenchmark: serializing a 1,000-order list response.
+
+Compares the previous per-call json.dumps(..., default=str) with the shared
+orders_common.responses encoder (orjson when installed, stdlib otherwise).
+
+    python benchmarks/bench_responses.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/layers/common/python'))
+
+from orders_common import responses
+
+
+FIRST_NAMES = ['Juan', 'María', 'Luis', 'Ana', 'Sofía', 'Carlos', 'Elena', 'Pedro', 'Lucía', 'Diego']
+LAST_NAMES = ['Pérez', 'García', 'López', 'Martínez', 'Rodríguez', 'Sánchez', 'Romero', 'Torres']
+PRODUCTS = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Smartphone', 'Headphones', 'Webcam', 'Dock',
+            'USB-C Cable', 'Tablet', 'Printer', 'Router']
+STATUSES = ['pending', 'processing', 'completed', 'cancelled']
+
+
+def make_orders(count=1000, seed=42):
+    """Deterministic, realistically varied order items as boto3 returns them"""
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = f'2025-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:' \
+                  f'{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d}000+00:00'
+        orders.append({
+            'orderId': 'ORD-' + ''.join(rng.choice('0123456789ABCDEFGHJKMNPQRSTVWXYZ') for _ in range(26)),
+            'createdAt': created,
+            'createdDay': created[:10],
+            'customerName': f'{first} {last}',
+            'customerEmail': f'{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com',
+            'items': rng.sample(PRODUCTS, rng.randint(1, 4)),
+            'amount': Decimal(f'{rng.uniform(5, 2500):.2f}'),
+            'status': rng.choice(STATUSES),
+            'updatedAt': created
+        })
+    return orders
+
+
+def main():
+    body = {'orders': make_orders(), 'count': 1000, 'nextToken': None}
+    candidates = {
+        'json.dumps(default=str)': lambda: json.dumps(body, default=str),
+        'stdlib shared encoder': lambda: responses._encoder.encode(body),
+        f"responses.dumps ({'orjson' if responses.orjson else 'stdlib'})": lambda: responses.dumps(body),
+    }
+
+    baseline = None
+    for name, func in candidates.items():
+        runs = 50
+        seconds = min(timeit.repeat(func, number=runs, repeat=5)) / runs
+        baseline = baseline or seconds
+        print(f"{name:32s} {seconds * 1000:8.3f} ms/response  {1 / seconds:8.0f} responses/s  "
+              f"x{baseline / seconds:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,534 @@
+"""
+Replay API traffic against the whole stack, in process.
+
+Requests come from a synthetic mix of routes or from a recording (NDJSON of
+API Gateway proxy events, one per line; only httpMethod, path,
+queryStringParameters, headers and body are used). They are issued at a
+target rate by a pool of worker threads, routed through
+local_stack.LocalApi like terraform/api_gateway.tf (authorizer first), and
+served by the real lambda_handler entry points on moto stand-ins. Changes
+on the orders table's stream are delivered in batches to sns_notification
+and order_stats, like the event source mappings in terraform/sns_sqs.tf and
+lambda.tf.
+
+    python benchmarks/load_test.py --rate 50 --duration 30 --concurrency 8
+    python benchmarks/load_test.py --mix get=70,list=20,post=10 --rate 0 --requests 2000
+    python benchmarks/load_test.py --events recorded.ndjson --rate 20
+    python benchmarks/load_test.py --requests 500 --record synthetic.ndjson
+
+Seeded order IDs depend only on --seed, --orders and the day, so a
+recording made with --record replays against the same orders when run with
+the same options (IDs of orders created during the recording do not exist
+on replay and are answered 404).
+
+The schedule is open-loop: request i is due at start + i / rate whether or
+not earlier ones have finished, and latency is measured from that due time,
+so a backlog shows up as latency instead of silently lowering the rate.
+--rate 0 issues requests as fast as the workers take them.
+
+Capacity units are estimated from the items each DynamoDB call reads or
+writes, with DynamoDB's sizing rules (moto reports a flat 0.5 or 1 per
+call): reads in 4 KB units (halved when eventually consistent, summed over
+a page for Query/Scan), writes in 1 KB units plus one write per global
+secondary index the item appears in. Units are attributed to the route of
+the request that issued the call, including calls made from the handlers'
+own worker threads.
+
+All handlers share one interpreter (and its GIL), so results show relative
+route costs and contention, not how Lambda would scale out.
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import boto3
+
+from local_stack import FUNCTIONS, STATUSES, LocalApi, LocalStack, load_function, make_order_data
+
+# Synthetic operation -> share of requests
+DEFAULT_MIX = {'get': 40, 'list': 25, 'post': 15, 'put': 10, 'delete': 5, 'pdf': 5}
+
+# function -> eventName filter (None: every record), as the event source mappings
+STREAM_MAPPINGS = {'sns_notification': None, 'order_stats': None}
+STREAM_BATCH_SIZE = 100
+
+# Upper bounds in ms of the histogram buckets
+HISTOGRAM_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf]
+
+READ_UNIT_BYTES = 4096
+WRITE_UNIT_BYTES = 1024
+
+# Route of the request being served; copied into the handlers' worker threads
+_current_route = contextvars.ContextVar('route', default=None)
+
+
+def parse_mix(value):
+    """'get=40,post=10' -> {'get': 40, 'post': 10}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name.strip()!r}; use {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class SyntheticTraffic:
+    """
+    Requests drawn from a weighted mix of operations over the live order IDs:
+    deletes remove IDs from the pool and creates add them, so reads keep
+    targeting orders that exist.
+    """
+
+    def __init__(self, order_ids, mix, seed=7, max_items=500):
+        self.order_ids = list(order_ids)
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.rng = random.Random(seed)
+        self.max_items = max_items
+        self.lock = threading.Lock()
+
+    def next_request(self):
+        """(method, path, query, body)"""
+        with self.lock:
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            if operation == 'list':
+                query = {'limit': '50'}
+                if self.rng.random() < 0.5:
+                    query['status'] = self.rng.choice(STATUSES)
+                return 'GET', '/orders', query, None
+            if operation == 'post':
+                return 'POST', '/orders', None, make_order_data(self.rng, self.max_items)
+            if not self.order_ids:
+                return 'GET', '/orders', {'limit': '50'}, None
+            if operation == 'delete':
+                index = self.rng.randrange(len(self.order_ids))
+                self.order_ids[index], self.order_ids[-1] = self.order_ids[-1], self.order_ids[index]
+                return 'DELETE', f"/orders/{self.order_ids.pop()}", None, None
+            order_id = self.rng.choice(self.order_ids)
+            if operation == 'put':
+                return 'PUT', f"/orders/{order_id}", None, {'status': self.rng.choice(STATUSES)}
+            if operation == 'pdf':
+                return 'GET', f"/orders/{order_id}/pdf", None, None
+            return 'GET', f"/orders/{order_id}", None, None
+
+    def observe(self, method, response):
+        """Track orders created by the replay"""
+        if method == 'POST' and response.get('statusCode') == 201:
+            with self.lock:
+                self.order_ids.append(json.loads(response['body'])['orderId'])
+
+
+class RecordedTraffic:
+    """Requests read from an NDJSON file of proxy events, looped in order"""
+
+    def __init__(self, path):
+        self.requests = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                body = event.get('body')
+                if isinstance(body, str) and body:
+                    body = json.loads(body)
+                self.requests.append((
+                    event['httpMethod'], event['path'], event.get('queryStringParameters'), body,
+                    event.get('headers')
+                ))
+        if not self.requests:
+            raise ValueError(f"{path} has no events")
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def next_request(self):
+        with self.lock:
+            request = self.requests[self.position % len(self.requests)]
+            self.position += 1
+        return request
+
+    def observe(self, method, response):
+        pass
+
+
+def attribute_size(value):
+    """Approximate stored size in bytes of a typed DynamoDB attribute value"""
+    (kind, data), = value.items()
+    if kind == 'S':
+        return len(data.encode('utf-8'))
+    if kind == 'N':
+        digits = data.lstrip('-').replace('.', '').strip('0')
+        return (len(digits) + 1) // 2 + 1
+    if kind == 'B':
+        return len(data) if isinstance(data, bytes) else len(data) * 3 // 4
+    if kind in ('BOOL', 'NULL'):
+        return 1
+    if kind == 'SS':
+        return sum(len(member.encode('utf-8')) for member in data)
+    if kind == 'NS':
+        return sum(attribute_size({'N': member}) for member in data)
+    if kind == 'L':
+        return 3 + sum(1 + attribute_size(member) for member in data)
+    if kind == 'M':
+        return 3 + sum(1 + len(name.encode('utf-8')) + attribute_size(member) for name, member in data.items())
+    return 0
+
+
+def item_size(item):
+    return sum(len(name.encode('utf-8')) + attribute_size(value) for name, value in (item or {}).items())
+
+
+def read_units(size, consistent=False):
+    units = max(1, math.ceil(size / READ_UNIT_BYTES))
+    return float(units) if consistent else units / 2
+
+
+def write_units(size):
+    return float(max(1, math.ceil(size / WRITE_UNIT_BYTES)))
+
+
+class CapacityMeter:
+    """
+    Estimates the read and write units of every DynamoDB call made through
+    the default boto3 session, per route (see the module docstring).
+    """
+
+    def __init__(self, index_keys):
+        # table -> attribute names that key its global secondary indexes
+        self.index_keys = index_keys
+        self.read = Counter()
+        self.write = Counter()
+        self.lock = threading.Lock()
+
+    def install(self, session):
+        """Register on the session; clients built from it afterwards are metered"""
+        session.events.register('before-call.dynamodb', self._before_call)
+        session.events.register('after-call.dynamodb', self._after_call)
+
+    def _before_call(self, params, context, **kwargs):
+        context['load_test_request'] = params.get('body')
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        route = _current_route.get()
+        if route is None or http_response.status_code != 200:
+            return
+        body = context.get('load_test_request')
+        request = json.loads(body) if body else {}
+        read, write = self.estimate(model.name, request, parsed)
+        with self.lock:
+            self.read[route] += read
+            self.write[route] += write
+
+    def indexed_writes(self, table, item):
+        return sum(1 for key in self.index_keys.get(table, ()) if key in item)
+
+    def estimate(self, operation, request, response):
+        """(read units, write units) of one call"""
+        consistent = request.get('ConsistentRead', False)
+        table = request.get('TableName')
+        if operation == 'GetItem':
+            return read_units(item_size(response.get('Item')), consistent), 0.0
+        if operation in ('Query', 'Scan'):
+            items = response.get('Items', [])
+            size = sum(item_size(item) for item in items)
+            # Filtered-out items are read too; assume they are average sized
+            if items and response.get('ScannedCount', 0) > len(items):
+                size = size / len(items) * response['ScannedCount']
+            return read_units(size, consistent), 0.0
+        if operation == 'BatchGetItem':
+            return sum(
+                read_units(item_size(item), request['RequestItems'][name].get('ConsistentRead', False))
+                for name, items in response.get('Responses', {}).items() for item in items
+            ), 0.0
+        if operation == 'PutItem':
+            units = write_units(item_size(request['Item']))
+            return 0.0, units * (1 + self.indexed_writes(table, request['Item']))
+        if operation in ('UpdateItem', 'DeleteItem'):
+            item = response.get('Attributes') or request.get('Key')
+            return 0.0, write_units(item_size(item)) * (1 + self.indexed_writes(table, item))
+        if operation == 'BatchWriteItem':
+            unprocessed = sum(len(entries) for entries in response.get('UnprocessedItems', {}).values())
+            units = 0.0
+            for name, entries in request['RequestItems'].items():
+                for entry in entries:
+                    item = entry.get('PutRequest', {}).get('Item') or entry.get('DeleteRequest', {}).get('Key')
+                    units += write_units(item_size(item)) * (1 + self.indexed_writes(name, item))
+            requested = sum(len(entries) for entries in request['RequestItems'].values())
+            return 0.0, units * (requested - unprocessed) / requested
+        if operation == 'TransactWriteItems':
+            units = 0.0
+            for entry in request['TransactItems']:
+                (kind, action), = entry.items()
+                units += 2 * write_units(item_size(action.get('Item') or action.get('Key')))
+            return 0.0, units
+        return 0.0, 0.0
+
+
+class StreamPoller(threading.Thread):
+    """
+    Reads new records from the orders table's stream (starting at LATEST)
+    and invokes each mapped function with batches of them, recording every
+    invocation as a 'STREAM <function>' route.
+    """
+
+    def __init__(self, stream_arn, results, interval=0.05):
+        super().__init__(daemon=True)
+        self.streams = boto3.client('dynamodbstreams')
+        self.results = results
+        self.interval = interval
+        self.stopping = threading.Event()
+        shards = self.streams.describe_stream(StreamArn=stream_arn)['StreamDescription']['Shards']
+        self.iterators = [
+            self.streams.get_shard_iterator(
+                StreamArn=stream_arn, ShardId=shard['ShardId'], ShardIteratorType='LATEST'
+            )['ShardIterator']
+            for shard in shards
+        ]
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            self.poll()
+        self.poll()
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+
+    def poll(self):
+        records = []
+        for index, iterator in enumerate(self.iterators):
+            response = self.streams.get_records(ShardIterator=iterator, Limit=1000)
+            self.iterators[index] = response['NextShardIterator']
+            records.extend(dict(record, eventSource='aws:dynamodb') for record in response['Records'])
+        for function, event_names in STREAM_MAPPINGS.items():
+            matching = [r for r in records if event_names is None or r['eventName'] in event_names]
+            for offset in range(0, len(matching), STREAM_BATCH_SIZE):
+                self.invoke(function, matching[offset:offset + STREAM_BATCH_SIZE])
+
+    def invoke(self, function, records):
+        route = f"STREAM {function}"
+        _current_route.set(route)
+        start = time.perf_counter()
+        try:
+            load_function(function).lambda_handler({'Records': records}, None)
+            status = 200
+        except Exception as e:
+            print(f"Error delivering stream batch to {function}: {str(e)}")
+            status = 599
+        self.results.record(route, (time.perf_counter() - start) * 1000, status)
+
+
+def propagate_route(executor_class=ThreadPoolExecutor):
+    """
+    Make executors run submitted calls in a copy of the submitting thread's
+    context, so calls from the handlers' fan-out threads keep their route.
+    Returns a function that restores the original submit.
+    """
+    original = executor_class.submit
+
+    def submit(self, fn, /, *args, **kwargs):
+        return original(self, contextvars.copy_context().run, fn, *args, **kwargs)
+
+    executor_class.submit = submit
+    return lambda: setattr(executor_class, 'submit', original)
+
+
+class Results:
+    """Latencies and status codes per route"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.lock = threading.Lock()
+
+    def record(self, route, latency_ms, status):
+        with self.lock:
+            self.latencies[route].append(latency_ms)
+            self.statuses[route][status] += 1
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def histogram(latencies):
+    """Count of latencies per bucket of HISTOGRAM_BUCKETS"""
+    counts = Counter()
+    for latency in latencies:
+        counts[next(bound for bound in HISTOGRAM_BUCKETS if latency <= bound)] += 1
+    return [(bound, counts[bound]) for bound in HISTOGRAM_BUCKETS]
+
+
+def summarize(results, meter, elapsed):
+    """One dict per route, sorted by route"""
+    summary = []
+    for route in sorted(results.latencies):
+        latencies = sorted(results.latencies[route])
+        statuses = results.statuses[route]
+        count = len(latencies)
+        summary.append({
+            'route': route,
+            'requests': count,
+            'perSecond': round(count / elapsed, 1),
+            'p50Ms': round(percentile(latencies, 0.50), 2),
+            'p95Ms': round(percentile(latencies, 0.95), 2),
+            'p99Ms': round(percentile(latencies, 0.99), 2),
+            'maxMs': round(latencies[-1], 2),
+            'clientErrorRate': round(sum(n for s, n in statuses.items() if 400 <= s < 500) / count, 4),
+            'serverErrorRate': round(sum(n for s, n in statuses.items() if s >= 500) / count, 4),
+            'statuses': {str(status): n for status, n in sorted(statuses.items())},
+            'readUnits': round(meter.read[route], 1),
+            'writeUnits': round(meter.write[route], 1),
+            'histogram': [['inf' if bound == math.inf else bound, n] for bound, n in histogram(latencies)]
+        })
+    return summary
+
+
+def print_report(summary, elapsed, issued):
+    print(f"\n{issued} requests in {elapsed:.1f}s ({issued / elapsed:.1f}/s)\n")
+    print(
+        f"{'route':<30} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        f" {'4xx':>6} {'5xx':>6} {'RCU':>9} {'WCU':>9} {'RCU/req':>8} {'WCU/req':>8}"
+    )
+    for row in summary:
+        print(
+            f"{row['route']:<30} {row['requests']:>6} {row['p50Ms']:>8.2f} {row['p95Ms']:>8.2f}"
+            f" {row['p99Ms']:>8.2f} {row['maxMs']:>8.2f} {row['clientErrorRate']:>6.1%}"
+            f" {row['serverErrorRate']:>6.1%} {row['readUnits']:>9.1f} {row['writeUnits']:>9.1f}"
+            f" {row['readUnits'] / row['requests']:>8.2f} {row['writeUnits'] / row['requests']:>8.2f}"
+        )
+
+    for row in summary:
+        print(f"\n{row['route']} latency")
+        peak = max(n for _, n in row['histogram'])
+        for bound, n in row['histogram']:
+            if n:
+                label = f"> {HISTOGRAM_BUCKETS[-2]}" if bound == 'inf' else f"<= {bound}"
+                print(f"  {label:>8} ms {n:>6}  {'#' * max(1, round(40 * n / peak))}")
+
+
+def replay(api, traffic, results, rate, concurrency, requests=None, duration=None, record=None):
+    """Issue requests on the open-loop schedule into results; returns (elapsed seconds, issued)"""
+
+    def serve(due, method, path, query, body, headers):
+        _, resource, _ = api.event(method, path)
+        route = f"{method} {resource}" if resource else f"{method} (unrouted)"
+        _current_route.set(route)
+        try:
+            _, response = api.request(method, path, query, body, headers)
+            status = response.get('statusCode', 500)
+            traffic.observe(method, response)
+        except Exception as e:
+            print(f"Error serving {method} {path}: {str(e)}")
+            status = 599
+        results.record(route, (time.perf_counter() - due) * 1000, status)
+
+    issued = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = []
+        while (requests is None or issued < requests) and (duration is None or time.perf_counter() - start < duration):
+            due = start + issued / rate if rate else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            method, path, query, body, *rest = traffic.next_request()
+            headers = rest[0] if rest else None
+            if record:
+                record.write(json.dumps({
+                    'httpMethod': method, 'path': path, 'queryStringParameters': query,
+                    'body': json.dumps(body) if body is not None else None
+                }) + '\n')
+            pending.append(executor.submit(serve, due, method, path, query, body, headers))
+            issued += 1
+            if not rate:
+                # Closed loop: keep at most `concurrency` requests in flight
+                while len([f for f in pending if not f.done()]) >= concurrency:
+                    time.sleep(0.0005)
+                pending = [f for f in pending if not f.done()]
+    return time.perf_counter() - start, issued
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay API traffic against the handlers on moto')
+    parser.add_argument('--rate', type=float, default=20.0, help='Requests per second (0: as fast as possible)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Worker threads')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help=f"Synthetic mix, e.g. {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}")
+    parser.add_argument('--events', help='Replay an NDJSON file of proxy events instead of the synthetic mix')
+    parser.add_argument('--record', help='Also write the issued requests to this NDJSON file')
+    parser.add_argument('--orders', type=int, default=10000, help='Orders seeded before the run')
+    parser.add_argument('--max-items', type=int, default=500, help='Maximum items per generated order')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the data and the mix')
+    parser.add_argument('--no-authorizer', action='store_true', help='Skip the custom authorizer')
+    parser.add_argument('--verbose', action='store_true', help="Show the handlers' log output")
+    parser.add_argument('--json', action='store_true', help='Print the per-route summary as JSON')
+    args = parser.parse_args()
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+
+    stack = LocalStack().start()
+    print(f"Seeding {args.orders} orders...", file=sys.stderr)
+    keys = stack.seed(args.orders, args.seed, args.max_items)
+
+    index_keys = {}
+    for table in (stack.orders, stack.stats, stack.idempotency):
+        index_keys[table.name] = [
+            key['AttributeName'] for index in table.global_secondary_indexes or [] for key in index['KeySchema']
+        ]
+    meter = CapacityMeter(index_keys)
+    meter.install(boto3.DEFAULT_SESSION)
+    restore_submit = propagate_route()
+
+    # Import every handler up front so module init is not timed as a request
+    for function in FUNCTIONS:
+        load_function(function)
+
+    if args.events:
+        traffic = RecordedTraffic(args.events)
+    else:
+        traffic = SyntheticTraffic([key['orderId'] for key in keys], args.mix, args.seed, args.max_items)
+
+    results = Results()
+    poller = StreamPoller(stack.orders.latest_stream_arn, results)
+    poller.start()
+    record = open(args.record, 'w') if args.record else None
+    logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    try:
+        with logs:
+            elapsed, issued = replay(
+                LocalApi(authorize=not args.no_authorizer), traffic, results, args.rate, args.concurrency,
+                args.requests, args.duration, record
+            )
+            poller.stop()
+    finally:
+        if record:
+            record.close()
+        if poller.is_alive():
+            poller.stop()
+        restore_submit()
+        stack.stop()
+
+    summary = summarize(results, meter, elapsed)
+    if args.json:
+        for row in summary:
+            print(json.dumps(row))
+    else:
+        print_report(summary, elapsed, issued)
+
+
+if __name__ == '__main__':
+    main()
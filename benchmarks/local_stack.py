@@ -0,0 +1,337 @@
+"""
+In-process stand-in for the deployed stack, for benchmarks and load tests.
+
+moto provides DynamoDB (and its stream), S3 and SNS with the tables,
+indexes, bucket and topic Terraform creates. Each function's lambda_function module is loaded
+under its own name (they all share the module name lambda_function), and
+LocalApi routes API Gateway proxy events to them the way
+terraform/api_gateway.tf does, calling the custom authorizer first.
+"""
+import base64
+import importlib.util
+import json
+import os
+import random
+import re
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+LAYER = os.path.join(ROOT, 'lambda/layers/common/python')
+
+# Read by the handlers at import time, so set before any of them is loaded
+ENVIRONMENT = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'local',
+    'AWS_SECRET_ACCESS_KEY': 'local',
+    'DYNAMODB_TABLE': 'local-orders',
+    'STATS_TABLE': 'local-orders-stats',
+    'IDEMPOTENCY_TABLE': 'local-orders-idempotency',
+    'CURSOR_SECRET': 'local-cursor-secret',
+    'S3_BUCKET': 'local-invoices',
+    'SNS_TOPIC_ARN': 'arn:aws:sns:us-east-1:123456789012:local-order-notifications'
+}
+for _name, _value in ENVIRONMENT.items():
+    os.environ.setdefault(_name, _value)
+
+for _path in (LAYER, os.path.join(ROOT, 'lambda/orders_crud')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+from moto import mock_dynamodb, mock_dynamodbstreams, mock_s3, mock_sns
+from moto.core.botocore_stubber import BotocoreStubber
+
+from day_buckets import created_day_key
+from order_ids import ALPHABET, EPOCH
+from orders_common.stats import apply_stat_deltas, collect_stat_deltas
+
+# function -> (function directory, handler module)
+FUNCTIONS = {
+    'orders_crud': ('lambda/orders_crud', 'lambda_function'),
+    'order_stats': ('lambda/orders_crud', 'order_stats'),
+    'pdf_generator': ('lambda/pdf_generator', 'lambda_function'),
+    'sns_notification': ('lambda/sns_notification', 'lambda_function'),
+    'cognito_authorizer': ('lambda/cognito_authorizer', 'lambda_function')
+}
+
+# (method, resource) -> function, as integrated in terraform/api_gateway.tf
+ROUTES = {
+    ('GET', '/orders'): 'orders_crud',
+    ('POST', '/orders'): 'orders_crud',
+    ('POST', '/orders/batch'): 'orders_crud',
+    ('GET', '/orders/stats'): 'orders_crud',
+    ('GET', '/orders/{orderId}'): 'orders_crud',
+    ('PUT', '/orders/{orderId}'): 'orders_crud',
+    ('DELETE', '/orders/{orderId}'): 'orders_crud',
+    ('GET', '/orders/{orderId}/pdf'): 'pdf_generator'
+}
+
+FIRST_NAMES = ['Juan', 'María', 'Luis', 'Ana', 'Sofía', 'Carlos', 'Elena', 'Pedro', 'Lucía', 'Diego']
+LAST_NAMES = ['Pérez', 'García', 'López', 'Martínez', 'Rodríguez', 'Sánchez', 'Romero', 'Torres']
+PRODUCTS = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Smartphone', 'Headphones', 'Webcam', 'Dock',
+            'USB-C Cable', 'Tablet', 'Printer', 'Router']
+STATUSES = ['pending', 'processing', 'completed', 'cancelled']
+
+
+def load_function(function):
+    """Import a function's handler module under its own name"""
+    name = f"{function}_handler"
+    if name not in sys.modules:
+        directory, module_name = FUNCTIONS[function]
+        directory = os.path.join(ROOT, directory)
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        spec = importlib.util.spec_from_file_location(name, os.path.join(directory, f'{module_name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def item_count(rng, max_items=500):
+    """Items per order: mostly a handful, with a long tail up to max_items"""
+    roll = rng.random()
+    if roll < 0.90:
+        count = rng.randint(1, 5)
+    elif roll < 0.99:
+        count = rng.randint(6, 50)
+    else:
+        count = rng.randint(51, 500)
+    return min(count, max_items)
+
+
+def make_order_data(rng, max_items=500):
+    """A POST /orders body"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        'customerName': f'{first} {last}',
+        'customerEmail': f'{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com',
+        'items': [rng.choice(PRODUCTS) for _ in range(item_count(rng, max_items))],
+        'amount': round(rng.uniform(5, 2500), 2)
+    }
+
+
+def order_key(rng, created):
+    """An order_ids-style key whose random part is drawn from rng"""
+    value = ((created - EPOCH) // timedelta(milliseconds=1) << 80) | rng.getrandbits(80)
+    chars = []
+    for _ in range(26):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    created = EPOCH + timedelta(milliseconds=(created - EPOCH) // timedelta(milliseconds=1))
+    return {'orderId': 'ORD-' + ''.join(reversed(chars)), 'createdAt': created.isoformat()}
+
+
+def make_orders(count, seed=42, max_items=500, days=90):
+    """
+    Deterministic stored orders spread over the `days` days before today
+    (UTC): the same seed gives the same order IDs all day, so recorded
+    requests find their orders again.
+    """
+    rng = random.Random(seed)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(count):
+        key = order_key(rng, today - timedelta(milliseconds=rng.randint(1, days * 24 * 60 * 60 * 1000)))
+        data = make_order_data(rng, max_items)
+        yield {
+            **key,
+            'createdDay': created_day_key(key['orderId'], key['createdAt']),
+            'customerName': data['customerName'],
+            'customerEmail': data['customerEmail'],
+            'customerEmailKey': data['customerEmail'].lower(),
+            'items': data['items'],
+            'amount': Decimal(str(data['amount'])),
+            'status': rng.choice(STATUSES),
+            'updatedAt': key['createdAt']
+        }
+
+
+def stream_records(orders, event_name='INSERT'):
+    """DynamoDB Stream records (NEW_AND_OLD_IMAGES) for orders being inserted"""
+    serializer = TypeSerializer()
+    return [{
+        'eventSource': 'aws:dynamodb',
+        'eventName': event_name,
+        'dynamodb': {
+            'Keys': {'orderId': {'S': order['orderId']}, 'createdAt': {'S': order['createdAt']}},
+            'NewImage': {name: serializer.serialize(value) for name, value in order.items()}
+        }
+    } for order in orders]
+
+
+class LocalStack:
+    """moto-backed DynamoDB, S3 and SNS shaped like terraform/dynamodb.tf, s3.tf and sns_sqs.tf"""
+
+    def __init__(self):
+        self.mocks = [mock_dynamodb(), mock_dynamodbstreams(), mock_s3(), mock_sns()]
+        self._unlocked_call = None
+
+    def start(self):
+        for mock in self.mocks:
+            mock.start()
+        self._serialize_requests()
+        region = os.environ['AWS_DEFAULT_REGION']
+        self.dynamodb = boto3.resource('dynamodb', region_name=region)
+        self.orders = self._create_orders_table()
+        self.stats = self.dynamodb.create_table(
+            TableName=os.environ['STATS_TABLE'],
+            KeySchema=[
+                {'AttributeName': 'statType', 'KeyType': 'HASH'},
+                {'AttributeName': 'statKey', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'statType', 'AttributeType': 'S'},
+                {'AttributeName': 'statKey', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        self.idempotency = self.dynamodb.create_table(
+            TableName=os.environ['IDEMPOTENCY_TABLE'],
+            KeySchema=[{'AttributeName': 'idempotencyKey', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'idempotencyKey', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        boto3.client('s3', region_name=region).create_bucket(Bucket=os.environ['S3_BUCKET'])
+        boto3.client('sns', region_name=region).create_topic(Name=os.environ['SNS_TOPIC_ARN'].split(':')[-1])
+        return self
+
+    def stop(self):
+        for mock in reversed(self.mocks):
+            mock.stop()
+        if self._unlocked_call is not None:
+            BotocoreStubber.__call__ = self._unlocked_call
+            self._unlocked_call = None
+
+    def _serialize_requests(self):
+        """
+        moto's backends are not thread-safe (a Scan racing a PutItem fails
+        with 'dictionary changed size during iteration'), while the handlers
+        call AWS from several threads; answer one request at a time.
+        """
+        unlocked_call = BotocoreStubber.__call__
+        lock = threading.RLock()
+
+        def locked_call(stubber, *args, **kwargs):
+            with lock:
+                return unlocked_call(stubber, *args, **kwargs)
+
+        self._unlocked_call = unlocked_call
+        BotocoreStubber.__call__ = locked_call
+
+    def _create_orders_table(self):
+        def index(name, hash_key):
+            return {
+                'IndexName': name,
+                'KeySchema': [
+                    {'AttributeName': hash_key, 'KeyType': 'HASH'},
+                    {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+
+        return self.dynamodb.create_table(
+            TableName=os.environ['DYNAMODB_TABLE'],
+            KeySchema=[
+                {'AttributeName': 'orderId', 'KeyType': 'HASH'},
+                {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': name, 'AttributeType': 'S'}
+                for name in ('orderId', 'createdAt', 'status', 'statusShard', 'createdDay', 'customerEmailKey')
+            ],
+            GlobalSecondaryIndexes=[
+                index('StatusIndex', 'status'),
+                index('StatusShardIndex', 'statusShard'),
+                index('CreatedDayIndex', 'createdDay'),
+                index('CustomerIndex', 'customerEmailKey')
+            ],
+            BillingMode='PAY_PER_REQUEST',
+            StreamSpecification={'StreamEnabled': True, 'StreamViewType': 'NEW_AND_OLD_IMAGES'}
+        )
+
+    def seed(self, count, seed=42, max_items=500):
+        """Write count generated orders and their counters; returns the orders' keys"""
+        keys, batch = [], []
+        with self.orders.batch_writer() as writer:
+            for order in make_orders(count, seed, max_items):
+                writer.put_item(Item=order)
+                keys.append({'orderId': order['orderId'], 'createdAt': order['createdAt']})
+                batch.append(order)
+                if len(batch) == 1000:
+                    apply_stat_deltas(self.stats, collect_stat_deltas(stream_records(batch)))
+                    batch = []
+        if batch:
+            apply_stat_deltas(self.stats, collect_stat_deltas(stream_records(batch)))
+        return keys
+
+
+def _route_pattern(resource):
+    return re.compile('^' + re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', resource) + '$')
+
+
+_PATTERNS = [(method, resource, _route_pattern(resource)) for method, resource in ROUTES]
+
+
+def bearer_token(subject='local-user', email='local@example.com'):
+    """An unsigned JWT the demo authorizer accepts"""
+    def encode(part):
+        return base64.urlsafe_b64encode(json.dumps(part).encode('utf-8')).rstrip(b'=').decode('ascii')
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode({'sub': subject, 'email': email})}."
+
+
+class LocalApi:
+    """
+    API Gateway REST API in process: resolves a method and path to the
+    resource and function Terraform integrates, runs the custom authorizer
+    and invokes the function with a proxy event.
+    """
+
+    def __init__(self, authorize=True, token=None):
+        self.authorize = authorize
+        self.token = token or bearer_token()
+
+    def handler(self, function):
+        return load_function(function).lambda_handler
+
+    def event(self, method, path, query=None, body=None, headers=None):
+        """(function, resource, proxy event) for a request"""
+        path = path.split('?', 1)[0]
+        for route_method, resource, pattern in _PATTERNS:
+            match = pattern.match(path)
+            if route_method == method and match:
+                event = {
+                    'httpMethod': method,
+                    'resource': resource,
+                    'path': path,
+                    'pathParameters': match.groupdict() or None,
+                    'queryStringParameters': query or None,
+                    'headers': {'Authorization': f'Bearer {self.token}', **(headers or {})},
+                    'body': json.dumps(body) if body is not None else None,
+                    'isBase64Encoded': False,
+                    'requestContext': {'authorizer': {'principalId': 'local-user'}}
+                }
+                return ROUTES[(method, resource)], resource, event
+        return None, None, None
+
+    def request(self, method, path, query=None, body=None, headers=None):
+        """Invoke the routed function; (resource, response) like API Gateway would return"""
+        function, resource, event = self.event(method, path, query, body, headers)
+        if function is None:
+            return None, {'statusCode': 404 if not any(p.match(path) for _, _, p in _PATTERNS) else 405,
+                          'body': json.dumps({'message': 'Missing Authentication Token'})}
+
+        if self.authorize:
+            policy = self.handler('cognito_authorizer')({
+                'type': 'REQUEST',
+                'methodArn': f"arn:aws:execute-api:us-east-1:123456789012:local/dev/{method}{path}",
+                'headers': event['headers']
+            }, None)
+            if policy['policyDocument']['Statement'][0]['Effect'] != 'Allow':
+                return resource, {'statusCode': 403, 'body': json.dumps({'message': 'Forbidden'})}
+            event['requestContext']['authorizer'] = {'principalId': policy['principalId'], **policy.get('context', {})}
+
+        return resource, self.handler(function)(event, None)
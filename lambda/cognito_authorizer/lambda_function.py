@@ -3,6 +3,9 @@ import jwt
 import os
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 
+from orders_common.metrics import record_invocation
+
+@record_invocation
 def lambda_handler(event, context):
     """
     Custom JWT Authorizer for API Gateway
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+
+from orders_common.metrics import instrument_client
+
+# Build clients and open their connections during init instead of on the
+# first request (worth it with provisioned concurrency, where init is prepaid)
+PRIME_CLIENTS = os.environ.get('PRIME_CLIENTS', 'false').lower() == 'true'
+
+# HTTP settings of every AWS client; each function can override them through
+# its environment. The pool must cover the function's widest thread fan-out
+# (botocore's default of 10 makes extra threads open and drop connections).
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', 50))
+AWS_TCP_KEEPALIVE = os.environ.get('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', 2))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', 10))
+AWS_RETRY_MODE = os.environ.get('AWS_RETRY_MODE', 'standard')
+# Total attempts per call, the first one included
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', 3))
+
+# boto3's default session is not safe to build clients from concurrently
+_build_lock = threading.Lock()
+
+
+def client_config(**overrides):
+    """botocore Config with the shared HTTP settings; keyword arguments take precedence"""
+    settings = {
+        'max_pool_connections': AWS_MAX_POOL_CONNECTIONS,
+        'tcp_keepalive': AWS_TCP_KEEPALIVE,
+        'connect_timeout': AWS_CONNECT_TIMEOUT,
+        'read_timeout': AWS_READ_TIMEOUT,
+        'retries': {'mode': AWS_RETRY_MODE, 'total_max_attempts': AWS_MAX_ATTEMPTS}
+    }
+    settings.update(overrides)
+    return Config(**settings)
+
+
+def client(service_name, **overrides):
+    """boto3 client with the shared HTTP settings and per-call metrics"""
+    with _build_lock:
+        return instrument_client(boto3.client(service_name, config=client_config(**overrides)))
+
+
+def resource(service_name, **overrides):
+    """boto3 resource with the shared HTTP settings and per-call metrics"""
+    with _build_lock:
+        service = boto3.resource(service_name, config=client_config(**overrides))
+    instrument_client(service.meta.client)
+    return service
+
+
+class Lazy:
+    """
+    Stand-in for a boto3 client, resource or Table that is built on first
+    use and then cached for the container's lifetime. Attribute access is
+    forwarded, so call sites use it like the real object, and a cold start
+    only pays for the clients its request path actually touches.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def _load(self):
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+                value = self._value
+        return value
+
+
+def lazy_client(service_name, **overrides):
+    """Low-level boto3 client with the shared HTTP settings, built on first use"""
+    return Lazy(lambda: client(service_name, **overrides))
+
+
+def prime(*calls):
+    """
+    Run cheap calls during init when PRIME_CLIENTS is set, so the first
+    request finds its clients built and their TLS connections open.
+    Failures are logged and ignored: priming is only an optimization.
+    """
+    if not PRIME_CLIENTS:
+        return
+    start = time.perf_counter()
+    for call in calls:
+        try:
+            call()
+        except Exception as e:
+            print(f"Error priming clients: {str(e)}")
+    print(f"Primed clients in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,224 @@
+import math
+import os
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError, ConnectionError as EndpointError, HTTPClientError
+
+from orders_common.clients import resource
+from orders_common.metrics import invocation_metrics
+from orders_common.responses import json_response
+
+# Total attempts per call, the first one included
+DYNAMODB_MAX_ATTEMPTS = int(os.environ.get('DYNAMODB_MAX_ATTEMPTS', 8))
+BACKOFF_BASE_SECONDS = float(os.environ.get('DYNAMODB_BACKOFF_BASE_SECONDS', 0.05))
+BACKOFF_MAX_SECONDS = float(os.environ.get('DYNAMODB_BACKOFF_MAX_SECONDS', 2.0))
+# AIMD tuning: requests/s regained per second without throttling, floor of the rate
+RATE_INCREASE = float(os.environ.get('DYNAMODB_RATE_INCREASE', 5.0))
+RATE_DECREASE = 0.5
+MIN_RATE = float(os.environ.get('DYNAMODB_MIN_RATE', 1.0))
+
+THROTTLED = 'throttled'
+UNAVAILABLE = 'unavailable'
+
+THROTTLING_ERRORS = frozenset({
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+})
+TRANSIENT_ERRORS = frozenset({'InternalServerError', 'ServiceUnavailable'})
+
+# botocore's own retries are switched off: the needs-retry hook below decides
+RETRIES_OFF = {'mode': 'standard', 'total_max_attempts': 1}
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff delay for the given retry attempt"""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+class RetryCounters:
+    """Thread-safe counters of throttles, transient errors and retries"""
+
+    NAMES = ('throttles', 'transientErrors', 'retries', 'exhausted')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = dict.fromkeys(self.NAMES, 0)
+
+    def record(self, name, count=1):
+        with self.lock:
+            self.values[name] += count
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.values)
+
+    def take(self):
+        """Return the counters and reset them"""
+        with self.lock:
+            values, self.values = self.values, dict.fromkeys(self.NAMES, 0)
+        return values
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD token bucket shared by every DynamoDB call in the container.
+
+    Calls are not limited until the first throttle. A throttle halves the
+    rate (the rate measured over the last second when not limiting yet);
+    each call that is not throttled adds increase / rate, so the rate grows
+    back by about `increase` requests/s per second of clean traffic.
+    """
+
+    def __init__(self, increase=RATE_INCREASE, decrease=RATE_DECREASE, min_rate=MIN_RATE,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.increase = increase
+        self.decrease = decrease
+        self.min_rate = min_rate
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.rate = None
+        self.tokens = 0.0
+        self.refilled_at = clock()
+        self.window_start = self.refilled_at
+        self.window_count = 0
+        self.measured = 0.0
+
+    def _measure(self, now):
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.measured = self.window_count / elapsed
+            self.window_start, self.window_count = now, 0
+        self.window_count += 1
+
+    def acquire(self):
+        """Take a token, sleeping until one is available; returns the wait in seconds"""
+        with self.lock:
+            now = self.clock()
+            self._measure(now)
+            if self.rate is None:
+                return 0.0
+            self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.refilled_at) * self.rate)
+            self.refilled_at = now
+            # Reserve the token now and wait outside the lock, so waiters queue fairly
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            self.sleep(wait)
+        return wait
+
+    def on_throttle(self):
+        with self.lock:
+            current = self.rate if self.rate is not None else max(self.measured, self.window_count)
+            self.rate = max(self.min_rate, current * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self):
+        with self.lock:
+            if self.rate is not None:
+                self.rate += self.increase / self.rate
+
+    def retry_after(self):
+        """Whole seconds a client should wait before retrying"""
+        with self.lock:
+            if not self.rate or self.tokens >= 0:
+                return 1
+            return max(1, math.ceil(-self.tokens / self.rate))
+
+
+rate_limiter = AdaptiveRateLimiter()
+retry_counters = RetryCounters()
+# Emitted with each invocation's metrics as DynamoDBThrottles, DynamoDBRetries...
+invocation_metrics.register_counters('DynamoDB', retry_counters.take)
+
+
+def _response_kind(status_code, error_code):
+    if error_code in THROTTLING_ERRORS:
+        return THROTTLED
+    if error_code in TRANSIENT_ERRORS or (status_code or 0) >= 500:
+        return UNAVAILABLE
+    return None
+
+
+def error_kind(error):
+    """THROTTLED, UNAVAILABLE or None for an exception raised by a DynamoDB call"""
+    if isinstance(error, ClientError):
+        return _response_kind(
+            error.response.get('ResponseMetadata', {}).get('HTTPStatusCode'),
+            error.response.get('Error', {}).get('Code')
+        )
+    if isinstance(error, (EndpointError, HTTPClientError)):
+        return UNAVAILABLE
+    return None
+
+
+def note_throttle(count=1):
+    """Record throttling reported in a successful response (UnprocessedItems/Keys)"""
+    retry_counters.record('throttles', count)
+    rate_limiter.on_throttle()
+
+
+def _before_attempt(**kwargs):
+    rate_limiter.acquire()
+
+
+def _needs_retry(response=None, attempts=1, caught_exception=None, **kwargs):
+    """needs-retry hook: returns the delay before the next attempt, or None to stop"""
+    if caught_exception is not None:
+        kind = UNAVAILABLE if isinstance(caught_exception, (EndpointError, HTTPClientError)) else None
+    elif response is not None:
+        http_response, parsed = response
+        kind = _response_kind(http_response.status_code, parsed.get('Error', {}).get('Code'))
+    else:
+        kind = None
+
+    if kind is None:
+        rate_limiter.on_success()
+        return None
+
+    if kind == THROTTLED:
+        note_throttle()
+    else:
+        retry_counters.record('transientErrors')
+
+    if attempts >= DYNAMODB_MAX_ATTEMPTS:
+        retry_counters.record('exhausted')
+        return None
+    retry_counters.record('retries')
+    return backoff_delay(attempts - 1)
+
+
+def install_adaptive_retry(client):
+    """Route a DynamoDB client's calls through the shared rate limiter and retry policy"""
+    events = client.meta.events
+    events.register('request-created.dynamodb', _before_attempt, unique_id='orders-common-rate-limit')
+    events.register('needs-retry.dynamodb', _needs_retry, unique_id='orders-common-retry')
+    return client
+
+
+def dynamodb_resource():
+    """boto3 DynamoDB resource with adaptive retry; its Tables share one client"""
+    dynamodb = resource('dynamodb', retries=RETRIES_OFF)
+    install_adaptive_retry(dynamodb.meta.client)
+    return dynamodb
+
+
+def capacity_error_response(error):
+    """
+    Map a throttled or unavailable DynamoDB call to 429 / 503 with
+    Retry-After; None for any other error.
+    """
+    kind = error_kind(error)
+    if kind is None:
+        return None
+    status_code, message = (
+        (429, 'Too many requests, retry later') if kind == THROTTLED
+        else (503, 'Service temporarily unavailable, retry later')
+    )
+    return json_response(status_code, {'error': message}, {
+        'Retry-After': str(rate_limiter.retry_after()),
+        'Access-Control-Expose-Headers': 'Retry-After'
+    })
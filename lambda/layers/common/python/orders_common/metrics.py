@@ -0,0 +1,254 @@
+import functools
+import json
+import os
+import threading
+import time
+
+# Per-invocation metrics, written as CloudWatch Embedded Metric Format (EMF)
+# log lines: CloudWatch Logs extracts them into metrics, no API calls needed
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'serverless-orders')
+# Ask DynamoDB for ConsumedCapacity on every call that does not already
+RECORD_CONSUMED_CAPACITY = os.environ.get('METRICS_CONSUMED_CAPACITY', 'true').lower() == 'true'
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+
+# EMF accepts at most 100 values per metric in one record
+MAX_VALUES = 100
+
+MILLISECONDS = 'Milliseconds'
+BYTES = 'Bytes'
+COUNT = 'Count'
+
+
+class AwsCallStats:
+    """Latencies, payload sizes and capacity of one service operation"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.consumed_capacity = 0.0
+
+
+class InvocationMetrics:
+    """
+    Buffer of the current invocation's AWS calls, filled by botocore hooks
+    (from any thread) and written as EMF lines in a single print by flush().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.counter_sources = []
+        self.cold_start = True
+
+    def record_call(self, service, operation, latency_ms, request_bytes, response_bytes, capacity, error):
+        with self.lock:
+            stats = self.calls.get((service, operation))
+            if stats is None:
+                stats = self.calls[(service, operation)] = AwsCallStats()
+            stats.latencies.append(latency_ms)
+            stats.errors += error
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.consumed_capacity += capacity
+            if len(stats.latencies) < MAX_VALUES:
+                return
+            # Long invocations (exports, imports): emit full batches as they fill
+            del self.calls[(service, operation)]
+        print(self._call_record(service, operation, stats, int(time.time() * 1000)))
+
+    def register_counters(self, prefix, take):
+        """take() returns and resets {name: count}; emitted as <prefix><Name> on every flush"""
+        self.counter_sources.append((prefix, take))
+
+    def flush(self, route, duration_ms, status_code=None, request_bytes=None, response_bytes=None, request_id=None):
+        """Write the invocation's record and its AWS call records, then reset"""
+        with self.lock:
+            calls, self.calls = self.calls, {}
+            cold_start, self.cold_start = self.cold_start, False
+        timestamp = int(time.time() * 1000)
+
+        metrics = {
+            'Duration': (duration_ms, MILLISECONDS),
+            'ColdStart': (int(cold_start), COUNT),
+            'Errors': (int(status_code is not None and status_code >= 500), COUNT)
+        }
+        if request_bytes is not None:
+            metrics['RequestBytes'] = (request_bytes, BYTES)
+        if response_bytes is not None:
+            metrics['ResponseBytes'] = (response_bytes, BYTES)
+        for prefix, take in self.counter_sources:
+            for name, count in take().items():
+                metrics[prefix + name[0].upper() + name[1:]] = (count, COUNT)
+
+        properties = {'Route': route}
+        if status_code is not None:
+            properties['statusCode'] = status_code
+        if request_id is not None:
+            properties['requestId'] = request_id
+        lines = [emf_record(timestamp, [['FunctionName'], ['FunctionName', 'Route']], metrics, properties)]
+        lines.extend(
+            self._call_record(service, operation, stats, timestamp)
+            for (service, operation), stats in sorted(calls.items())
+        )
+        print('\n'.join(lines))
+
+    def _call_record(self, service, operation, stats, timestamp):
+        metrics = {
+            'Latency': (stats.latencies, MILLISECONDS),
+            'Calls': (len(stats.latencies), COUNT),
+            'CallErrors': (stats.errors, COUNT),
+            'RequestBytes': (stats.request_bytes, BYTES),
+            'ResponseBytes': (stats.response_bytes, BYTES)
+        }
+        if service == 'dynamodb':
+            metrics['ConsumedCapacity'] = (stats.consumed_capacity, COUNT)
+        return emf_record(
+            timestamp, [['FunctionName', 'Service', 'Operation']], metrics,
+            {'Service': service, 'Operation': operation}
+        )
+
+
+def emf_record(timestamp, dimensions, metrics, properties):
+    """One EMF JSON line; metrics maps name -> (value or list of values, unit)"""
+    record = {
+        '_aws': {
+            'Timestamp': timestamp,
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': dimensions,
+                'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()]
+            }]
+        },
+        'FunctionName': FUNCTION_NAME
+    }
+    record.update(properties)
+    record.update({name: value for name, (value, _) in metrics.items()})
+    return json.dumps(record, separators=(',', ':'))
+
+
+invocation_metrics = InvocationMetrics()
+
+
+def _body_size(body):
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    if hasattr(body, 'seek') and hasattr(body, 'tell'):
+        # Seekable stream (S3 uploads): measure without reading it
+        position = body.tell()
+        size = body.seek(0, os.SEEK_END)
+        body.seek(position)
+        return size
+    return 0
+
+
+def _consumed_capacity(parsed):
+    consumed = parsed.get('ConsumedCapacity')
+    if isinstance(consumed, dict):
+        return consumed.get('CapacityUnits', 0)
+    if isinstance(consumed, list):
+        return sum(entry.get('CapacityUnits', 0) for entry in consumed)
+    return 0
+
+
+def _ask_consumed_capacity(params, model, **kwargs):
+    if 'ReturnConsumedCapacity' in model.input_shape.members and 'ReturnConsumedCapacity' not in params:
+        params['ReturnConsumedCapacity'] = 'TOTAL'
+
+
+def _before_call(params, model, context, **kwargs):
+    context['metrics_call'] = (
+        model.service_model.service_name, model.name, time.perf_counter(), _body_size(params.get('body'))
+    )
+
+
+def _response_size(http_response, model):
+    length = http_response.headers.get('Content-Length')
+    if length is not None:
+        return int(length)
+    # Already read by the parser, except for streamed bodies (S3 GetObject)
+    return 0 if model.has_streaming_output else len(http_response.content or b'')
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    call = context.pop('metrics_call', None)
+    if call is None:
+        return
+    service, operation, start, request_bytes = call
+    invocation_metrics.record_call(
+        service, operation, (time.perf_counter() - start) * 1000, request_bytes,
+        _response_size(http_response, model), _consumed_capacity(parsed), int(http_response.status_code >= 300)
+    )
+
+
+def _after_call_error(context, **kwargs):
+    # The request never got a response (connection error, retries exhausted)
+    call = context.pop('metrics_call', None)
+    if call is None:
+        return
+    service, operation, start, request_bytes = call
+    invocation_metrics.record_call(service, operation, (time.perf_counter() - start) * 1000, request_bytes, 0, 0, 1)
+
+
+def instrument_client(client):
+    """Time every call of a botocore client (and ask DynamoDB for consumed capacity)"""
+    if not METRICS_ENABLED:
+        return client
+    events = client.meta.events
+    if RECORD_CONSUMED_CAPACITY and client.meta.service_model.service_name == 'dynamodb':
+        # Not provide-client-params: botocore replaces DynamoDB params with a copy there
+        events.register('before-parameter-build.dynamodb', _ask_consumed_capacity, unique_id='orders-common-capacity')
+    events.register('before-call', _before_call, unique_id='orders-common-metrics-start')
+    events.register('after-call', _after_call, unique_id='orders-common-metrics')
+    events.register('after-call-error', _after_call_error, unique_id='orders-common-metrics-error')
+    return client
+
+
+def invocation_route(event):
+    """Route dimension of an invocation: 'GET /orders/{orderId}', 'stream', 's3', 'authorize'..."""
+    if not isinstance(event, dict):
+        return 'invoke'
+    if 'httpMethod' in event:
+        return f"{event['httpMethod']} {event.get('resource') or event.get('path')}"
+    if event.get('type') in ('REQUEST', 'TOKEN') and 'methodArn' in event:
+        return 'authorize'
+    records = event.get('Records')
+    if records:
+        source = records[0].get('eventSource') or records[0].get('EventSource') or ''
+        return {'aws:dynamodb': 'stream', 'aws:s3': 's3', 'aws:sns': 'sns'}.get(source, 'records')
+    return 'invoke'
+
+
+def record_invocation(handler):
+    """
+    Decorator for a Lambda handler: times it and flushes the invocation's
+    metrics (route, duration, cold start, payload sizes, status, AWS calls)
+    as EMF lines when it returns. Does nothing when METRICS_ENABLED is off.
+    """
+    if not METRICS_ENABLED:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = handler(event, context)
+            return response
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            is_http = isinstance(event, dict) and 'httpMethod' in event
+            status_code = response.get('statusCode') if isinstance(response, dict) else None
+            if status_code is None and is_http:
+                # The handler raised: API Gateway answers 502
+                status_code = 502
+            invocation_metrics.flush(
+                invocation_route(event), duration_ms, status_code,
+                _body_size(event.get('body')) if is_http else None,
+                _body_size(response.get('body')) if is_http and isinstance(response, dict) else None,
+                getattr(context, 'aws_request_id', None)
+            )
+
+    return wrapper
@@ -0,0 +1,148 @@
+import functools
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from orders_common.clients import lazy_client
+
+# Profile about one in N invocations; 0 disables profiling entirely (the
+# handler is returned unwrapped, so there is no per-invocation cost at all)
+PROFILE_ONE_IN = int(os.environ.get('PROFILE_ONE_IN', 0))
+# Also trace allocations (several times slower, only for sampled invocations)
+PROFILE_MEMORY = os.environ.get('PROFILE_MEMORY', 'true').lower() == 'true'
+PROFILE_MEMORY_FRAMES = int(os.environ.get('PROFILE_MEMORY_FRAMES', 16))
+# Full profiles go to s3://PROFILE_BUCKET/PROFILE_PREFIX...; without a
+# bucket only the summary is logged
+PROFILE_BUCKET = os.environ.get('PROFILE_BUCKET')
+PROFILE_PREFIX = os.environ.get('PROFILE_PREFIX', 'profiles/')
+# Entries per table in the logged summary
+PROFILE_TOP = int(os.environ.get('PROFILE_TOP', 20))
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+
+s3 = lazy_client('s3')
+
+
+def short_path(filename):
+    """Last two path components, enough to tell handler, layer and library code apart"""
+    return '/'.join(filename.replace(os.sep, '/').split('/')[-2:])
+
+
+def cpu_summary(stats, top=PROFILE_TOP):
+    """Functions with the highest cumulative time, heaviest first"""
+    entries = sorted(stats.stats.items(), key=lambda entry: entry[1][3], reverse=True)[:top]
+    return [{
+        'function': f"{short_path(filename)}:{line}({name})",
+        'calls': calls,
+        'selfMs': round(self_time * 1000, 3),
+        'cumulativeMs': round(cumulative * 1000, 3)
+    } for (filename, line, name), (_, calls, self_time, cumulative, _) in entries]
+
+
+def allocation_summary(snapshot, top=PROFILE_TOP):
+    """Source lines holding the most memory allocated during the invocation"""
+    return [{
+        'line': f"{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+        'kb': round(stat.size / 1024, 1),
+        'count': stat.count
+    } for stat in snapshot.statistics('lineno')[:top]]
+
+
+def folded_allocations(snapshot):
+    """
+    Allocated bytes per call stack in collapsed format ('root;...;leaf bytes'
+    lines), the input of flamegraph.pl and speedscope.
+    """
+    lines = []
+    for stat in snapshot.statistics('traceback'):
+        # Frames are ordered from the oldest call to the allocating line
+        stack = ';'.join(f"{short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+        lines.append(f"{stack} {stat.size}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_profile(profiler, snapshot, peak_bytes, duration_ms, context):
+    """Log the summary; upload the pstats and allocation stacks when a bucket is set"""
+    import marshal
+    import pstats
+
+    request_id = getattr(context, 'aws_request_id', None) or f"local-{int(time.time() * 1000)}"
+    profiler.create_stats()
+    stats = pstats.Stats(profiler)
+
+    summary = {
+        'function': FUNCTION_NAME,
+        'requestId': request_id,
+        'durationMs': round(duration_ms, 3),
+        'cpu': cpu_summary(stats)
+    }
+    if snapshot is not None:
+        summary['peakKb'] = round(peak_bytes / 1024, 1)
+        summary['allocations'] = allocation_summary(snapshot)
+
+    if PROFILE_BUCKET:
+        prefix = f"{PROFILE_PREFIX}{FUNCTION_NAME}/{datetime.now(timezone.utc).strftime('%Y-%m-%d')}/{request_id}"
+        # Same format as pstats.Stats.dump_stats: open with pstats, snakeviz or flameprof
+        s3.put_object(Bucket=PROFILE_BUCKET, Key=f"{prefix}.pstats", Body=marshal.dumps(stats.stats))
+        summary['pstats'] = f"s3://{PROFILE_BUCKET}/{prefix}.pstats"
+        if snapshot is not None:
+            s3.put_object(
+                Bucket=PROFILE_BUCKET, Key=f"{prefix}.alloc.folded",
+                Body=folded_allocations(snapshot).encode('utf-8'), ContentType='text/plain'
+            )
+            summary['allocationStacks'] = f"s3://{PROFILE_BUCKET}/{prefix}.alloc.folded"
+
+    print(json.dumps({'profile': summary}, separators=(',', ':')))
+
+
+def profiled_call(handler, event, context):
+    """Run the handler under cProfile (and tracemalloc) and write the profile"""
+    # About 9 ms of imports, paid by the first sampled invocation instead of every cold start
+    import cProfile
+    import tracemalloc
+
+    tracing = PROFILE_MEMORY and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start(PROFILE_MEMORY_FRAMES)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        return handler(event, context)
+    finally:
+        profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+        snapshot, peak_bytes = None, 0
+        if tracing:
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__)
+            ])
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        try:
+            write_profile(profiler, snapshot, peak_bytes, duration_ms, context)
+        except Exception as e:
+            # Profiling must never fail the request it observed
+            print(f"Error writing profile: {str(e)}")
+
+
+def profile_invocations(handler):
+    """
+    Decorator for a Lambda handler: profiles about one in PROFILE_ONE_IN
+    invocations with cProfile (CPU) and tracemalloc (allocations).
+    cProfile only sees the handler's own thread; time spent in fan-out
+    workers shows up as waiting on their results.
+    """
+    one_in = PROFILE_ONE_IN
+    if one_in <= 0:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if random.random() * one_in >= 1:
+            return handler(event, context)
+        return profiled_call(handler, event, context)
+
+    return wrapper
@@ -0,0 +1,169 @@
+import base64
+import hashlib
+import json
+import os
+import zlib
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the layer contents
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the layer contents
+    brotli = None
+
+# Bodies smaller than this are sent as-is: compression would not pay off
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 5))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 4))
+
+# Shared header dicts: reused by every response, never mutated
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+
+def _default(value):
+    """Encode the non-JSON types boto3 returns for DynamoDB attributes"""
+    # Exact type check first: Decimal is by far the most common case
+    if value.__class__ is Decimal or isinstance(value, Decimal):
+        # Integers stay exact at any size; only fractional amounts become floats
+        if value == value.to_integral_value():
+            return int(value)
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if hasattr(value, 'value') and isinstance(value.value, bytes):
+        # boto3.dynamodb.types.Binary
+        return base64.b64encode(value.value).decode('ascii')
+    return str(value)
+
+
+# Built once instead of on every json.dumps call; orjson is preferred when the
+# layer bundles it. Items read from DynamoDB cannot be self-referencing, so the
+# per-container circular reference bookkeeping is skipped, and ASCII output
+# takes the encoder's fastest string path.
+_encoder = json.JSONEncoder(default=_default, check_circular=False, separators=(',', ':'))
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value):
+        """Serialize a value to a JSON string"""
+        try:
+            return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # orjson is limited to 64-bit integers; DynamoDB numbers hold up to 38 digits
+            return _encoder.encode(value)
+else:
+    def dumps(value):
+        """Serialize a value to a JSON string"""
+        return _encoder.encode(value)
+
+
+def json_response(status_code, body, headers=None):
+    """Build an API Gateway proxy response with a JSON body"""
+    return {
+        'statusCode': status_code,
+        'headers': {**JSON_HEADERS, **headers} if headers else JSON_HEADERS,
+        'body': dumps(body)
+    }
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the values that identify a representation"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x1f')
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(','))
+    return etag in (candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates)
+
+
+def not_modified_response(etag):
+    """Build a 304 Not Modified response; no body is serialized"""
+    return {
+        'statusCode': 304,
+        'headers': {**JSON_HEADERS, 'ETag': etag, 'Access-Control-Expose-Headers': 'ETag'},
+        'body': ''
+    }
+
+
+def error_response(status_code, message):
+    """Build an API Gateway proxy response for an error message"""
+    return json_response(status_code, {'error': message})
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the supported Content-Encoding with the highest quality value in an
+    Accept-Encoding header; on a tie br (when available) is preferred to gzip.
+    """
+    accepted = {}
+    for part in (accept_encoding or '').lower().split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            accepted[coding.strip()] = quality
+
+    supported = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress_body(data, encoding):
+    """Compress encoded body bytes with the negotiated Content-Encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_response(response, accept_encoding, min_bytes=COMPRESSION_MIN_BYTES):
+    """
+    Compress an API Gateway proxy response body when the client accepts it.
+    The compressed body is base64 encoded and flagged with isBase64Encoded
+    so API Gateway returns it as binary.
+    """
+    body = response.get('body') if isinstance(response, dict) else None
+    if not body or response.get('isBase64Encoded') or len(body) < min_bytes:
+        return response
+
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    data = body.encode('utf-8')
+    if len(data) < min_bytes:
+        return response
+
+    return {
+        **response,
+        'headers': {**response.get('headers', {}), 'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'},
+        'body': base64.b64encode(compress_body(data, encoding)).decode('ascii'),
+        'isBase64Encoded': True
+    }
@@ -0,0 +1,154 @@
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+
+# Counter items live in the stats table under (statType, statKey):
+#   ('status', 'pending')    -> orders currently in that status
+#   ('day', '2025-01-18')    -> orders created on that UTC day
+STATUS_STATS = 'status'
+DAY_STATS = 'day'
+# Markers of applied stream record groups, expired by TTL:
+#   ('applied', <eventID of the group's first record>) -> lastSequence
+APPLIED_STATS = 'applied'
+# Longer than the 24 h a stream record can be redelivered for
+APPLIED_TTL_SECONDS = 2 * 24 * 60 * 60
+# TransactWriteItems limit: the counters of a group plus its marker
+MAX_TRANSACTION_ITEMS = 100
+
+
+def _image_value(image, name):
+    """Read a string or number attribute from a DynamoDB Stream image"""
+    value = (image or {}).get(name) or {}
+    if 'N' in value:
+        return Decimal(value['N'])
+    return value.get('S')
+
+
+def _contributions(image):
+    """Counter keys an order image contributes to, with the amount it adds"""
+    if not image:
+        return []
+
+    amount = _image_value(image, 'amount')
+    amount = amount if isinstance(amount, Decimal) else Decimal(0)
+    keys = []
+
+    status = _image_value(image, 'status')
+    if status:
+        keys.append((STATUS_STATS, status))
+
+    # createdDay is write-sharded (YYYY-MM-DD#n); the day is its first 10 chars
+    day = (_image_value(image, 'createdDay') or _image_value(image, 'createdAt') or '')[:10]
+    if day:
+        keys.append((DAY_STATS, day))
+
+    return [(key, amount) for key in keys]
+
+
+def collect_stat_deltas(records):
+    """
+    Fold DynamoDB Stream records into per-counter (count, revenue) deltas.
+
+    Each record removes what its old image contributed and adds what its new
+    image contributes, so INSERT, MODIFY (status or amount changes) and
+    REMOVE all reduce to the same arithmetic. Deltas are coalesced across the
+    batch: one counter update per key instead of one per record.
+    """
+    deltas = defaultdict(lambda: [0, Decimal(0)])
+
+    for record in records:
+        if record.get('eventSource') != 'aws:dynamodb':
+            continue
+        images = record.get('dynamodb', {})
+        for sign, image in ((-1, images.get('OldImage')), (1, images.get('NewImage'))):
+            for key, amount in _contributions(image):
+                deltas[key][0] += sign
+                deltas[key][1] += sign * amount
+
+    return {key: tuple(delta) for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def apply_stat_deltas(table, deltas):
+    """Apply coalesced deltas to the stats table with atomic ADD updates"""
+    for (stat_type, stat_key), (count, revenue) in deltas.items():
+        table.update_item(
+            Key={'statType': stat_type, 'statKey': stat_key},
+            UpdateExpression='ADD orderCount :count, revenue :revenue',
+            ExpressionAttributeValues={':count': count, ':revenue': revenue}
+        )
+
+
+def sequence_number(record):
+    return int(record['dynamodb']['SequenceNumber'])
+
+
+def first_stat_group(records, max_counters=MAX_TRANSACTION_ITEMS - 1):
+    """Leading records whose counter updates fit in one transaction with the group's marker"""
+    keys = set()
+    for index, record in enumerate(records):
+        keys |= set(collect_stat_deltas([record]))
+        if index and len(keys) > max_counters:
+            return records[:index]
+    return records
+
+
+def apply_stat_group(table, group):
+    """
+    Apply the coalesced deltas of consecutive stream records in one
+    transaction, together with a marker keyed by the group's first record.
+    A redelivered group finds its marker and is not counted twice.
+    Returns the sequence number up to which the records are applied.
+    """
+    last_sequence = sequence_number(group[-1])
+    deltas = collect_stat_deltas(group)
+    if not deltas:
+        return last_sequence
+
+    marker_key = {'statType': APPLIED_STATS, 'statKey': group[0]['eventID']}
+    actions = [{'Put': {
+        'TableName': table.name,
+        'Item': {**marker_key, 'lastSequence': last_sequence, 'expiresAt': int(time.time()) + APPLIED_TTL_SECONDS},
+        'ConditionExpression': 'attribute_not_exists(statKey)'
+    }}]
+    actions.extend({'Update': {
+        'TableName': table.name,
+        'Key': {'statType': stat_type, 'statKey': stat_key},
+        'UpdateExpression': 'ADD orderCount :count, revenue :revenue',
+        'ExpressionAttributeValues': {':count': count, ':revenue': revenue}
+    }} for (stat_type, stat_key), (count, revenue) in deltas.items())
+
+    try:
+        table.meta.client.transact_write_items(TransactItems=actions)
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons') or [{}]
+        if reasons[0].get('Code') != 'ConditionalCheckFailed':
+            raise
+        # Replay: these records were applied (possibly as part of a longer group)
+        marker = table.get_item(Key=marker_key, ConsistentRead=True)['Item']
+        return int(marker['lastSequence'])
+    return last_sequence
+
+
+def apply_stream_records(table, records):
+    """
+    Apply a stream batch to the counters, group by group, exactly once.
+    Returns the SequenceNumber of the first record that could not be
+    applied (to report as the batch item failure), or None.
+    """
+    pending = [record for record in records if record.get('eventSource') == 'aws:dynamodb']
+    while pending:
+        group = first_stat_group(pending)
+        try:
+            applied_to = apply_stat_group(table, group)
+        except Exception as e:
+            print(f"Error applying order stats: {str(e)}")
+            return group[0]['dynamodb']['SequenceNumber']
+        pending = [record for record in pending if sequence_number(record) > applied_to]
+    return None
+
+
+def format_counter(item):
+    """Public representation of a counter item"""
+    return {'count': item.get('orderCount', 0), 'revenue': item.get('revenue', 0)}
@@ -0,0 +1,54 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_write import chunked
+from orders_common.dynamodb import backoff_delay, note_throttle
+
+BATCH_GET_SIZE = 100  # DynamoDB BatchGetItem limit
+BATCH_GET_WORKERS = int(os.environ.get('BATCH_GET_WORKERS', 4))
+BATCH_GET_MAX_RETRIES = int(os.environ.get('BATCH_GET_MAX_RETRIES', 6))
+
+
+def _get_chunk(client, table_name, keys, max_retries, read_kwargs):
+    items = []
+    request = dict(read_kwargs, Keys=keys)
+
+    for attempt in range(max_retries + 1):
+        # Errors propagate: the caller maps throttling to 429 / 503
+        response = client.batch_get_item(RequestItems={table_name: request})
+        items.extend(response.get('Responses', {}).get(table_name, []))
+        request = response.get('UnprocessedKeys', {}).get(table_name)
+        if not request:
+            return items, []
+        # Unprocessed keys are DynamoDB throttling the batch
+        note_throttle()
+        if attempt < max_retries:
+            time.sleep(backoff_delay(attempt))
+
+    return items, request['Keys']
+
+
+def batch_get_items(table, keys, max_workers=BATCH_GET_WORKERS, max_retries=BATCH_GET_MAX_RETRIES, **read_kwargs):
+    """
+    Read items by primary key with BatchGetItem in 100-key chunks.
+
+    Chunks are read concurrently and UnprocessedKeys are retried with
+    jittered backoff. Returns (items, unprocessed keys): the keys DynamoDB
+    still had not served once retries are exhausted. BatchGetItem returns
+    items in no particular order; callers match them back to their keys.
+    Extra read_kwargs (for example ProjectionExpression) apply to every chunk.
+    """
+    if not keys:
+        return [], []
+
+    client = table.meta.client
+    chunks = chunked(keys, BATCH_GET_SIZE)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        results = list(executor.map(
+            lambda chunk: _get_chunk(client, table.name, chunk, max_retries, read_kwargs), chunks
+        ))
+    items = [item for chunk_items, _ in results for item in chunk_items]
+    unprocessed = [key for _, chunk_keys in results for key in chunk_keys]
+    return items, unprocessed
@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+from orders_common.dynamodb import backoff_delay, note_throttle
+
+BATCH_WRITE_SIZE = 25  # DynamoDB BatchWriteItem limit
+BATCH_WRITE_WORKERS = int(os.environ.get('BATCH_WRITE_WORKERS', 4))
+BATCH_WRITE_MAX_RETRIES = int(os.environ.get('BATCH_WRITE_MAX_RETRIES', 6))
+
+
+def chunked(items, size):
+    """Split a list into consecutive chunks of at most size elements"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _write_chunk(client, table_name, chunk, max_retries, budget=None):
+    requests = [{'PutRequest': {'Item': item}} for item in chunk]
+    extra = {'ReturnConsumedCapacity': 'TOTAL'} if budget else {}
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.batch_write_item(RequestItems={table_name: requests}, **extra)
+        except ClientError as e:
+            print(f"Error writing batch chunk: {str(e)}")
+            break
+        if budget:
+            # Includes the capacity consumed by GSI updates
+            budget.consume(sum(entry.get('CapacityUnits', 0) for entry in response.get('ConsumedCapacity', [])))
+        requests = response.get('UnprocessedItems', {}).get(table_name, [])
+        if not requests:
+            return []
+        # Unprocessed items are DynamoDB throttling the batch
+        note_throttle()
+        if attempt < max_retries:
+            time.sleep(backoff_delay(attempt))
+
+    return [request['PutRequest']['Item'] for request in requests]
+
+
+def batch_put_items(table, items, max_workers=BATCH_WRITE_WORKERS, max_retries=BATCH_WRITE_MAX_RETRIES,
+                    capacity_budget=None):
+    """
+    Write items with BatchWriteItem in 25-item chunks, several chunks at once.
+
+    UnprocessedItems are retried with jittered exponential backoff. Returns
+    the items that still could not be written once retries are exhausted.
+    capacity_budget (a parallel_scan.CapacityBudget) is debited with the
+    write capacity each call consumed, pacing all workers to its rate.
+    """
+    if not items:
+        return []
+
+    client = table.meta.client
+    chunks = chunked(items, BATCH_WRITE_SIZE)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        results = executor.map(lambda chunk: _write_chunk(client, table.name, chunk, max_retries, capacity_budget), chunks)
+        return [item for unprocessed in results for item in unprocessed]
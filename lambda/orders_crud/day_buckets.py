@@ -0,0 +1,20 @@
+import os
+
+from status_shards import order_shard
+
+# Write shards per UTC day on CreatedDayIndex: a day's inserts are spread
+# over createdDay = "<YYYY-MM-DD>#<0..CREATED_DAY_SHARDS-1>" instead of
+# all landing on one index partition
+CREATED_DAY_SHARDS = int(os.environ.get('CREATED_DAY_SHARDS', 4))
+
+
+def created_day_key(order_id, created_at, shards=None):
+    """CreatedDayIndex key of an order, e.g. ``2025-01-18#3``"""
+    shards = CREATED_DAY_SHARDS if shards is None else shards
+    return f"{created_at[:10]}#{order_shard(order_id, shards)}"
+
+
+def created_day_partitions(day, shards=None):
+    """Every index partition key holding orders created on one day"""
+    shards = CREATED_DAY_SHARDS if shards is None else shards
+    return [f"{day}#{shard}" for shard in range(shards)]
@@ -0,0 +1,96 @@
+import heapq
+import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from pagination import MAX_PAGE_FETCHES
+
+FANOUT_WORKERS = int(os.environ.get('FANOUT_WORKERS', 8))
+
+
+class _Newest:
+    """Heap key that pops the newest (largest) sort value first"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class PartitionStream:
+    """Buffered, newest-first reader over one index partition"""
+
+    def __init__(self, fetch_page, start_key):
+        self.fetch_page = fetch_page
+        self.next_key = start_key
+        self.items = deque()
+        self.fetches = 0
+
+    @property
+    def exhausted(self):
+        return not self.items and self.fetches > 0 and not self.next_key
+
+    def fill(self, limit):
+        """Read pages until an item is buffered, the partition ends or the fetch budget is spent"""
+        while not self.items and not self.exhausted and self.fetches < MAX_PAGE_FETCHES:
+            response = self.fetch_page(limit, self.next_key)
+            self.fetches += 1
+            self.items.extend(response.get('Items', []))
+            self.next_key = response.get('LastEvaluatedKey')
+
+
+def merge_partitions(fetchers, positions, page_size, sort_key, resume_key, max_workers=FANOUT_WORKERS):
+    """
+    Read one page across several index partitions, newest first.
+
+    fetchers maps a partition name to fetch_page(limit, exclusive_start_key),
+    which must return its items in descending sort order. positions maps each
+    partition still to be read to its ExclusiveStartKey (None for the start).
+    The first page of every partition is fetched in parallel, sized to the
+    partition's even share of the page plus one; a partition that runs dry
+    during the heap k-way merge (by sort_key(item)) is refilled with what the
+    page still needs, so skewed partitions cost an extra round trip instead
+    of every partition reading a whole page up front.
+
+    Returns (items, positions): the new positions hold resume_key(item) of the
+    last item taken from each partition, so the next page resumes exactly
+    where this one stopped. Exhausted partitions are dropped; an empty dict
+    means the listing is complete.
+    """
+    streams = {name: PartitionStream(fetchers[name], start_key) for name, start_key in positions.items()}
+    if not streams:
+        return [], {}
+
+    first_limit = min(page_size, math.ceil(page_size / len(streams)) + 1)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(streams)))) as executor:
+        list(executor.map(lambda stream: stream.fill(first_limit), streams.values()))
+
+    heap = [(_Newest(sort_key(stream.items[0])), name) for name, stream in streams.items() if stream.items]
+    heapq.heapify(heap)
+
+    items = []
+    positions = dict(positions)
+    while heap and len(items) < page_size:
+        _, name = heapq.heappop(heap)
+        stream = streams[name]
+        item = stream.items.popleft()
+        items.append(item)
+        positions[name] = resume_key(item)
+
+        if len(items) < page_size:
+            stream.fill(page_size - len(items))
+        if stream.items:
+            heapq.heappush(heap, (_Newest(sort_key(stream.items[0])), name))
+
+    for name, stream in streams.items():
+        if stream.exhausted:
+            del positions[name]
+
+    return items, positions
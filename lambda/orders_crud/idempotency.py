@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+import time
+import zlib
+
+from boto3.dynamodb.types import Binary
+from botocore.exceptions import ClientError
+
+from orders_common.responses import JSON_HEADERS, error_response
+
+# How long a completed response is replayed for (DynamoDB TTL on expiresAt)
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60))
+# How long an in-flight request holds its key; longer than the function timeout
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+
+KEY_PATTERN = re.compile(r'^[\x21-\x7e]{1,255}$')
+
+IN_PROGRESS = 'IN_PROGRESS'
+COMPLETED = 'COMPLETED'
+
+
+def parse_idempotency_key(value):
+    """Validate an Idempotency-Key header value"""
+    if not KEY_PATTERN.match(value or ''):
+        raise ValueError('Idempotency-Key must be 1 to 255 printable ASCII characters')
+    return value
+
+
+def request_fingerprint(raw_body):
+    """Digest of the request body, to detect a key reused for a different request"""
+    return hashlib.sha256((raw_body or '').encode('utf-8')).hexdigest()[:32]
+
+
+def _is_conditional_check_failure(error):
+    return error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+def _replay(record):
+    """Rebuild the stored response of a completed request"""
+    body = zlib.decompress(bytes(record['body'].value)).decode('utf-8') if 'body' in record else ''
+    return {
+        'statusCode': int(record['statusCode']),
+        'headers': {**JSON_HEADERS, 'Idempotent-Replayed': 'true'},
+        'body': body
+    }
+
+
+def idempotent_call(table, key, fingerprint, operation, now=None):
+    """
+    Run operation() at most once per idempotency key.
+
+    The key is claimed with a conditional put of a small IN_PROGRESS record.
+    When the claim succeeds the operation runs and its response is stored
+    (status code plus zlib-compressed body) with a TTL; when it fails the
+    stored response is replayed without touching the write path. Server
+    errors release the key so the client can retry.
+    """
+    now = int(time.time()) if now is None else now
+
+    try:
+        table.put_item(
+            Item={
+                'idempotencyKey': key,
+                'state': IN_PROGRESS,
+                'fingerprint': fingerprint,
+                'expiresAt': now + IDEMPOTENCY_LOCK_SECONDS
+            },
+            ConditionExpression='attribute_not_exists(idempotencyKey) OR expiresAt < :now',
+            ExpressionAttributeValues={':now': now}
+        )
+    except ClientError as e:
+        if not _is_conditional_check_failure(e):
+            raise
+        record = table.get_item(Key={'idempotencyKey': key}, ConsistentRead=True).get('Item')
+        if record is None:
+            # Expired and removed in between: the caller may simply retry
+            return error_response(409, 'Request with this Idempotency-Key is being processed, retry later')
+        if record.get('fingerprint') != fingerprint:
+            return error_response(422, 'Idempotency-Key was already used for a different request')
+        if record.get('state') != COMPLETED:
+            return error_response(409, 'Request with this Idempotency-Key is being processed, retry later')
+        return _replay(record)
+
+    try:
+        response = operation()
+    except Exception:
+        table.delete_item(Key={'idempotencyKey': key})
+        raise
+
+    if response['statusCode'] >= 500:
+        table.delete_item(Key={'idempotencyKey': key})
+        return response
+
+    try:
+        table.put_item(Item={
+            'idempotencyKey': key,
+            'state': COMPLETED,
+            'fingerprint': fingerprint,
+            'statusCode': response['statusCode'],
+            'body': Binary(zlib.compress(response.get('body', '').encode('utf-8'))),
+            'expiresAt': now + IDEMPOTENCY_TTL_SECONDS
+        })
+    except ClientError as e:
+        # The write already happened; keep the claim so a retry cannot duplicate it
+        print(f"Error storing idempotent response: {str(e)}")
+
+    return response
@@ -1,34 +1,124 @@
+import base64
 import json
-import boto3
-import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 import os
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['DYNAMODB_TABLE'])
+from pagination import MAX_PAGE_FETCHES, collect_page, decode_cursor, encode_cursor, parse_page_size
+from parallel_scan import DEFAULT_SEGMENTS, new_scan_state, scan_page
+from batch_write import batch_put_items
+from batch_get import BATCH_GET_WORKERS, batch_get_items
+from day_buckets import CREATED_DAY_SHARDS, created_day_partitions
+from fanout import merge_partitions
+from idempotency import idempotent_call, parse_idempotency_key, request_fingerprint
+from order_cache import OrderCache
+from order_ids import created_at_from_order_id
+from order_model import (
+    CUSTOMER_EMAIL_ATTRIBUTE, CUSTOMER_INDEX, build_order, normalize_email, parse_amount, parse_timestamp,
+    validate_order_data
+)
+from status_shards import (
+    SHARDED_STATUS_ATTRIBUTE, STATUS_SHARDS, sharding_enabled, status_index, status_partitions, status_shard_key
+)
+from projection import merge_projection, parse_fields, project_item, projection_kwargs, with_version_fields
+from orders_common.clients import Lazy, prime
+from orders_common.dynamodb import capacity_error_response, dynamodb_resource
+from orders_common.metrics import record_invocation
+from orders_common.profiling import profile_invocations
+from orders_common.stats import DAY_STATS, STATUS_STATS, format_counter
+from orders_common.responses import (
+    compress_response, error_response, etag_matches, json_response, make_etag, not_modified_response
+)
 
+# AWS clients are built on first use; DynamoDB calls share an adaptive rate
+# limiter and retry policy
+dynamodb = Lazy(dynamodb_resource)
+table = Lazy(lambda: dynamodb.Table(os.environ['DYNAMODB_TABLE']))
+stats_table = Lazy(lambda: dynamodb.Table(os.environ.get('STATS_TABLE', f"{os.environ['DYNAMODB_TABLE']}-stats")))
+idempotency_table = Lazy(lambda: dynamodb.Table(
+    os.environ.get('IDEMPOTENCY_TABLE', f"{os.environ['DYNAMODB_TABLE']}-idempotency")
+))
+
+# Opt-in: build the client and open its connection during init
+prime(lambda: table.get_item(Key={'orderId': 'ORD-PRIME', 'createdAt': '0'}, ProjectionExpression='orderId'))
+
+# Read-through cache of single orders, kept across warm invocations
+order_cache = OrderCache()
+
+MAX_BATCH_ORDERS = int(os.environ.get('MAX_BATCH_ORDERS', 5000))
+MAX_BATCH_GET_IDS = int(os.environ.get('MAX_BATCH_GET_IDS', 100))
+MAX_RANGE_DAYS = int(os.environ.get('MAX_RANGE_DAYS', 366))
+MAX_STATUS_FILTERS = int(os.environ.get('MAX_STATUS_FILTERS', 10))
+MAX_EMAIL_LENGTH = 254
+STATS_DEFAULT_DAYS = int(os.environ.get('STATS_DEFAULT_DAYS', 30))
+
+@record_invocation
+@profile_invocations
 def lambda_handler(event, context):
     """
     Lambda function to handle CRUD operations for orders
     """
+    response = route_request(event)
+    return compress_response(response, request_header(event, 'Accept-Encoding'))
+
+def request_header(event, name):
+    """Read a request header case-insensitively"""
+    name = name.lower()
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def route_request(event):
+    """Dispatch an API Gateway request to the matching operation"""
     try:
         http_method = event['httpMethod']
         path_parameters = event.get('pathParameters') or {}
-        body = json.loads(event.get('body', '{}')) if event.get('body') else {}
+        raw_body = event.get('body')
+        if raw_body and event.get('isBase64Encoded'):
+            raw_body = base64.b64decode(raw_body).decode('utf-8')
+        body = json.loads(raw_body) if raw_body else {}
         query_parameters = event.get('queryStringParameters') or {}
         
         if http_method == 'GET':
-            if path_parameters.get('orderId'):
+            if event.get('resource') == '/orders/stats':
+                # Aggregated counters maintained from the change stream
+                return get_order_stats(query_parameters)
+            elif path_parameters.get('orderId'):
                 # Get single order
-                return get_order(path_parameters['orderId'])
+                return get_order(
+                    path_parameters['orderId'], query_parameters.get('fields'),
+                    request_header(event, 'If-None-Match')
+                )
+            elif query_parameters.get('ids'):
+                # Get many orders by ID
+                return get_orders_batch(query_parameters['ids'], query_parameters.get('fields'))
             else:
                 # List orders
-                return list_orders(query_parameters)
+                return list_orders(query_parameters, request_header(event, 'If-None-Match'))
         
         elif http_method == 'POST':
-            # Create new order
-            return create_order(body)
+            if event.get('resource') == '/orders/batch':
+                # Create many orders at once
+                operation = lambda: create_orders_batch(body)
+            else:
+                # Create new order
+                operation = lambda: create_order(body)
+            
+            idempotency_key = request_header(event, 'Idempotency-Key')
+            if idempotency_key is None:
+                return operation()
+            
+            # Retried requests replay the stored response instead of writing again
+            try:
+                idempotency_key = parse_idempotency_key(idempotency_key)
+            except ValueError as e:
+                return error_response(400, str(e))
+            return idempotent_call(
+                idempotency_table, idempotency_scope(event, idempotency_key),
+                request_fingerprint(raw_body), operation
+            )
         
         elif http_method == 'PUT':
             # Update order
@@ -39,129 +129,554 @@ def lambda_handler(event, context):
             return delete_order(path_parameters['orderId'])
         
         else:
-            return {
-                'statusCode': 405,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Method not allowed'})
-            }
+            return error_response(405, 'Method not allowed')
     
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        # Throttled or unavailable DynamoDB: tell the client to back off and retry
+        return capacity_error_response(e) or error_response(500, 'Internal server error')
+
+def idempotency_scope(event, idempotency_key):
+    """Store key for an Idempotency-Key: per caller and per endpoint"""
+    principal = ((event.get('requestContext') or {}).get('authorizer') or {}).get('principalId', '')
+    return f"{principal}#{event.get('resource') or '/orders'}#{idempotency_key}"
+
+def order_version(order):
+    """Version marker of an order: bumped by every update"""
+    return order.get('updatedAt') or order.get('createdAt', '')
 
-def get_order(order_id):
-    """Get a single order by ID"""
+def cached_order(order_id):
+    """
+    Cached copy of an order, or None. Entries due for a version check are
+    compared with the table's updatedAt (a key-only GetItem projecting one
+    attribute) and dropped when another container has changed the order.
+    """
+    order, check_due = order_cache.lookup(order_id)
+    if order is None or not check_due:
+        return order
+    
+    current = table.get_item(
+        Key={'orderId': order['orderId'], 'createdAt': order['createdAt']},
+        ProjectionExpression='updatedAt'
+    ).get('Item')
+    if current is not None and current.get('updatedAt') == order.get('updatedAt'):
+        order_cache.verified(order_id)
+        return order
+    
+    order_cache.invalidate(order_id)
+    return None
+
+def get_order(order_id, fields_parameter=None, if_none_match=None):
+    """
+    Get a single order by ID, served from the warm-container cache when possible.
+    Answers 304 without a body when If-None-Match still matches the order's ETag.
+    """
     try:
-        response = table.query(
-            KeyConditionExpression='orderId = :order_id',
-            ExpressionAttributeValues={':order_id': order_id}
-        )
+        try:
+            fields = parse_fields(fields_parameter)
+        except ValueError as e:
+            return error_response(400, str(e))
         
-        if response['Items']:
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(response['Items'][0], default=str)
-            }
-        else:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Order not found'})
-            }
+        order = cached_order(order_id)
+        cache_status = 'HIT' if order is not None else 'MISS'
+        
+        if order is None:
+            # Only whole items are cached; projected reads go straight to the table
+            response = table.query(**merge_projection({
+                'KeyConditionExpression': 'orderId = :order_id',
+                'ExpressionAttributeValues': {':order_id': order_id}
+            }, with_version_fields(fields)))
+            if response['Items']:
+                order = response['Items'][0]
+                if not fields:
+                    order_cache.put(order_id, order)
+        
+        if order is None:
+            return error_response(404, 'Order not found')
+        
+        etag = make_etag(order_id, order_version(order), fields_parameter or '')
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+        
+        return json_response(200, project_item(order, fields), {
+            'X-Cache': cache_status,
+            'ETag': etag,
+            'Access-Control-Expose-Headers': 'ETag'
+        })
     
     except Exception as e:
         print(f"Error getting order: {str(e)}")
         raise
 
-def list_orders(query_parameters):
-    """List orders with optional filtering"""
+def resolve_order_key(order_id, created_at=None):
+    """
+    Resolve the full primary key (orderId + createdAt) of an order.
+    New order IDs encode their createdAt, so only legacy IDs without an
+    explicit createdAt need a keys-only query.
+    """
+    created_at = created_at_from_order_id(order_id) or created_at
+    if created_at:
+        return {'orderId': order_id, 'createdAt': created_at}
+    
+    response = table.query(
+        KeyConditionExpression='orderId = :order_id',
+        ExpressionAttributeValues={':order_id': order_id},
+        ProjectionExpression='orderId, createdAt',
+        Limit=1
+    )
+    if not response['Items']:
+        return None
+    
+    item = response['Items'][0]
+    return {'orderId': item['orderId'], 'createdAt': item['createdAt']}
+
+def resolve_order_keys(order_ids):
+    """Resolve many order IDs to full primary keys, querying only legacy IDs"""
+    keys = {}
+    legacy_ids = []
+    for order_id in order_ids:
+        created_at = created_at_from_order_id(order_id)
+        if created_at:
+            keys[order_id] = {'orderId': order_id, 'createdAt': created_at}
+        else:
+            legacy_ids.append(order_id)
+    
+    if legacy_ids:
+        client = table.meta.client
+        
+        def resolve(order_id):
+            response = client.query(
+                TableName=table.name,
+                KeyConditionExpression='orderId = :order_id',
+                ExpressionAttributeValues={':order_id': order_id},
+                ProjectionExpression='orderId, createdAt',
+                Limit=1
+            )
+            items = response.get('Items', [])
+            return items[0] if items else None
+        
+        with ThreadPoolExecutor(max_workers=BATCH_GET_WORKERS) as executor:
+            keys.update((key['orderId'], key) for key in executor.map(resolve, legacy_ids) if key)
+    
+    return keys
+
+def is_conditional_check_failure(error):
+    """Whether a ClientError was raised by a failed ConditionExpression"""
+    return error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+def get_orders_batch(ids_parameter, fields_parameter=None):
+    """Get many orders at once using BatchGetItem, keeping the requested order"""
+    try:
+        try:
+            fields = parse_fields(fields_parameter)
+        except ValueError as e:
+            return error_response(400, str(e))
+        
+        # Parse and de-duplicate the requested IDs, preserving their order
+        order_ids = list(dict.fromkeys(order_id.strip() for order_id in ids_parameter.split(',') if order_id.strip()))
+        
+        if not order_ids or len(order_ids) > MAX_BATCH_GET_IDS:
+            return error_response(400, f'ids must list 1 to {MAX_BATCH_GET_IDS} order IDs')
+        
+        keys = resolve_order_keys(order_ids)
+        items, unprocessed_keys = batch_get_items(table, list(keys.values()), **projection_kwargs(fields))
+        found = {item['orderId']: item for item in items}
+        # Still throttled after the retries: unknown, not missing; the client may ask again
+        unprocessed = {key['orderId'] for key in unprocessed_keys}
+        
+        orders = [found[order_id] for order_id in order_ids if order_id in found]
+        not_found = [order_id for order_id in order_ids if order_id not in found and order_id not in unprocessed]
+        
+        return json_response(200, {
+            'orders': orders,
+            'count': len(orders),
+            'notFound': not_found,
+            'unprocessed': [order_id for order_id in order_ids if order_id in unprocessed]
+        })
+    
+    except Exception as e:
+        print(f"Error getting orders batch: {str(e)}")
+        raise
+
+def parse_created_range(query_parameters):
+    """Parse the optional from/to creation-time window of a listing"""
+    created_from = query_parameters.get('from')
+    created_to = query_parameters.get('to')
+    if not created_from and not created_to:
+        return None
+    if not created_from:
+        raise ValueError('from is required when to is given')
+    
+    created_from = parse_timestamp(created_from)
+    created_to = parse_timestamp(created_to) if created_to else datetime.now(timezone.utc).isoformat()
+    
+    span = datetime.fromisoformat(created_to) - datetime.fromisoformat(created_from)
+    if span < timedelta(0) or span > timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f'from/to must span 0 to {MAX_RANGE_DAYS} days')
+    
+    return created_from, created_to
+
+def created_day_query_kwargs(partition, created_from, created_to):
+    """Query arguments for one CreatedDayIndex partition (``day#shard``), newest first"""
+    return {
+        'IndexName': 'CreatedDayIndex',
+        'KeyConditionExpression': 'createdDay = :day AND createdAt BETWEEN :from AND :to',
+        'ExpressionAttributeValues': {':day': partition, ':from': created_from, ':to': created_to},
+        'ScanIndexForward': False  # Most recent first
+    }
+
+def list_created_range(page_size, cursor, created_from, created_to, fields=None):
+    """
+    Page through orders created in a time window, newest first.
+    Reads CreatedDayIndex one day at a time with a createdAt key range, so
+    the cost is proportional to the orders in the window, not the table.
+    Each day is write-sharded; its shards are queried in parallel and merged
+    newest-first. The cursor holds the day and the index key of the last
+    order returned from each of its shards.
+    """
+    first_day = created_from[:10]
+    day = cursor['d'] if cursor else created_to[:10]
+    positions = cursor.get('p') if cursor else None
+    orders = []
+    
+    for _ in range(MAX_PAGE_FETCHES):
+        if positions is None:
+            positions = {partition: None for partition in created_day_partitions(day)}
+        fetchers = {
+            partition: partition_fetcher(created_day_query_kwargs(partition, created_from, created_to), fields)
+            for partition in positions
+        }
+        items, positions = merge_partitions(
+            fetchers, positions, page_size - len(orders),
+            sort_key=lambda order: order['createdAt'],
+            resume_key=lambda order: {key: order[key] for key in ('orderId', 'createdAt', 'createdDay')}
+        )
+        orders.extend(items)
+        
+        if not positions:
+            # Every shard of the day is exhausted, continue with the previous day
+            day = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+            positions = None
+            if day < first_day:
+                return orders, None
+        
+        if len(orders) >= page_size:
+            break
+    
+    return orders, {'d': day, 'p': positions}
+
+def parse_statuses(value):
+    """Parse the ``status`` query parameter: one status or a comma-separated list"""
+    statuses = []
+    for status in (value or '').split(','):
+        status = status.strip()
+        if status and status not in statuses:
+            statuses.append(status)
+    
+    if len(statuses) > MAX_STATUS_FILTERS:
+        raise ValueError(f'At most {MAX_STATUS_FILTERS} statuses can be requested')
+    return statuses
+
+def status_query_kwargs(partition, created_range):
+    """
+    Query arguments for one status index partition (a status, or a status
+    shard such as ``pending#3``), newest first, optionally within a createdAt range
+    """
+    index_name, partition_attribute = status_index()
+    key_condition = '#status = :status'
+    values = {':status': partition}
+    if created_range:
+        key_condition += ' AND createdAt BETWEEN :from AND :to'
+        values[':from'], values[':to'] = created_range
+    
+    return {
+        'IndexName': index_name,
+        'KeyConditionExpression': key_condition,
+        'ExpressionAttributeNames': {'#status': partition_attribute},
+        'ExpressionAttributeValues': values,
+        'ScanIndexForward': False  # Most recent first
+    }
+
+def parse_customer_email(value):
+    """Parse the ``customerEmail`` query parameter into its CustomerIndex key"""
+    email_key = normalize_email(value)
+    if value is not None and not email_key:
+        raise ValueError('customerEmail must not be empty')
+    if len(email_key) > MAX_EMAIL_LENGTH:
+        raise ValueError(f'customerEmail must be at most {MAX_EMAIL_LENGTH} characters')
+    return email_key
+
+def customer_query_kwargs(email_key, statuses, created_range):
+    """
+    Query arguments for one customer's orders on CustomerIndex, newest first,
+    optionally within a createdAt range. Statuses are not part of the index
+    key, so they become a filter on the customer's orders.
+    """
+    key_condition = '#customer = :customer'
+    names = {'#customer': CUSTOMER_EMAIL_ATTRIBUTE}
+    values = {':customer': email_key}
+    if created_range:
+        key_condition += ' AND createdAt BETWEEN :from AND :to'
+        values[':from'], values[':to'] = created_range
+    
+    kwargs = {
+        'IndexName': CUSTOMER_INDEX,
+        'KeyConditionExpression': key_condition,
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+        'ScanIndexForward': False  # Most recent first
+    }
+    if statuses:
+        placeholders = []
+        for position, status in enumerate(statuses):
+            values[f':s{position}'] = status
+            placeholders.append(f':s{position}')
+        names['#status'] = 'status'
+        kwargs['FilterExpression'] = f"#status IN ({', '.join(placeholders)})"
+    return kwargs
+
+def query_fetcher(query_kwargs, fields=None):
+    """fetch_page(limit, exclusive_start_key) for collect_page over one table query"""
+    def fetch_page(limit, exclusive_start_key):
+        kwargs = dict(query_kwargs, Limit=limit)
+        if exclusive_start_key:
+            kwargs['ExclusiveStartKey'] = exclusive_start_key
+        return table.query(**merge_projection(kwargs, fields))
+    return fetch_page
+
+def partition_fetcher(query_kwargs, fields=None):
+    """
+    fetch_page(limit, exclusive_start_key) over one index partition for
+    merge_partitions; goes through the client, which is safe to share
+    between the fan-out threads
+    """
+    client = table.meta.client
+    
+    def fetch_page(limit, exclusive_start_key):
+        kwargs = dict(query_kwargs, TableName=table.name, Limit=limit)
+        if exclusive_start_key:
+            kwargs['ExclusiveStartKey'] = exclusive_start_key
+        return client.query(**merge_projection(kwargs, fields))
+    return fetch_page
+
+def list_statuses(statuses, page_size, positions, created_range, fields=None):
+    """
+    List orders in several statuses, or in the write shards of a status:
+    one index query per partition runs in parallel and the partitions are
+    merged newest-first. The cursor holds the index key of the last order
+    returned from every partition.
+    """
+    partition_attribute = status_index()[1]
+    partitions = [partition for status in statuses for partition in status_partitions(status)]
+    
+    if positions is None:
+        positions = {partition: None for partition in partitions}
+    
+    return merge_partitions(
+        {partition: partition_fetcher(status_query_kwargs(partition, created_range), fields) for partition in partitions},
+        positions,
+        page_size,
+        sort_key=lambda order: order['createdAt'],
+        resume_key=lambda order: {key: order[key] for key in ('orderId', 'createdAt', partition_attribute)}
+    )
+
+def list_orders(query_parameters, if_none_match=None):
+    """
+    List orders with optional customer, status (one or several) and time
+    filtering, paginated through an opaque nextToken.
+    Each page carries an ETag built from the orders' versions, so an unchanged
+    page is answered with 304 instead of being serialized again.
+    """
     try:
         # Parse query parameters
-        status = query_parameters.get('status')
-        limit = int(query_parameters.get('limit', 50))
-        
-        if status:
-            # Query by status using GSI
-            response = table.query(
-                IndexName='StatusIndex',
-                KeyConditionExpression='#status = :status',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={':status': status},
-                Limit=limit,
-                ScanIndexForward=False  # Most recent first
+        try:
+            customer = parse_customer_email(query_parameters.get('customerEmail'))
+            statuses = parse_statuses(query_parameters.get('status'))
+            created_range = parse_created_range(query_parameters)
+            if customer:
+                scope = f"customer:{customer}"
+                if statuses:
+                    scope += f":status:{','.join(statuses)}"
+            elif statuses:
+                scope = f"status:{','.join(statuses)}"
+                if sharding_enabled():
+                    scope += f"#{STATUS_SHARDS}"
+            elif created_range:
+                scope = f"created#{CREATED_DAY_SHARDS}"
+            else:
+                scope = f"scan:{DEFAULT_SEGMENTS}"
+            if created_range:
+                scope += f":{query_parameters.get('from')}:{query_parameters.get('to', '')}"
+            
+            page_size = parse_page_size(query_parameters.get('limit'))
+            start_key = decode_cursor(query_parameters.get('nextToken'), scope)
+            fields = parse_fields(query_parameters.get('fields'))
+        except ValueError as e:
+            return error_response(400, str(e))
+        
+        # Projected reads still fetch updatedAt so the page ETag can be computed
+        read_fields = with_version_fields(fields)
+        
+        if customer:
+            # Query one customer's orders on CustomerIndex: the cost follows
+            # the customer's order count, not the table size
+            orders, last_key = collect_page(
+                query_fetcher(customer_query_kwargs(customer, statuses, created_range), read_fields),
+                page_size, start_key
+            )
+        elif len(statuses) > 1 or (statuses and sharding_enabled()):
+            # Fan out one index query per status (and write shard) and merge
+            # newest-first; the merge also needs each order's index key for the cursor
+            read_fields = with_version_fields(fields, 'createdAt', status_index()[1])
+            orders, last_key = list_statuses(statuses, page_size, start_key, created_range, read_fields)
+        elif statuses:
+            # Query by status using GSI, optionally within a createdAt range
+            orders, last_key = collect_page(
+                query_fetcher(status_query_kwargs(statuses[0], created_range), read_fields), page_size, start_key
             )
+        elif created_range:
+            # Query by creation time using sharded day buckets; the merge
+            # also needs each order's index key for the cursor
+            read_fields = with_version_fields(fields, 'createdAt', 'createdDay')
+            orders, last_key = list_created_range(page_size, start_key, *created_range, fields=read_fields)
         else:
-            # Scan all items
-            response = table.scan(Limit=limit)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'orders': response['Items'],
-                'count': len(response['Items'])
-            }, default=str)
-        }
+            # Scan all items, reading every segment in parallel
+            orders, last_key = scan_page(
+                table, page_size, start_key or new_scan_state(DEFAULT_SEGMENTS), DEFAULT_SEGMENTS,
+                **projection_kwargs(read_fields)
+            )
+        
+        next_token = encode_cursor(last_key, scope)
+        etag = make_etag(
+            scope, query_parameters.get('fields') or '', next_token,
+            *(f"{order.get('orderId')}@{order_version(order)}" for order in orders)
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+        
+        if read_fields is not fields:
+            orders = [project_item(order, fields) for order in orders]
+        
+        return json_response(200, {
+            'orders': orders,
+            'count': len(orders),
+            'nextToken': next_token
+        }, {'ETag': etag, 'Access-Control-Expose-Headers': 'ETag'})
     
     except Exception as e:
         print(f"Error listing orders: {str(e)}")
         raise
 
+def query_all(target, **kwargs):
+    """Run a query to completion, following LastEvaluatedKey"""
+    items = []
+    while True:
+        response = target.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if not response.get('LastEvaluatedKey'):
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def get_order_stats(query_parameters):
+    """
+    Order counts and revenue per status and per creation day, read from the
+    counter items kept current by the stream aggregator instead of scanning
+    the orders table. from/to select the days (default: the last STATS_DEFAULT_DAYS).
+    """
+    try:
+        try:
+            created_range = parse_created_range(query_parameters)
+        except ValueError as e:
+            return error_response(400, str(e))
+        
+        if created_range:
+            first_day, last_day = created_range[0][:10], created_range[1][:10]
+        else:
+            today = datetime.now(timezone.utc).date()
+            first_day, last_day = (today - timedelta(days=STATS_DEFAULT_DAYS - 1)).isoformat(), today.isoformat()
+        
+        status_counters = query_all(
+            stats_table,
+            KeyConditionExpression='statType = :type',
+            ExpressionAttributeValues={':type': STATUS_STATS}
+        )
+        day_counters = query_all(
+            stats_table,
+            KeyConditionExpression='statType = :type AND statKey BETWEEN :from AND :to',
+            ExpressionAttributeValues={':type': DAY_STATS, ':from': first_day, ':to': last_day}
+        )
+        
+        by_status = {item['statKey']: format_counter(item) for item in status_counters}
+        return json_response(200, {
+            'byStatus': by_status,
+            'total': {
+                'count': sum(counter['count'] for counter in by_status.values()),
+                'revenue': sum(counter['revenue'] for counter in by_status.values())
+            },
+            'byDay': [dict(format_counter(item), day=item['statKey']) for item in day_counters],
+            'from': first_day,
+            'to': last_day
+        })
+    
+    except Exception as e:
+        print(f"Error reading order stats: {str(e)}")
+        raise
+
 def create_order(order_data):
     """Create a new order"""
     try:
-        # Generate order ID and timestamp
-        order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
-        created_at = datetime.now(timezone.utc).isoformat()
-        
         # Prepare order item
-        order = {
-            'orderId': order_id,
-            'createdAt': created_at,
-            'customerName': order_data.get('customerName', ''),
-            'customerEmail': order_data.get('customerEmail', ''),
-            'items': order_data.get('items', []),
-            'amount': float(order_data.get('amount', 0)),
-            'status': 'pending',
-            'updatedAt': created_at
-        }
+        order = build_order(order_data)
         
         # Put item in DynamoDB
         table.put_item(Item=order)
         
-        return {
-            'statusCode': 201,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(order, default=str)
-        }
+        return json_response(201, order)
     
     except Exception as e:
         print(f"Error creating order: {str(e)}")
         raise
 
+def create_orders_batch(body):
+    """Create many orders at once using BatchWriteItem"""
+    try:
+        orders_data = body.get('orders') if isinstance(body, dict) else None
+        
+        if not isinstance(orders_data, list) or not orders_data or len(orders_data) > MAX_BATCH_ORDERS:
+            return error_response(400, f'orders must be a list of 1 to {MAX_BATCH_ORDERS} orders')
+        
+        # Validate and build every order before writing anything
+        results = []
+        orders = []
+        for index, order_data in enumerate(orders_data):
+            try:
+                validate_order_data(order_data)
+                order = build_order(order_data)
+            except (TypeError, ValueError) as e:
+                results.append({'index': index, 'status': 'invalid', 'error': str(e)})
+                continue
+            
+            orders.append(order)
+            results.append({'index': index, 'status': 'created', 'orderId': order['orderId']})
+        
+        failed_ids = {item['orderId'] for item in batch_put_items(table, orders)}
+        for result in results:
+            if result.get('orderId') in failed_ids:
+                result['status'] = 'failed'
+                result['error'] = 'Write not processed, retry this order'
+        
+        created = sum(1 for result in results if result['status'] == 'created')
+        
+        return json_response(201 if created == len(results) else 207, {
+            'results': results,
+            'created': created,
+            'failed': len(results) - created
+        })
+    
+    except Exception as e:
+        print(f"Error creating orders batch: {str(e)}")
+        raise
+
 def update_order(order_id, update_data):
     """Update an existing order"""
     try:
@@ -176,6 +691,10 @@ def update_order(order_id, update_data):
         if 'status' in update_data:
             update_expression += ", #status = :status"
             expression_attribute_values[':status'] = update_data['status']
+            if sharding_enabled():
+                # Same shard as before, only the status part of the key changes
+                update_expression += f", {SHARDED_STATUS_ATTRIBUTE} = :status_shard"
+                expression_attribute_values[':status_shard'] = status_shard_key(order_id, update_data['status'])
         
         if 'customerName' in update_data:
             update_expression += ", customerName = :customer_name"
@@ -183,29 +702,37 @@ def update_order(order_id, update_data):
         
         if 'amount' in update_data:
             update_expression += ", amount = :amount"
-            expression_attribute_values[':amount'] = float(update_data['amount'])
+            expression_attribute_values[':amount'] = parse_amount(update_data['amount'])
         
         if 'items' in update_data:
             update_expression += ", items = :items"
             expression_attribute_values[':items'] = update_data['items']
         
-        # Update item
-        response = table.update_item(
-            Key={'orderId': order_id, 'createdAt': update_data.get('createdAt', '')},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values,
-            ExpressionAttributeNames={'#status': 'status'} if 'status' in update_data else {},
-            ReturnValues='ALL_NEW'
-        )
+        key = resolve_order_key(order_id, update_data.get('createdAt'))
+        if key is None:
+            return error_response(404, 'Order not found')
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(response['Attributes'], default=str)
+        update_kwargs = {
+            'Key': key,
+            'UpdateExpression': update_expression,
+            'ConditionExpression': 'attribute_exists(orderId)',
+            'ExpressionAttributeValues': expression_attribute_values,
+            'ReturnValues': 'ALL_NEW'
         }
+        if 'status' in update_data:
+            update_kwargs['ExpressionAttributeNames'] = {'#status': 'status'}
+        
+        # Update item in a single conditional call; never creates a new item
+        try:
+            response = table.update_item(**update_kwargs)
+        except ClientError as e:
+            if not is_conditional_check_failure(e):
+                raise
+            return error_response(404, 'Order not found')
+        
+        order_cache.invalidate(order_id)
+        
+        return json_response(200, response['Attributes'])
     
     except Exception as e:
         print(f"Error updating order: {str(e)}")
@@ -214,40 +741,23 @@ def update_order(order_id, update_data):
 def delete_order(order_id):
     """Delete an order"""
     try:
-        # First, get the order to get the sort key
-        response = table.query(
-            KeyConditionExpression='orderId = :order_id',
-            ExpressionAttributeValues={':order_id': order_id}
-        )
+        key = resolve_order_key(order_id)
         
-        if not response['Items']:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Order not found'})
-            }
-        
-        order = response['Items'][0]
-        
-        # Delete the item
-        table.delete_item(
-            Key={
-                'orderId': order_id,
-                'createdAt': order['createdAt']
-            }
-        )
+        if key is not None:
+            # Delete the item in a single conditional call
+            try:
+                table.delete_item(Key=key, ConditionExpression='attribute_exists(orderId)')
+            except ClientError as e:
+                if not is_conditional_check_failure(e):
+                    raise
+                key = None
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'message': 'Order deleted successfully'})
-        }
+        if key is None:
+            return error_response(404, 'Order not found')
+        
+        order_cache.invalidate(order_id)
+        
+        return json_response(200, {'message': 'Order deleted successfully'})
     
     except Exception as e:
         print(f"Error deleting order: {str(e)}")
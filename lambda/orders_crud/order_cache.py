@@ -0,0 +1,106 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_TTL_SECONDS = float(os.environ.get('ORDER_CACHE_TTL_SECONDS', 10))
+CACHE_MAX_ENTRIES = int(os.environ.get('ORDER_CACHE_MAX_ENTRIES', 1000))
+CACHE_MAX_BYTES = int(os.environ.get('ORDER_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+# Opt-in: once an entry is this old, confirm its version against the table
+# before serving it (0 disables; entries are then only bounded by the TTL)
+CACHE_VERIFY_AFTER_SECONDS = float(os.environ.get('ORDER_CACHE_VERIFY_AFTER_SECONDS', 0))
+
+
+class OrderCache:
+    """
+    LRU + TTL cache of order items that lives in the module scope, so it
+    survives across warm invocations of the same container. Memory is bounded
+    both by entry count and by the approximate serialized size of the items.
+
+    Writes made by other containers are not seen until an entry expires,
+    unless verify_after is set: entries older than that are reported as due
+    for a version check by lookup().
+    """
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES,
+                 verify_after=CACHE_VERIFY_AFTER_SECONDS):
+        self.ttl = ttl
+        self.verify_after = verify_after
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return a cached item, or None when missing or expired"""
+        return self.lookup(key)[0]
+
+    def lookup(self, key):
+        """Return (cached item, whether it is due for a version check), or (None, False)"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None, False
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[3] <= now
+
+    def verified(self, key):
+        """Record that a cached item still matches the table"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries[key] = entry[:3] + (self._next_check(),)
+
+    def put(self, key, item):
+        """Cache an item, evicting least recently used entries past the bounds"""
+        item_size = len(json.dumps(item, default=str))
+        if self.ttl <= 0 or item_size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, item, item_size, self._next_check())
+            self.size += item_size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop a cached item after it was modified or deleted"""
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Hit/miss counters and current footprint"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.size
+            }
+
+    def _next_check(self):
+        return time.monotonic() + self.verify_after if self.verify_after > 0 else math.inf
+
+    def _remove(self, key):
+        self.size -= self.entries.pop(key)[2]
@@ -0,0 +1,116 @@
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Crockford base32, as used by ULID
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+DECODE = {char: index for index, char in enumerate(ALPHABET)}
+
+# ORD- + 26 char ULID: 48-bit millisecond timestamp + 80 random bits
+ORDER_ID_PATTERN = re.compile(r'^ORD-([0-9A-HJKMNP-TV-Z]{10})[0-9A-HJKMNP-TV-Z]{16}$')
+
+TIMESTAMP_BITS = 48
+RANDOM_BITS = 80
+RANDOM_MAX = (1 << RANDOM_BITS) - 1
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def _decode(text):
+    value = 0
+    for char in text:
+        value = value * 32 + DECODE[char]
+    return value
+
+
+class OrderIdGenerator:
+    """
+    Monotonic ULID-style ID generator.
+
+    IDs sort by creation time. Within the same millisecond the random part is
+    incremented instead of redrawn, so IDs issued by one container stay
+    strictly increasing even at high rates or if the clock steps back.
+    """
+
+    def __init__(self):
+        self.last_ms = -1
+        self.last_random = 0
+        self.lock = threading.Lock()
+
+    def new_id(self, now_ms=None):
+        """Return (order_id, timestamp_ms) for a new order"""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+
+        with self.lock:
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.last_random = secrets.randbits(RANDOM_BITS)
+            elif self.last_random < RANDOM_MAX:
+                self.last_random += 1
+            else:
+                # Random space for this millisecond is exhausted: borrow the next one
+                self.last_ms += 1
+                self.last_random = secrets.randbits(RANDOM_BITS - 1)
+            timestamp_ms, random_part = self.last_ms, self.last_random
+
+        return f"ORD-{_encode(timestamp_ms, 10)}{_encode(random_part, 16)}", timestamp_ms
+
+
+_generator = OrderIdGenerator()
+
+
+def _random_id(timestamp_ms):
+    return f"ORD-{_encode(timestamp_ms, 10)}{_encode(secrets.randbits(RANDOM_BITS), 16)}", timestamp_ms
+
+
+def new_order_key(now=None):
+    """
+    Generate a new primary key (orderId, createdAt) for an order.
+    createdAt is derived from the timestamp inside the ID, so it can always be
+    recovered from the ID alone without reading the table.
+
+    An explicit now (e.g. a bulk import keeping the original creation time)
+    is encoded as given with fresh random bits, outside the monotonic
+    sequence, so backdated orders keep their own timestamp.
+    """
+    if now is None:
+        order_id, timestamp_ms = _generator.new_id()
+    else:
+        order_id, timestamp_ms = _random_id((now - EPOCH) // timedelta(milliseconds=1))
+    return {'orderId': order_id, 'createdAt': (EPOCH + timedelta(milliseconds=timestamp_ms)).isoformat()}
+
+
+def order_id_timestamp(order_id):
+    """
+    Return the creation time encoded in an order ID, or None for legacy IDs
+    and for malformed IDs whose timestamp cannot be a real creation time
+    """
+    try:
+        match = ORDER_ID_PATTERN.match(order_id or '')
+        if match:
+            timestamp_ms = _decode(match.group(1))
+            if timestamp_ms >> TIMESTAMP_BITS:
+                # 10 base32 chars hold 50 bits; a ULID timestamp only uses 48
+                return None
+            return EPOCH + timedelta(milliseconds=timestamp_ms)
+    except (OverflowError, ValueError):
+        # Past datetime.max: not an ID this service issued
+        return None
+
+    return None
+
+
+def created_at_from_order_id(order_id):
+    """Return the createdAt sort key encoded in an order ID, or None for legacy IDs"""
+    timestamp = order_id_timestamp(order_id)
+    return timestamp.isoformat() if timestamp else None
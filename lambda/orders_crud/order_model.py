@@ -0,0 +1,89 @@
+import math
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from day_buckets import created_day_key
+from order_ids import new_order_key
+from status_shards import SHARDED_STATUS_ATTRIBUTE, sharding_enabled, status_shard_key
+
+# Sparse index of orders by customer: only orders with an email carry the key
+CUSTOMER_INDEX = 'CustomerIndex'
+CUSTOMER_EMAIL_ATTRIBUTE = 'customerEmailKey'
+
+# Orders start out pending unless imported with a status of their own
+DEFAULT_STATUS = 'pending'
+MAX_STATUS_LENGTH = 64
+# Marks orders written by a bulk import; the notifier sends nothing for them
+SOURCE_ATTRIBUTE = 'source'
+IMPORT_SOURCE = 'import'
+
+
+def parse_amount(value):
+    """Convert an amount to the Decimal type DynamoDB requires for numbers"""
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError('amount must be a finite number')
+    return Decimal(str(amount))
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp into the UTC format used by createdAt"""
+    try:
+        timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError(f'Invalid timestamp: {value}')
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).isoformat()
+
+
+def parse_status(value):
+    """Validate a status; '#' and ',' are reserved by the shard keys and status filters"""
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError('status must be a non-empty string')
+    status = value.strip()
+    if len(status) > MAX_STATUS_LENGTH or '#' in status or ',' in status:
+        raise ValueError(f'Invalid status: {status}')
+    return status
+
+
+def normalize_email(value):
+    """Customer index key of an email: trimmed and lower-cased, '' when missing"""
+    if not isinstance(value, str):
+        return ''
+    return value.strip().lower()
+
+
+def validate_order_data(order_data):
+    """Reject order payloads that build_order cannot store faithfully"""
+    if not isinstance(order_data, dict):
+        raise ValueError('order must be an object')
+    if not isinstance(order_data.get('items', []), list):
+        raise ValueError('items must be a list')
+
+
+def build_order(order_data, now=None, status=DEFAULT_STATUS):
+    """Build a new order item with a generated ID and creation timestamp"""
+    # Generate order ID and timestamp; the ID encodes the timestamp
+    key = new_order_key(now)
+    created_at = key['createdAt']
+    
+    order = {
+        'orderId': key['orderId'],
+        'createdAt': created_at,
+        'createdDay': created_day_key(key['orderId'], created_at),
+        'customerName': order_data.get('customerName', ''),
+        'customerEmail': order_data.get('customerEmail', ''),
+        'items': order_data.get('items', []),
+        'amount': parse_amount(order_data.get('amount', 0)),
+        'status': status,
+        'updatedAt': created_at
+    }
+    email_key = normalize_email(order['customerEmail'])
+    if email_key:
+        order[CUSTOMER_EMAIL_ATTRIBUTE] = email_key
+    if sharding_enabled():
+        # Spread new orders over the status shards instead of one hot partition
+        order[SHARDED_STATUS_ATTRIBUTE] = status_shard_key(order['orderId'], status)
+    
+    return order
@@ -0,0 +1,25 @@
+import os
+
+from orders_common.clients import Lazy
+from orders_common.dynamodb import dynamodb_resource
+from orders_common.metrics import record_invocation
+from orders_common.stats import apply_stream_records
+
+# Per-status / per-day counters, maintained from the orders change stream
+stats_table = Lazy(lambda: dynamodb_resource().Table(
+    os.environ.get('STATS_TABLE', f"{os.environ['DYNAMODB_TABLE']}-stats")
+))
+
+
+@record_invocation
+def lambda_handler(event, context):
+    """
+    Apply a batch of the orders change stream to the statistics counters.
+    Runs on its own event source mapping with ReportBatchItemFailures: a
+    failure is reported at the first record not applied, so Lambda retries
+    from there and the counters never silently drift.
+    """
+    failed_sequence = apply_stream_records(stats_table, event.get('Records', []))
+    if failed_sequence is None:
+        return {'batchItemFailures': []}
+    return {'batchItemFailures': [{'itemIdentifier': failed_sequence}]}
@@ -0,0 +1,218 @@
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+from parallel_scan import new_scan_state, parallel_scan_pages
+from orders_common.clients import Lazy, lazy_client
+from orders_common.dynamodb import dynamodb_resource
+from orders_common.metrics import record_invocation
+from orders_common.responses import dumps
+
+# Initialize AWS clients
+s3 = lazy_client('s3')
+lambda_client = lazy_client('lambda')
+table = Lazy(lambda: dynamodb_resource().Table(os.environ['DYNAMODB_TABLE']))
+
+S3_BUCKET = os.environ['S3_BUCKET']
+EXPORT_PREFIX = os.environ.get('EXPORT_PREFIX', 'exports/')
+EXPORT_SEGMENTS = int(os.environ.get('EXPORT_SEGMENTS', 8))
+# Compressed size of each multipart part (S3 minimum is 5 MiB except for the last)
+EXPORT_PART_BYTES = int(os.environ.get('EXPORT_PART_BYTES', 8 * 1024 * 1024))
+# Share of the table's read capacity the nightly scan may use, so it
+# cannot throttle live traffic
+EXPORT_CAPACITY_FRACTION = float(os.environ.get('EXPORT_CAPACITY_FRACTION', 0.25))
+# Explicit RCU/s budget; otherwise derived from the table's provisioned capacity
+EXPORT_READ_CAPACITY = float(os.environ.get('EXPORT_READ_CAPACITY', 0)) or None
+# Reference capacity for on-demand tables, which report no provisioned RCUs
+EXPORT_ON_DEMAND_RCU = float(os.environ.get('EXPORT_ON_DEMAND_RCU', 1000))
+# Stop and hand over to a fresh invocation when less time than this is left
+EXPORT_TIME_MARGIN_MS = int(os.environ.get('EXPORT_TIME_MARGIN_MS', 60000))
+
+GZIP_LEVEL = 6
+
+
+@record_invocation
+def lambda_handler(event, context):
+    """
+    Export every order to S3 as gzip'd NDJSON.
+    Invoked nightly by a schedule; exportId defaults to the UTC date, so
+    retries of the same night resume the same export.
+    """
+    export_id = (event or {}).get('exportId') or datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    return run_export(export_id, context)
+
+
+def target_read_rate():
+    """RCU per second the export scan is paced to"""
+    if EXPORT_READ_CAPACITY:
+        return EXPORT_READ_CAPACITY
+
+    throughput = table.meta.client.describe_table(TableName=table.name)['Table'].get('ProvisionedThroughput', {})
+    provisioned = throughput.get('ReadCapacityUnits') or EXPORT_ON_DEMAND_RCU
+    return max(1.0, provisioned * EXPORT_CAPACITY_FRACTION)
+
+
+def export_keys(export_id):
+    """(data object key, checkpoint object key) of an export"""
+    prefix = f"{EXPORT_PREFIX}{export_id}/"
+    return f"{prefix}orders.ndjson.gz", f"{prefix}checkpoint.json"
+
+
+def load_checkpoint(key):
+    try:
+        response = s3.get_object(Bucket=S3_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+            return None
+        raise
+    return json.loads(response['Body'].read())
+
+
+def save_checkpoint(key, checkpoint):
+    s3.put_object(Bucket=S3_BUCKET, Key=key, Body=dumps(checkpoint).encode('utf-8'), ContentType='application/json')
+
+
+def gzip_parts(pages, part_bytes=EXPORT_PART_BYTES):
+    """
+    Turn parallel scan pages into gzip'd NDJSON parts of at least part_bytes.
+
+    Every part is a complete gzip member holding whole pages; concatenated
+    members form a valid .gz file, so each uploaded part is self-contained.
+    Yields (data, progress, count) where progress lists the (segment,
+    last_evaluated_key) of every page in the part, in scan order.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    chunks, size, progress, count = [], 0, [], 0
+
+    for segment, items, last_key in pages:
+        if items:
+            chunk = compressor.compress(''.join(dumps(item) + '\n' for item in items).encode('utf-8'))
+            chunks.append(chunk)
+            size += len(chunk)
+            count += len(items)
+        progress.append((segment, last_key))
+
+        if size >= part_bytes:
+            chunks.append(compressor.flush())
+            yield b''.join(chunks), progress, count
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            chunks, size, progress, count = [], 0, [], 0
+
+    if progress:
+        chunks.append(compressor.flush())
+        yield b''.join(chunks), progress, count
+
+
+def out_of_time(context):
+    return context is not None and context.get_remaining_time_in_millis() < EXPORT_TIME_MARGIN_MS
+
+
+def continue_export(export_id, context):
+    """Hand the export over to a fresh asynchronous invocation"""
+    lambda_client.invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps({'exportId': export_id}).encode('utf-8')
+    )
+
+
+def export_summary(checkpoint):
+    return {
+        'exportId': checkpoint['exportId'],
+        'status': checkpoint['status'],
+        'key': checkpoint['key'],
+        'orders': checkpoint['count'],
+        'parts': len(checkpoint['parts'])
+    }
+
+
+def run_export(export_id, context=None):
+    """
+    Run or resume an export.
+
+    The scan streams through the gzip_parts pipeline, and each part is
+    uploaded as soon as it is full, so memory stays at one part buffer plus
+    a few scan pages. After every part a checkpoint (upload ID, uploaded
+    parts and the scan position of every segment) is written next to the
+    export. A later invocation continues from there, re-reading only pages
+    that had not made it into an uploaded part.
+    """
+    data_key, checkpoint_key = export_keys(export_id)
+
+    try:
+        checkpoint = load_checkpoint(checkpoint_key)
+        if checkpoint is None:
+            upload = s3.create_multipart_upload(
+                Bucket=S3_BUCKET, Key=data_key,
+                ContentType='application/x-ndjson', ContentEncoding='gzip'
+            )
+            checkpoint = {
+                'exportId': export_id,
+                'key': data_key,
+                'uploadId': upload['UploadId'],
+                'segments': EXPORT_SEGMENTS,
+                'positions': new_scan_state(EXPORT_SEGMENTS),
+                'parts': [],
+                'count': 0,
+                'status': 'running',
+                'startedAt': datetime.now(timezone.utc).isoformat()
+            }
+            save_checkpoint(checkpoint_key, checkpoint)
+        elif checkpoint['status'] == 'complete':
+            return export_summary(checkpoint)
+
+        positions = checkpoint['positions']
+        pages = parallel_scan_pages(
+            table, checkpoint['segments'], read_capacity_budget=target_read_rate(), start_keys=dict(positions)
+        )
+        parts = gzip_parts(pages, EXPORT_PART_BYTES)
+        try:
+            for data, progress, count in parts:
+                part_number = len(checkpoint['parts']) + 1
+                response = s3.upload_part(
+                    Bucket=S3_BUCKET, Key=data_key, UploadId=checkpoint['uploadId'],
+                    PartNumber=part_number, Body=data
+                )
+                checkpoint['parts'].append({'PartNumber': part_number, 'ETag': response['ETag']})
+                for segment, last_key in progress:
+                    if last_key:
+                        positions[segment] = last_key
+                    else:
+                        positions.pop(segment, None)
+                checkpoint['count'] += count
+                save_checkpoint(checkpoint_key, checkpoint)
+
+                if positions and out_of_time(context):
+                    continue_export(export_id, context)
+                    print(f"Export {export_id} paused after part {part_number}, {checkpoint['count']} orders")
+                    return export_summary(checkpoint)
+        finally:
+            parts.close()
+            pages.close()
+
+        if not checkpoint['parts']:
+            # A multipart upload needs at least one part: an empty gzip member
+            response = s3.upload_part(
+                Bucket=S3_BUCKET, Key=data_key, UploadId=checkpoint['uploadId'],
+                PartNumber=1, Body=next(gzip_parts([('0', [], None)]))[0]
+            )
+            checkpoint['parts'].append({'PartNumber': 1, 'ETag': response['ETag']})
+
+        s3.complete_multipart_upload(
+            Bucket=S3_BUCKET, Key=data_key, UploadId=checkpoint['uploadId'],
+            MultipartUpload={'Parts': checkpoint['parts']}
+        )
+        checkpoint['status'] = 'complete'
+        checkpoint['completedAt'] = datetime.now(timezone.utc).isoformat()
+        save_checkpoint(checkpoint_key, checkpoint)
+
+        print(f"Export {export_id} complete: {checkpoint['count']} orders in {len(checkpoint['parts'])} parts")
+        return export_summary(checkpoint)
+
+    except Exception as e:
+        print(f"Error exporting orders: {str(e)}")
+        raise
+
@@ -0,0 +1,172 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from urllib.parse import unquote_plus
+
+from batch_write import batch_put_items
+from order_model import (
+    DEFAULT_STATUS, IMPORT_SOURCE, SOURCE_ATTRIBUTE, build_order, parse_status, parse_timestamp, validate_order_data
+)
+from parallel_scan import CapacityBudget
+from orders_common.clients import Lazy, lazy_client
+from orders_common.dynamodb import dynamodb_resource
+from orders_common.metrics import record_invocation
+from orders_common.responses import dumps
+
+# Initialize AWS clients
+s3 = lazy_client('s3')
+table = Lazy(lambda: dynamodb_resource().Table(os.environ['DYNAMODB_TABLE']))
+
+ERROR_PREFIX = os.environ.get('IMPORT_ERROR_PREFIX', 'import-errors/')
+# Orders buffered before a round of concurrent BatchWriteItem calls
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))
+IMPORT_WRITE_WORKERS = int(os.environ.get('IMPORT_WRITE_WORKERS', 4))
+# Share of the table's write capacity an import may use
+IMPORT_CAPACITY_FRACTION = float(os.environ.get('IMPORT_CAPACITY_FRACTION', 0.5))
+# Explicit WCU/s target; otherwise derived from the table's provisioned capacity
+IMPORT_WRITE_CAPACITY = float(os.environ.get('IMPORT_WRITE_CAPACITY', 0)) or None
+# Reference capacity for on-demand tables, which report no provisioned WCUs
+IMPORT_ON_DEMAND_WCU = float(os.environ.get('IMPORT_ON_DEMAND_WCU', 1000))
+
+
+@record_invocation
+def lambda_handler(event, context):
+    """
+    Import orders from NDJSON or CSV objects (optionally .gz) uploaded to S3.
+    Triggered by S3 ObjectCreated notifications on the imports/ prefix.
+    """
+    results = []
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        results.append(import_object(bucket, key))
+    return {'imports': results}
+
+
+def target_write_rate():
+    """WCU per second the import is paced to"""
+    if IMPORT_WRITE_CAPACITY:
+        return IMPORT_WRITE_CAPACITY
+
+    throughput = table.meta.client.describe_table(TableName=table.name)['Table'].get('ProvisionedThroughput', {})
+    provisioned = throughput.get('WriteCapacityUnits') or IMPORT_ON_DEMAND_WCU
+    return max(1.0, provisioned * IMPORT_CAPACITY_FRACTION)
+
+
+def open_text(body, compressed):
+    """Decode an S3 object body as a text stream, gunzipping it on the fly when compressed"""
+    if compressed:
+        body = gzip.GzipFile(fileobj=body)
+    return io.TextIOWrapper(body, encoding='utf-8', newline='')
+
+
+def read_ndjson(text):
+    """Yield (line number, record or None, error) for each non-empty NDJSON line"""
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {str(e)}'
+
+
+def read_csv(text):
+    """
+    Yield (row number, record, None) for each CSV row.
+    items is a ``|``-separated list; empty cells are left out.
+    """
+    for row_number, row in enumerate(csv.DictReader(text), 2):
+        record = {name: value for name, value in row.items() if name and value not in (None, '')}
+        if 'items' in record:
+            record['items'] = [item.strip() for item in record['items'].split('|') if item.strip()]
+        yield row_number, record, None
+
+
+def normalize_record(record):
+    """
+    Validate and build an order the way create_order does. The source
+    createdAt, status and updatedAt are kept when given; the order is tagged
+    as imported so it does not trigger a "new order" notification.
+    """
+    validate_order_data(record)
+    now = datetime.fromisoformat(parse_timestamp(record['createdAt'])) if record.get('createdAt') else None
+    status = parse_status(record['status']) if 'status' in record else DEFAULT_STATUS
+    order = build_order(record, now, status)
+
+    if record.get('updatedAt'):
+        updated_at = parse_timestamp(record['updatedAt'])
+        if datetime.fromisoformat(updated_at) < datetime.fromisoformat(order['createdAt']):
+            raise ValueError('updatedAt is before createdAt')
+        order['updatedAt'] = updated_at
+    order[SOURCE_ATTRIBUTE] = IMPORT_SOURCE
+    return order
+
+
+def import_object(bucket, key):
+    """
+    Stream one object into the orders table.
+
+    Lines are read and validated one at a time. Valid orders are written in
+    rounds of IMPORT_CHUNK_SIZE through concurrent BatchWriteItem workers,
+    which share a token bucket sized to IMPORT_CAPACITY_FRACTION of the
+    table's write capacity, so an import does not throttle live traffic.
+    Rejected or unwritten rows are collected in an NDJSON error report
+    uploaded next to the import under import-errors/.
+    """
+    name = key.lower()
+    compressed = name.endswith('.gz')
+    reader = read_csv if name[:-3 if compressed else None].endswith('.csv') else read_ndjson
+    budget = CapacityBudget(target_write_rate())
+    counts = {'imported': 0, 'rejected': 0, 'failed': 0}
+
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)['Body']
+        with tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024) as report:
+            def reject(line_number, record, error, outcome):
+                counts[outcome] += 1
+                report.write((dumps({'line': line_number, 'error': error, 'record': record}) + '\n').encode('utf-8'))
+
+            def write(pending):
+                failed_ids = {
+                    item['orderId'] for item in batch_put_items(
+                        table, [order for _, _, order in pending],
+                        max_workers=IMPORT_WRITE_WORKERS, capacity_budget=budget
+                    )
+                }
+                for line_number, record, order in pending:
+                    if order['orderId'] in failed_ids:
+                        reject(line_number, record, 'Write not processed', 'failed')
+                    else:
+                        counts['imported'] += 1
+
+            pending = []
+            for line_number, record, error in reader(open_text(body, compressed)):
+                if error is None:
+                    try:
+                        pending.append((line_number, record, normalize_record(record)))
+                    except (TypeError, ValueError) as e:
+                        error = str(e)
+                if error is not None:
+                    reject(line_number, record, error, 'rejected')
+                if len(pending) >= IMPORT_CHUNK_SIZE:
+                    write(pending)
+                    pending = []
+            write(pending)
+
+            error_key = None
+            if counts['rejected'] or counts['failed']:
+                error_key = f"{ERROR_PREFIX}{key}.errors.ndjson"
+                report.seek(0)
+                s3.upload_fileobj(report, bucket, error_key, ExtraArgs={'ContentType': 'application/x-ndjson'})
+
+        print(f"Import of s3://{bucket}/{key}: {counts}")
+        return dict(counts, key=key, errorReport=error_key)
+
+    except Exception as e:
+        print(f"Error importing orders: {str(e)}")
+        raise
@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+# Upper bound on DynamoDB round trips used to fill a single API page
+MAX_PAGE_FETCHES = int(os.environ.get('MAX_PAGE_FETCHES', 5))
+
+# HMAC key of the pagination cursors (Terraform: random_password.cursor_secret).
+# Required: without it cursors are refused rather than signed with an empty key
+CURSOR_SECRET = os.environ.get('CURSOR_SECRET', '').encode('utf-8')
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a nextToken is malformed, tampered with or used out of scope"""
+
+
+def parse_page_size(value):
+    """Parse the ``limit`` query parameter and clamp it to the server cap"""
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+# Truncated HMAC-SHA256 appended to every cursor payload
+SIGNATURE_BYTES = 16
+
+
+def _sign(payload):
+    if not CURSOR_SECRET:
+        raise RuntimeError('CURSOR_SECRET is not configured')
+    return hmac.new(CURSOR_SECRET, payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def encode_cursor(last_evaluated_key, scope):
+    """
+    Encode a DynamoDB LastEvaluatedKey as an opaque, signed token.
+    The scope (e.g. the query being paginated) is part of the signature so a
+    cursor issued for one listing cannot be replayed against another.
+    """
+    if not last_evaluated_key:
+        return None
+
+    payload = json.dumps(
+        {'k': last_evaluated_key, 's': scope},
+        separators=(',', ':'),
+        sort_keys=True,
+        default=str
+    ).encode('utf-8')
+    token = payload + b'.' + _sign(payload)
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, scope):
+    """Verify a token produced by encode_cursor and return its LastEvaluatedKey"""
+    if not token:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Malformed nextToken')
+    # The signature is binary and may itself contain '.': split at its fixed length
+    payload, signature = raw[:-SIGNATURE_BYTES - 1], raw[-SIGNATURE_BYTES:]
+    if not payload or raw[-SIGNATURE_BYTES - 1:-SIGNATURE_BYTES] != b'.':
+        raise InvalidCursorError('Malformed nextToken')
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidCursorError('Invalid nextToken')
+
+    data = json.loads(payload)
+    if data.get('s') != scope:
+        raise InvalidCursorError('nextToken does not match this query')
+
+    return data['k']
+
+
+def collect_page(fetch_page, page_size, start_key=None):
+    """
+    Fill a page of up to page_size items from a paginated DynamoDB call.
+
+    fetch_page(limit, exclusive_start_key) must return a scan/query response.
+    DynamoDB pages can come back short (1 MB limit, filter expressions), so
+    this keeps reading until the page is full, the result set is exhausted or
+    MAX_PAGE_FETCHES round trips have been made. Each request asks only for
+    the remaining number of items, so the returned key is always an exact
+    resume point.
+    """
+    items = []
+    last_key = start_key
+
+    for _ in range(MAX_PAGE_FETCHES):
+        response = fetch_page(page_size - len(items), last_key)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+
+        if not last_key or len(items) >= page_size:
+            break
+
+    return items, last_key
@@ -0,0 +1,187 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', 4))
+
+_DONE = object()
+
+
+class CapacityBudget:
+    """
+    Token bucket shared by all scan workers so a full-table read stays under
+    a read capacity budget (RCUs per second) instead of draining the table.
+    """
+
+    def __init__(self, units_per_second):
+        self.rate = float(units_per_second)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, units):
+        """Debit consumed capacity, sleeping while the bucket is overdrawn"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= units
+            deficit = -self.tokens
+        if deficit > 0:
+            time.sleep(deficit / self.rate)
+
+
+def _scan_segment_page(client, table_name, segment, total_segments, limit=None,
+                       start_key=None, budget=None, **scan_kwargs):
+    # The table's own client is thread safe and keeps the resource layer's
+    # type (de)serialization, unlike sharing the Table resource across threads
+    kwargs = dict(scan_kwargs, TableName=table_name, Segment=segment, TotalSegments=total_segments)
+    if limit:
+        kwargs['Limit'] = limit
+    if start_key:
+        kwargs['ExclusiveStartKey'] = start_key
+    if budget:
+        kwargs['ReturnConsumedCapacity'] = 'TOTAL'
+
+    response = client.scan(**kwargs)
+
+    if budget:
+        budget.consume(response.get('ConsumedCapacity', {}).get('CapacityUnits', 0))
+
+    return response.get('Items', []), response.get('LastEvaluatedKey')
+
+
+def parallel_scan_pages(table, total_segments=DEFAULT_SEGMENTS, max_workers=None,
+                        read_capacity_budget=None, start_keys=None, **scan_kwargs):
+    """
+    Stream (segment, items, last_evaluated_key) pages of a parallel segmented scan.
+
+    Each segment is walked by a worker on a thread pool and pages are handed
+    to the caller through a bounded queue, so memory stays at a few pages
+    regardless of table size. Pages of one segment arrive in order; a None
+    key marks the segment's last page. start_keys (segment -> start key, in
+    the new_scan_state format) resumes an earlier scan: only the segments it
+    lists are read. read_capacity_budget caps the combined RCUs per second.
+    """
+    client = table.meta.client
+    table_name = table.name
+    budget = CapacityBudget(read_capacity_budget) if read_capacity_budget else None
+    start_keys = new_scan_state(total_segments) if start_keys is None else start_keys
+    segments = sorted(start_keys, key=int)
+    if not segments:
+        return
+    workers = max_workers or len(segments)
+    pages = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+
+    def put(value):
+        while not stop.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan_segment(segment):
+        try:
+            start_key = start_keys[segment]
+            while not stop.is_set():
+                items, start_key = _scan_segment_page(
+                    client, table_name, int(segment), total_segments,
+                    start_key=start_key, budget=budget, **scan_kwargs
+                )
+                if (items or not start_key) and not put((segment, items, start_key)):
+                    return
+                if not start_key:
+                    break
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for segment in segments:
+            executor.submit(scan_segment, segment)
+
+        remaining = len(segments)
+        while remaining:
+            page = pages.get()
+            if page is _DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield page
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+def parallel_scan(table, total_segments=DEFAULT_SEGMENTS, max_workers=None,
+                  read_capacity_budget=None, **scan_kwargs):
+    """
+    Stream every item of a table using a parallel segmented scan.
+
+    Built on parallel_scan_pages, so memory stays at a few pages regardless
+    of table size. Extra scan_kwargs (FilterExpression, ProjectionExpression,
+    ...) are passed through to every scan call.
+    """
+    for _, items, _ in parallel_scan_pages(table, total_segments, max_workers, read_capacity_budget, **scan_kwargs):
+        yield from items
+
+
+def scan_all(table, **kwargs):
+    """Read a whole table into a list using parallel_scan"""
+    return list(parallel_scan(table, **kwargs))
+
+
+def new_scan_state(total_segments=DEFAULT_SEGMENTS):
+    """Resume state for scan_page: segment -> LastEvaluatedKey (None = not started)"""
+    return {str(segment): None for segment in range(total_segments)}
+
+
+def scan_page(table, page_size, state, total_segments=DEFAULT_SEGMENTS, max_rounds=5, **scan_kwargs):
+    """
+    Read one page of up to page_size items across all active segments at once.
+
+    state maps each unfinished segment to its LastEvaluatedKey and is what
+    list_orders stores in its cursor. The page size is split exactly across
+    the active segments, so a page never exceeds page_size and the returned
+    state is an exact resume point. Returns (items, new_state); new_state is
+    empty once every segment is exhausted.
+    """
+    client = table.meta.client
+    table_name = table.name
+    state = dict(state)
+    items = []
+
+    with ThreadPoolExecutor(max_workers=max(1, len(state))) as executor:
+        for _ in range(max_rounds):
+            remaining = page_size - len(items)
+            active = sorted(state, key=int)
+            if remaining <= 0 or not active:
+                break
+
+            share, extra = divmod(remaining, len(active))
+            futures = {}
+            for index, segment in enumerate(active):
+                limit = share + (1 if index < extra else 0)
+                if limit:
+                    futures[segment] = executor.submit(
+                        _scan_segment_page, client, table_name, int(segment), total_segments,
+                        limit=limit, start_key=state[segment], **scan_kwargs
+                    )
+
+            for segment in sorted(futures, key=int):
+                segment_items, last_key = futures[segment].result()
+                items.extend(segment_items)
+                if last_key:
+                    state[segment] = last_key
+                else:
+                    del state[segment]
+
+    return items, state
@@ -0,0 +1,73 @@
+import re
+
+MAX_FIELDS = 20
+FIELD_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9_]{0,63}$')
+
+# Always returned so clients (and batch lookups) can identify each order
+REQUIRED_FIELDS = ('orderId',)
+
+
+def parse_fields(value):
+    """Parse the ``fields`` query parameter into a list of attribute names"""
+    if not value:
+        return None
+
+    fields = list(REQUIRED_FIELDS)
+    for field in value.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        if not FIELD_PATTERN.match(field):
+            raise ValueError(f'Invalid field: {field}')
+        if field not in fields:
+            fields.append(field)
+
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f'At most {MAX_FIELDS} fields can be requested')
+    return fields
+
+
+def with_version_fields(fields, *extra):
+    """
+    Field list to read so a projected item still carries its version
+    (updatedAt) plus any extra attributes the caller needs internally
+    """
+    if not fields:
+        return fields
+    missing = [name for name in ('updatedAt',) + extra if name not in fields]
+    return fields + missing if missing else fields
+
+
+def projection_kwargs(fields):
+    """
+    Build DynamoDB ProjectionExpression arguments for a field list.
+    Every name goes through an ExpressionAttributeNames alias, so reserved
+    words such as ``status`` or ``items`` are safe to request.
+    """
+    if not fields:
+        return {}
+
+    names = {f'#p{index}': field for index, field in enumerate(fields)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def merge_projection(kwargs, fields):
+    """Add projection arguments to existing query/scan kwargs"""
+    projection = projection_kwargs(fields)
+    if projection:
+        kwargs['ProjectionExpression'] = projection['ProjectionExpression']
+        kwargs['ExpressionAttributeNames'] = {
+            **kwargs.get('ExpressionAttributeNames', {}),
+            **projection['ExpressionAttributeNames']
+        }
+    return kwargs
+
+
+def project_item(item, fields):
+    """Apply a field list to an item already in memory"""
+    if not fields:
+        return item
+    return {field: item[field] for field in fields if field in item}
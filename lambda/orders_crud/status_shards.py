@@ -0,0 +1,39 @@
+import os
+import zlib
+
+# Number of write shards per status on StatusShardIndex; 1 keeps the
+# unsharded StatusIndex
+STATUS_SHARDS = int(os.environ.get('STATUS_SHARDS', 1))
+
+SHARDED_STATUS_INDEX = 'StatusShardIndex'
+SHARDED_STATUS_ATTRIBUTE = 'statusShard'
+
+
+def sharding_enabled(shards=None):
+    return (STATUS_SHARDS if shards is None else shards) > 1
+
+
+def order_shard(order_id, shards=None):
+    """Deterministic shard of an order: the same for every status it moves through"""
+    shards = STATUS_SHARDS if shards is None else shards
+    return zlib.crc32(order_id.encode('utf-8')) % shards
+
+
+def status_shard_key(order_id, status, shards=None):
+    """Sharded index key of an order, e.g. ``pending#3``"""
+    return f"{status}#{order_shard(order_id, shards)}"
+
+
+def status_partitions(status, shards=None):
+    """Every index partition key holding orders in one status"""
+    shards = STATUS_SHARDS if shards is None else shards
+    if not sharding_enabled(shards):
+        return [status]
+    return [f"{status}#{shard}" for shard in range(shards)]
+
+
+def status_index():
+    """(index name, partition key attribute) used to list orders by status"""
+    if sharding_enabled():
+        return SHARDED_STATUS_INDEX, SHARDED_STATUS_ATTRIBUTE
+    return 'StatusIndex', 'status'
@@ -1,18 +1,29 @@
-import json
-import boto3
 import uuid
 from datetime import datetime, timezone
 import os
+
 from botocore.exceptions import ClientError
-import base64
 
-# Initialize AWS clients
-s3 = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ.get('DYNAMODB_TABLE', 'serverless-orders-orders'))
+from orders_common.clients import Lazy, lazy_client, prime
+from orders_common.dynamodb import capacity_error_response, dynamodb_resource
+from orders_common.metrics import record_invocation
+from orders_common.profiling import profile_invocations
+from orders_common.responses import error_response, json_response
+
+# AWS clients are built on first use
+s3 = lazy_client('s3')
+table = Lazy(lambda: dynamodb_resource().Table(os.environ.get('DYNAMODB_TABLE', 'serverless-orders-orders')))
 
 S3_BUCKET = os.environ['S3_BUCKET']
 
+# Opt-in: build both clients and open their connections during init
+prime(
+    lambda: table.get_item(Key={'orderId': 'ORD-PRIME', 'createdAt': '0'}, ProjectionExpression='orderId'),
+    lambda: s3.head_bucket(Bucket=S3_BUCKET)
+)
+
+@record_invocation
+@profile_invocations
 def lambda_handler(event, context):
     """
     Lambda function to generate PDF invoices and return signed URLs
@@ -22,26 +33,12 @@ def lambda_handler(event, context):
         order_id = path_parameters.get('orderId')
         
         if not order_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Order ID is required'})
-            }
+            return error_response(400, 'Order ID is required')
         
         # Get order data
         order_data = get_order_data(order_id)
         if not order_data:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'Order not found'})
-            }
+            return error_response(404, 'Order not found')
         
         # Generate PDF content (mock PDF for demonstration)
         pdf_content = generate_pdf_content(order_data)
@@ -66,30 +63,16 @@ def lambda_handler(event, context):
             ExpiresIn=3600
         )
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'message': 'PDF generated successfully',
-                'orderId': order_id,
-                'pdfUrl': presigned_url,
-                'expiresAt': (datetime.now(timezone.utc).timestamp() + 3600)
-            })
-        }
+        return json_response(200, {
+            'message': 'PDF generated successfully',
+            'orderId': order_id,
+            'pdfUrl': presigned_url,
+            'expiresAt': (datetime.now(timezone.utc).timestamp() + 3600)
+        })
     
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({'error': 'Internal server error'})
-        }
+        return capacity_error_response(e) or error_response(500, 'Internal server error')
 
 def get_order_data(order_id):
     """Get order data from DynamoDB"""
@@ -105,7 +88,8 @@ def get_order_data(order_id):
     
     except Exception as e:
         print(f"Error getting order data: {str(e)}")
-        return None
+        # Re-raised so a throttled read is not reported as a missing order
+        raise
 
 def generate_pdf_content(order_data):
     """
@@ -1,15 +1,20 @@
 import json
-import boto3
 import os
 from datetime import datetime, timezone
 
-# Initialize AWS clients
-sns = boto3.client('sns')
-dynamodb = boto3.resource('dynamodb')
+from orders_common.clients import lazy_client
+from orders_common.metrics import record_invocation
+
+# AWS clients are built on first use
+sns = lazy_client('sns')
 
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN')
 DYNAMODB_TABLE = os.environ.get('DYNAMODB_TABLE')
 
+# Orders written by these sources (order_model.SOURCE_ATTRIBUTE) are not announced as new
+SILENT_SOURCES = {'import'}
+
+@record_invocation
 def lambda_handler(event, context):
     """
     Lambda function to handle SNS notifications for order events
@@ -42,9 +47,10 @@ def handle_dynamodb_event(record):
     event_name = record['eventName']
     
     if event_name == 'INSERT':
-        # New order created
+        # New order created; bulk-imported orders are not new to the customer
         order_data = record['dynamodb']['NewImage']
-        send_order_created_notification(order_data)
+        if get_dynamodb_value(order_data, 'source') not in SILENT_SOURCES:
+            send_order_created_notification(order_data)
         
     elif event_name == 'MODIFY':
         # Order updated
@@ -0,0 +1,95 @@
+"""
+Shared runner of the attribute backfills (backfill_status_shards.py,
+backfill_customer_index.py, ...).
+
+A backfill is described by a BackfillSpec:
+
+- projection: scan arguments selecting the attributes the spec reads
+  (ProjectionExpression and, if needed, ExpressionAttributeNames)
+- compute_update(item): the new value for the item, or None when the item
+  is already correct or must not be touched
+- conditional_update(client, table_name, item, value): write the value,
+  conditional on the scanned attributes being unchanged; returns
+  'updated' or 'conflicts' (usually through update_unless_changed)
+
+The runner scans the table in parallel, applies the updates in bounded
+rounds through a thread pool and returns counters.
+"""
+import argparse
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/orders_crud'))
+
+from parallel_scan import parallel_scan
+
+UPDATES_PER_ROUND = 1000
+
+BackfillSpec = namedtuple('BackfillSpec', ['projection', 'compute_update', 'conditional_update'])
+
+
+def update_unless_changed(client, **kwargs):
+    """UpdateItem whose ConditionExpression guards the scanned state; 'updated' or 'conflicts'"""
+    try:
+        client.update_item(**kwargs)
+        return 'updated'
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        return 'conflicts'
+
+
+def run_backfill(table, spec, total_segments=4, read_capacity=None, workers=8, dry_run=False):
+    """Apply spec to every order of the table; returns counters"""
+    counts = {'scanned': 0, 'updated': 0, 'unchanged': 0, 'conflicts': 0}
+    client = table.meta.client
+
+    def pending_updates():
+        for item in parallel_scan(table, total_segments, read_capacity_budget=read_capacity, **spec.projection):
+            counts['scanned'] += 1
+            value = spec.compute_update(item)
+            if value is None:
+                counts['unchanged'] += 1
+                continue
+            yield item, value
+
+    updates = pending_updates()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Bounded rounds keep memory flat however large the table is
+            batch = list(islice(updates, UPDATES_PER_ROUND))
+            if not batch:
+                break
+            if dry_run:
+                counts['updated'] += len(batch)
+                continue
+            for outcome in executor.map(
+                lambda update: spec.conditional_update(client, table.name, *update), batch
+            ):
+                counts[outcome] += 1
+
+    return counts
+
+
+def backfill_parser(description):
+    """Argument parser with the options every backfill takes"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--table', default=os.environ.get('DYNAMODB_TABLE'), required='DYNAMODB_TABLE' not in os.environ)
+    parser.add_argument('--segments', type=int, default=4, help='Parallel scan segments')
+    parser.add_argument('--read-capacity', type=float, default=None, help='Max RCUs per second for the scan')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent UpdateItem calls')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the orders that would change')
+    return parser
+
+
+def run_from_args(args, spec):
+    """Run a backfill with parsed backfill_parser arguments and print its counters"""
+    table = boto3.resource('dynamodb').Table(args.table)
+    counts = run_backfill(table, spec, args.segments, args.read_capacity, args.workers, args.dry_run)
+    print(', '.join(f'{name}: {count}' for name, count in counts.items()))
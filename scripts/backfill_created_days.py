@@ -0,0 +1,69 @@
+"""
+Backfill the sharded creation day key (createdDay) on existing orders.
+
+Unfiltered from/to listings read CreatedDayIndex, whose partition key is
+createdDay = "<YYYY-MM-DD>#<shard>". Orders written before the index, or
+before the day was sharded (plain "YYYY-MM-DD"), are missing from those
+listings until this tool has tagged them:
+
+1. Deploy orders_crud and orders_import with CREATED_DAY_SHARDS = N
+   (Terraform created_day_shards).
+2. Run this tool with the same --shards N.
+
+Run it again with the new count whenever created_day_shards changes.
+
+The tool is idempotent: orders whose key is already correct are skipped,
+and each update only applies to an order that still exists, so a deletion
+during the run is never undone.
+
+    python scripts/backfill_created_days.py --table orders-app-orders --shards 4
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/orders_crud'))
+
+from backfill import BackfillSpec, backfill_parser, run_backfill, run_from_args, update_unless_changed
+from day_buckets import CREATED_DAY_SHARDS, created_day_key
+
+
+def created_day_spec(shards):
+    """Tag every order with its sharded creation day"""
+    def compute_update(item):
+        day_key = created_day_key(item['orderId'], item['createdAt'], shards)
+        return None if item.get('createdDay') == day_key else day_key
+
+    def conditional_update(client, table_name, item, day_key):
+        # createdAt is part of the key, so the only change to guard against is a delete
+        return update_unless_changed(
+            client,
+            TableName=table_name,
+            Key={'orderId': item['orderId'], 'createdAt': item['createdAt']},
+            UpdateExpression='SET createdDay = :day',
+            ConditionExpression='attribute_exists(orderId)',
+            ExpressionAttributeValues={':day': day_key}
+        )
+
+    return BackfillSpec({'ProjectionExpression': 'orderId, createdAt, createdDay'}, compute_update, conditional_update)
+
+
+def backfill(table, shards, total_segments=4, read_capacity=None, workers=8, dry_run=False):
+    """Tag every order with its sharded creation day; returns counters"""
+    return run_backfill(table, created_day_spec(shards), total_segments, read_capacity, workers, dry_run)
+
+
+def main():
+    parser = backfill_parser('Backfill the sharded createdDay on existing orders')
+    parser.add_argument('--shards', type=int, default=CREATED_DAY_SHARDS,
+                        help='Shards per day (CREATED_DAY_SHARDS)')
+    args = parser.parse_args()
+
+    if args.shards < 1:
+        parser.error('--shards must be at least 1')
+
+    run_from_args(args, created_day_spec(args.shards))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Backfill the customer index key (customerEmailKey) on existing orders.
+
+New orders carry the key from the moment CustomerIndex is deployed; orders
+written before that are invisible to GET /orders?customerEmail= until this
+tool has tagged them:
+
+1. Apply Terraform, which adds CustomerIndex, and deploy orders_crud.
+2. Run this tool once.
+
+The tool is idempotent: orders whose key is already correct, or that have
+no email, are skipped, and each update only applies if the order's email
+is still the one that was scanned.
+
+    python scripts/backfill_customer_index.py --table orders-app-orders
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/orders_crud'))
+
+from backfill import BackfillSpec, backfill_parser, run_backfill, run_from_args, update_unless_changed
+from order_model import CUSTOMER_EMAIL_ATTRIBUTE, normalize_email
+
+
+def customer_index_spec():
+    """Tag every order that has an email with its customer key"""
+    def compute_update(item):
+        email_key = normalize_email(item.get('customerEmail'))
+        if not email_key or item.get(CUSTOMER_EMAIL_ATTRIBUTE) == email_key:
+            return None
+        return email_key
+
+    def conditional_update(client, table_name, item, email_key):
+        # Only applies if the order's email is still the one that was scanned
+        return update_unless_changed(
+            client,
+            TableName=table_name,
+            Key={'orderId': item['orderId'], 'createdAt': item['createdAt']},
+            UpdateExpression=f'SET {CUSTOMER_EMAIL_ATTRIBUTE} = :customer',
+            ConditionExpression='customerEmail = :email',
+            ExpressionAttributeValues={':customer': email_key, ':email': item['customerEmail']}
+        )
+
+    projection = {'ProjectionExpression': f'orderId, createdAt, customerEmail, {CUSTOMER_EMAIL_ATTRIBUTE}'}
+    return BackfillSpec(projection, compute_update, conditional_update)
+
+
+def backfill(table, total_segments=4, read_capacity=None, workers=8, dry_run=False):
+    """Tag every order that has an email with its customer key; returns counters"""
+    return run_backfill(table, customer_index_spec(), total_segments, read_capacity, workers, dry_run)
+
+
+def main():
+    args = backfill_parser('Backfill customerEmailKey on existing orders').parse_args()
+    run_from_args(args, customer_index_spec())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Backfill the sharded status key (statusShard) on existing orders.
+
+Rollout of a write-sharded status index:
+
+1. Apply Terraform with status_shards = N, which adds StatusShardIndex.
+2. Run this tool with the same --shards N to tag every existing order.
+3. Apply with enable_status_sharding = true (STATUS_SHARDS = N on
+   orders_crud). New and updated orders then carry the key, and status
+   listings read the shards.
+4. Run the tool again to catch orders written between steps 2 and 3.
+5. Apply with keep_status_index = false to drop the hot StatusIndex.
+
+The tool is idempotent: orders whose key is already correct are skipped,
+and each update only applies if the order's status is still the one that
+was scanned.
+
+    python scripts/backfill_status_shards.py --table orders-app-orders --shards 8
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/orders_crud'))
+
+from backfill import BackfillSpec, backfill_parser, run_backfill, run_from_args, update_unless_changed
+from status_shards import SHARDED_STATUS_ATTRIBUTE, status_shard_key
+
+
+def status_shard_spec(shards):
+    """Tag every order with its status shard"""
+    def compute_update(item):
+        if not item.get('status'):
+            return None
+        shard_key = status_shard_key(item['orderId'], item['status'], shards)
+        return None if item.get(SHARDED_STATUS_ATTRIBUTE) == shard_key else shard_key
+
+    def conditional_update(client, table_name, item, shard_key):
+        # Only applies if the order's status is still the one that was scanned
+        return update_unless_changed(
+            client,
+            TableName=table_name,
+            Key={'orderId': item['orderId'], 'createdAt': item['createdAt']},
+            UpdateExpression=f'SET {SHARDED_STATUS_ATTRIBUTE} = :shard',
+            ConditionExpression='#status = :status',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':shard': shard_key, ':status': item['status']}
+        )
+
+    projection = {
+        'ProjectionExpression': f'orderId, createdAt, #status, {SHARDED_STATUS_ATTRIBUTE}',
+        'ExpressionAttributeNames': {'#status': 'status'}
+    }
+    return BackfillSpec(projection, compute_update, conditional_update)
+
+
+def backfill(table, shards, total_segments=4, read_capacity=None, workers=8, dry_run=False):
+    """Tag every order with its status shard; returns counters"""
+    return run_backfill(table, status_shard_spec(shards), total_segments, read_capacity, workers, dry_run)
+
+
+def main():
+    parser = backfill_parser('Backfill statusShard on existing orders')
+    parser.add_argument('--shards', type=int, required=True, help='Shards per status (STATUS_SHARDS)')
+    args = parser.parse_args()
+
+    if args.shards < 2:
+        parser.error('--shards must be at least 2')
+
+    run_from_args(args, status_shard_spec(args.shards))
+
+
+if __name__ == '__main__':
+    main()
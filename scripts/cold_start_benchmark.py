@@ -0,0 +1,140 @@
+"""
+Measure the cold-start cost of each Lambda function.
+
+Every run starts a fresh interpreter with the function's directory and the
+common layer on sys.path, imports the handler module (what Lambda does
+during init) and then builds every client the module left lazy (what the
+first request pays for). Medians and maxima over --runs are reported per
+function.
+
+Compare two revisions by pointing --root at a checkout of the older one:
+
+    git worktree add /tmp/before <revision>
+    python scripts/cold_start_benchmark.py --root /tmp/before
+    python scripts/cold_start_benchmark.py
+
+--prime sets PRIME_CLIENTS so priming calls run during init; use it with
+--endpoint-url (for example a local DynamoDB/S3 stand-in), since priming
+opens real connections.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# (name, function directory, handler module)
+FUNCTIONS = [
+    ('orders_crud', 'lambda/orders_crud', 'lambda_function'),
+    ('orders_export', 'lambda/orders_crud', 'orders_export'),
+    ('orders_import', 'lambda/orders_crud', 'orders_import'),
+    ('order_stats', 'lambda/orders_crud', 'order_stats'),
+    ('pdf_generator', 'lambda/pdf_generator', 'lambda_function'),
+    ('sns_notification', 'lambda/sns_notification', 'lambda_function'),
+    ('cognito_authorizer', 'lambda/cognito_authorizer', 'lambda_function')
+]
+
+ENVIRONMENT = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'benchmark',
+    'AWS_SECRET_ACCESS_KEY': 'benchmark',
+    'DYNAMODB_TABLE': 'benchmark-orders',
+    'STATS_TABLE': 'benchmark-orders-stats',
+    'CURSOR_SECRET': 'benchmark-cursor-secret',
+    'S3_BUCKET': 'benchmark-bucket',
+    'SNS_TOPIC_ARN': 'arn:aws:sns:us-east-1:000000000000:benchmark'
+}
+
+# Runs inside the fresh interpreter; older trees without lazy clients build
+# everything during the import
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+try:
+    from orders_common.clients import Lazy
+except ImportError:
+    Lazy = None
+if Lazy is not None:
+    for value in list(vars(module).values()):
+        if isinstance(value, Lazy):
+            value._load()
+built = time.perf_counter()
+print(json.dumps({'import': (imported - start) * 1000, 'clients': (built - imported) * 1000}))
+"""
+
+
+def measure(root, directory, module, env, importtime=False):
+    """One cold start in a fresh interpreter: {'import': ms, 'clients': ms}"""
+    path = os.pathsep.join([
+        os.path.join(root, directory),
+        os.path.join(root, 'lambda/layers/common/python')
+    ])
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD, module]
+    result = subprocess.run(
+        command, env=dict(env, PYTHONPATH=path), cwd=os.path.join(root, directory),
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_output, top):
+    """(cumulative ms, module) of the slowest direct imports of the handler module"""
+    imports = []
+    for line in importtime_output.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        # Direct children of the handler module are indented by three spaces
+        if name.startswith('   ') and not name.startswith('    '):
+            imports.append((int(parts[1]) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import and client init time of each Lambda function')
+    parser.add_argument('--root', default=ROOT, help='Repository checkout to measure')
+    parser.add_argument('--runs', type=int, default=10, help='Cold starts per function')
+    parser.add_argument('--function', action='append', help='Only measure these functions')
+    parser.add_argument('--prime', action='store_true', help='Set PRIME_CLIENTS=true')
+    parser.add_argument('--endpoint-url', help='AWS_ENDPOINT_URL for priming calls')
+    parser.add_argument('--top', type=int, default=0, help='Also list the N slowest imports per function')
+    args = parser.parse_args()
+
+    env = dict(os.environ, **ENVIRONMENT)
+    if args.prime:
+        env['PRIME_CLIENTS'] = 'true'
+    if args.endpoint_url:
+        env['AWS_ENDPOINT_URL'] = args.endpoint_url
+
+    print(f"{'function':<20} {'import p50':>11} {'clients p50':>12} {'total p50':>10} {'total max':>10}")
+    for name, directory, module in FUNCTIONS:
+        if args.function and name not in args.function:
+            continue
+        try:
+            samples = [measure(args.root, directory, module, env)[0] for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{name:<20} skipped: {str(e)}")
+            continue
+
+        totals = [sample['import'] + sample['clients'] for sample in samples]
+        print(
+            f"{name:<20} {statistics.median(s['import'] for s in samples):>9.1f}ms"
+            f" {statistics.median(s['clients'] for s in samples):>10.1f}ms"
+            f" {statistics.median(totals):>8.1f}ms {max(totals):>8.1f}ms"
+        )
+        if args.top:
+            _, output = measure(args.root, directory, module, env, importtime=True)
+            for milliseconds, imported in slowest_imports(output, args.top):
+                print(f"{'':<22}{milliseconds:>8.1f}ms  {imported}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Compare AWS client connection settings under concurrent load.
+
+A local stand-in DynamoDB endpoint (HTTP/1.1 keep-alive, optional TLS and
+simulated latency) answers every GetItem with an empty item. For each
+concurrency level, the same number of GetItem calls is issued from that many
+threads through one shared client, once with botocore's defaults and once
+with orders_common.clients.client_config(). The report shows throughput,
+latency and how many TCP connections the stand-in had to accept: a pool
+smaller than the thread count shows up as connections opened and dropped
+on every call.
+
+    python scripts/connection_pool_benchmark.py --latency-ms 5 --calls 2000
+
+Pass --certfile/--keyfile to serve TLS, which adds handshake cost to each
+new connection, as it does against the real endpoint.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import ssl
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+from botocore.config import Config
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../lambda/layers/common/python'))
+
+from orders_common.clients import client_config
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers every DynamoDB call with an empty JSON object"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.latency:
+            time.sleep(self.latency)
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-amz-json-1.0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, connections):
+        super().__init__(address, StandInHandler)
+        self.connections = connections
+
+    def process_request(self, request, client_address):
+        with self.connections.get_lock():
+            self.connections.value += 1
+        super().process_request(request, client_address)
+
+
+def serve(connection, connections, latency_ms, certfile, keyfile):
+    StandInHandler.latency = latency_ms / 1000
+    server = StandInServer(('127.0.0.1', 0), connections)
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    connection.send(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stand_in(latency_ms, certfile=None, keyfile=None):
+    """
+    Start the stand-in endpoint in its own process, so it does not compete
+    with the client threads for the GIL. Returns (process, endpoint URL,
+    shared count of accepted connections).
+    """
+    connections = multiprocessing.Value('i', 0)
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=serve, args=(sender, connections, latency_ms, certfile, keyfile), daemon=True
+    )
+    process.start()
+    port = receiver.recv()
+    return process, f"{'https' if certfile else 'http'}://127.0.0.1:{port}", connections
+
+
+def run_level(dynamodb, concurrency, calls):
+    """Issue calls GetItems from concurrency threads; returns (calls/s, latencies in ms)"""
+
+    def call(_):
+        start = time.perf_counter()
+        dynamodb.get_item(TableName='benchmark-orders', Key={'orderId': {'S': 'ORD-1'}})
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Warm the pool so only steady-state behaviour is measured
+        list(executor.map(call, range(concurrency)))
+        start = time.perf_counter()
+        latencies = list(executor.map(call, range(calls)))
+        elapsed = time.perf_counter() - start
+    return calls / elapsed, latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark AWS client pool settings against a local endpoint')
+    parser.add_argument('--calls', type=int, default=1000, help='Calls per concurrency level')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Simulated service latency')
+    parser.add_argument('--concurrency', type=int, action='append', help='Concurrency levels (default 1-64)')
+    parser.add_argument('--certfile', help='Serve TLS with this certificate')
+    parser.add_argument('--keyfile', help='Private key of --certfile')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON lines')
+    args = parser.parse_args()
+
+    # urllib3 warns on every connection dropped from a full pool, and on
+    # every request to the stand-in's self-signed certificate
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+    process, endpoint, connections = start_stand_in(args.latency_ms, args.certfile, args.keyfile)
+    configs = {
+        'default': Config(retries={'mode': 'standard'}),
+        'tuned': client_config()
+    }
+
+    if not args.json:
+        print(f"{'config':<8} {'threads':>7} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'connections':>12}")
+    for concurrency in args.concurrency or CONCURRENCY_LEVELS:
+        for name, config in configs.items():
+            dynamodb = boto3.client(
+                'dynamodb', endpoint_url=endpoint, region_name='us-east-1', config=config, verify=False,
+                aws_access_key_id='benchmark', aws_secret_access_key='benchmark'
+            )
+            opened = connections.value
+            throughput, latencies = run_level(dynamodb, concurrency, args.calls)
+            result = {
+                'config': name,
+                'concurrency': concurrency,
+                'callsPerSecond': round(throughput, 1),
+                'p50Ms': round(percentile(latencies, 0.50), 2),
+                'p99Ms': round(percentile(latencies, 0.99), 2),
+                'connections': connections.value - opened
+            }
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(
+                    f"{name:<8} {concurrency:>7} {result['callsPerSecond']:>9.1f} {result['p50Ms']:>8.2f}"
+                    f" {result['p99Ms']:>8.2f} {result['connections']:>12}"
+                )
+
+    process.terminate()
+
+
+if __name__ == '__main__':
+    main()
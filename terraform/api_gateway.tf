@@ -3,6 +3,10 @@ resource "aws_api_gateway_rest_api" "orders_api" {
   name        = "${var.project_name}-api"
   description = "Serverless Orders API"
 
+  # Lets Lambda proxy responses flagged isBase64Encoded (compressed bodies)
+  # pass through as binary; request bodies may then arrive base64 encoded
+  binary_media_types = ["*/*"]
+
   endpoint_configuration {
     types = ["REGIONAL"]
   }
@@ -24,6 +28,20 @@ resource "aws_api_gateway_resource" "order_by_id" {
   path_part   = "{orderId}"
 }
 
+# API Gateway Resource - Batch orders
+resource "aws_api_gateway_resource" "orders_batch" {
+  rest_api_id = aws_api_gateway_rest_api.orders_api.id
+  parent_id   = aws_api_gateway_resource.orders.id
+  path_part   = "batch"
+}
+
+# API Gateway Resource - Order statistics
+resource "aws_api_gateway_resource" "orders_stats" {
+  rest_api_id = aws_api_gateway_rest_api.orders_api.id
+  parent_id   = aws_api_gateway_resource.orders.id
+  path_part   = "stats"
+}
+
 # API Gateway Resource - PDF
 resource "aws_api_gateway_resource" "pdf" {
   rest_api_id = aws_api_gateway_rest_api.orders_api.id
@@ -49,6 +67,24 @@ resource "aws_api_gateway_method" "post_orders" {
   authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
 }
 
+# API Gateway Method - POST /orders/batch
+resource "aws_api_gateway_method" "post_orders_batch" {
+  rest_api_id   = aws_api_gateway_rest_api.orders_api.id
+  resource_id   = aws_api_gateway_resource.orders_batch.id
+  http_method   = "POST"
+  authorization = "CUSTOM"
+  authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
+}
+
+# API Gateway Method - GET /orders/stats
+resource "aws_api_gateway_method" "get_orders_stats" {
+  rest_api_id   = aws_api_gateway_rest_api.orders_api.id
+  resource_id   = aws_api_gateway_resource.orders_stats.id
+  http_method   = "GET"
+  authorization = "CUSTOM"
+  authorizer_id = aws_api_gateway_authorizer.cognito_authorizer.id
+}
+
 # API Gateway Method - GET /orders/{orderId}
 resource "aws_api_gateway_method" "get_order_by_id" {
   rest_api_id   = aws_api_gateway_rest_api.orders_api.id
@@ -135,6 +171,26 @@ resource "aws_api_gateway_integration" "orders_crud_integration" {
   uri                    = aws_lambda_function.orders_crud.invoke_arn
 }
 
+resource "aws_api_gateway_integration" "orders_batch_integration" {
+  rest_api_id = aws_api_gateway_rest_api.orders_api.id
+  resource_id = aws_api_gateway_resource.orders_batch.id
+  http_method = aws_api_gateway_method.post_orders_batch.http_method
+
+  integration_http_method = "POST"
+  type                   = "AWS_PROXY"
+  uri                    = aws_lambda_function.orders_crud.invoke_arn
+}
+
+resource "aws_api_gateway_integration" "orders_stats_integration" {
+  rest_api_id = aws_api_gateway_rest_api.orders_api.id
+  resource_id = aws_api_gateway_resource.orders_stats.id
+  http_method = aws_api_gateway_method.get_orders_stats.http_method
+
+  integration_http_method = "POST"
+  type                   = "AWS_PROXY"
+  uri                    = aws_lambda_function.orders_crud.invoke_arn
+}
+
 # PDF Generator Integration
 resource "aws_api_gateway_integration" "pdf_generator_integration" {
   rest_api_id = aws_api_gateway_rest_api.orders_api.id
@@ -167,6 +223,8 @@ resource "aws_lambda_permission" "api_gateway_pdf_generator" {
 resource "aws_api_gateway_deployment" "orders_api_deployment" {
   depends_on = [
     aws_api_gateway_integration.orders_crud_integration,
+    aws_api_gateway_integration.orders_batch_integration,
+    aws_api_gateway_integration.orders_stats_integration,
     aws_api_gateway_integration.pdf_generator_integration
   ]
 
@@ -178,6 +236,12 @@ resource "aws_api_gateway_deployment" "orders_api_deployment" {
       aws_api_gateway_method.get_orders.id,
       aws_api_gateway_method.post_orders.id,
       aws_api_gateway_integration.orders_crud_integration,
+      aws_api_gateway_resource.orders_batch.id,
+      aws_api_gateway_method.post_orders_batch.id,
+      aws_api_gateway_integration.orders_batch_integration,
+      aws_api_gateway_resource.orders_stats.id,
+      aws_api_gateway_method.get_orders_stats.id,
+      aws_api_gateway_integration.orders_stats_integration,
     ]))
   }
 
@@ -77,6 +77,116 @@ resource "aws_cloudwatch_dashboard" "serverless_dashboard" {
           title   = "API Gateway Metrics"
           period  = 300
         }
+      },
+      # Per-invocation metrics the functions log in embedded metric format
+      {
+        type   = "metric"
+        x      = 12
+        y      = 0
+        width  = 12
+        height = 6
+
+        properties = {
+          metrics = [
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName,Route} MetricName=\"Duration\"', 'p99', 300)", id = "e1" }]
+          ]
+          view    = "timeSeries"
+          stacked = false
+          region  = var.aws_region
+          title   = "Handler Duration p99 by Route"
+          period  = 300
+        }
+      },
+      {
+        type   = "metric"
+        x      = 12
+        y      = 6
+        width  = 12
+        height = 6
+
+        properties = {
+          metrics = [
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName} MetricName=\"ColdStart\"', 'Sum', 300)", id = "e1" }]
+          ]
+          view    = "timeSeries"
+          stacked = false
+          region  = var.aws_region
+          title   = "Cold Starts"
+          period  = 300
+        }
+      },
+      {
+        type   = "metric"
+        x      = 12
+        y      = 12
+        width  = 12
+        height = 6
+
+        properties = {
+          metrics = [
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName,Service,Operation} MetricName=\"Latency\"', 'p99', 300)", id = "e1" }]
+          ]
+          view    = "timeSeries"
+          stacked = false
+          region  = var.aws_region
+          title   = "AWS Call Latency p99 by Operation"
+          period  = 300
+        }
+      },
+      {
+        type   = "metric"
+        x      = 0
+        y      = 18
+        width  = 12
+        height = 6
+
+        properties = {
+          metrics = [
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName,Service,Operation} Service=\"dynamodb\" MetricName=\"ConsumedCapacity\"', 'Sum', 300)", id = "e1" }]
+          ]
+          view    = "timeSeries"
+          stacked = false
+          region  = var.aws_region
+          title   = "DynamoDB Consumed Capacity by Operation"
+          period  = 300
+        }
+      },
+      {
+        type   = "metric"
+        x      = 12
+        y      = 18
+        width  = 12
+        height = 6
+
+        properties = {
+          metrics = [
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName,Route} MetricName=\"RequestBytes\"', 'p99', 300)", id = "e1", label = "request" }],
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName,Route} MetricName=\"ResponseBytes\"', 'p99', 300)", id = "e2", label = "response" }]
+          ]
+          view    = "timeSeries"
+          stacked = false
+          region  = var.aws_region
+          title   = "Payload Sizes p99 by Route"
+          period  = 300
+        }
+      },
+      {
+        type   = "metric"
+        x      = 0
+        y      = 24
+        width  = 12
+        height = 6
+
+        properties = {
+          metrics = [
+            [{ expression = "SEARCH('{${local.metrics_namespace},FunctionName} MetricName=(\"DynamoDBThrottles\" OR \"DynamoDBRetries\" OR \"DynamoDBExhausted\")', 'Sum', 300)", id = "e1" }]
+          ]
+          view    = "timeSeries"
+          stacked = false
+          region  = var.aws_region
+          title   = "DynamoDB Throttles and Retries"
+          period  = 300
+        }
       }
     ]
   })
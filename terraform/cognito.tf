@@ -95,12 +95,14 @@ resource "aws_lambda_function" "cognito_authorizer" {
   handler         = "lambda_function.lambda_handler"
   source_code_hash = data.archive_file.cognito_authorizer_zip.output_base64sha256
   runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
   timeout         = 30
 
   environment {
     variables = {
       COGNITO_USER_POOL_ID = aws_cognito_user_pool.orders_user_pool.id
       COGNITO_CLIENT_ID    = aws_cognito_user_pool_client.orders_client.id
+      METRICS_NAMESPACE    = local.metrics_namespace
     }
   }
 
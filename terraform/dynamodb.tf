@@ -5,6 +5,10 @@ resource "aws_dynamodb_table" "orders" {
   hash_key       = "orderId"
   range_key      = "createdAt"
 
+  # Change stream consumed by notifications and the statistics counters
+  stream_enabled   = true
+  stream_view_type = "NEW_AND_OLD_IMAGES"
+
   attribute {
     name = "orderId"
     type = "S"
@@ -15,15 +19,73 @@ resource "aws_dynamodb_table" "orders" {
     type = "S"
   }
 
+  # Only declared while StatusIndex uses it: unindexed attributes are rejected
+  dynamic "attribute" {
+    for_each = var.keep_status_index ? [1] : []
+    content {
+      name = "status"
+      type = "S"
+    }
+  }
+
+  attribute {
+    name = "createdDay"
+    type = "S"
+  }
+
   attribute {
-    name = "status"
+    name = "customerEmailKey"
     type = "S"
   }
 
+  dynamic "attribute" {
+    for_each = var.status_shards > 1 ? [1] : []
+    content {
+      name = "statusShard"
+      type = "S"
+    }
+  }
+
   # Global Secondary Index for status queries
+  # Every new order lands on the "pending" partition; once sharded listing
+  # is live this index can be dropped with keep_status_index = false
+  dynamic "global_secondary_index" {
+    for_each = var.keep_status_index ? [1] : []
+    content {
+      name            = "StatusIndex"
+      hash_key        = "status"
+      range_key       = "createdAt"
+      projection_type = "ALL"
+    }
+  }
+
+  # Write-sharded status index: statusShard = "<status>#<0..status_shards-1>"
+  dynamic "global_secondary_index" {
+    for_each = var.status_shards > 1 ? [1] : []
+    content {
+      name            = "StatusShardIndex"
+      hash_key        = "statusShard"
+      range_key       = "createdAt"
+      projection_type = "ALL"
+    }
+  }
+
+  # Global Secondary Index for creation-time range queries, one bucket per
+  # UTC day write-sharded as createdDay = "<YYYY-MM-DD>#<0..created_day_shards-1>"
+  # so a day's inserts do not all land on one partition
   global_secondary_index {
-    name            = "StatusIndex"
-    hash_key        = "status"
+    name            = "CreatedDayIndex"
+    hash_key        = "createdDay"
+    range_key       = "createdAt"
+    projection_type = "ALL"
+  }
+
+  # Sparse Global Secondary Index for per-customer lookups:
+  # customerEmailKey is the trimmed, lower-cased customerEmail, set on write
+  # (scripts/backfill_customer_index.py tags orders written before it existed)
+  global_secondary_index {
+    name            = "CustomerIndex"
+    hash_key        = "customerEmailKey"
     range_key       = "createdAt"
     projection_type = "ALL"
   }
@@ -43,6 +105,64 @@ resource "aws_dynamodb_table" "orders" {
   })
 }
 
+# Order statistics counters, maintained from the orders change stream
+# statType = "status" | "day", statKey = status name | YYYY-MM-DD
+# statType = "applied" marks stream record groups already counted (expiring)
+resource "aws_dynamodb_table" "order_stats" {
+  name         = "${var.project_name}-orders-stats"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "statType"
+  range_key    = "statKey"
+
+  attribute {
+    name = "statType"
+    type = "S"
+  }
+
+  attribute {
+    name = "statKey"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = merge(local.common_tags, {
+    Name = "${var.project_name}-orders-stats-table"
+  })
+}
+
+# Idempotency-Key records for POST /orders and /orders/batch, expired by TTL
+resource "aws_dynamodb_table" "order_idempotency" {
+  name         = "${var.project_name}-orders-idempotency"
+  billing_mode = var.dynamodb_billing_mode
+  hash_key     = "idempotencyKey"
+
+  attribute {
+    name = "idempotencyKey"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = merge(local.common_tags, {
+    Name = "${var.project_name}-orders-idempotency-table"
+  })
+}
+
 # DynamoDB Contributor Insights
 resource "aws_dynamodb_contributor_insights" "orders" {
   count      = var.enable_contributor_insights ? 1 : 0
@@ -39,13 +39,28 @@ resource "aws_iam_policy" "lambda_dynamodb_s3_policy" {
           "dynamodb:Query",
           "dynamodb:Scan",
           "dynamodb:UpdateItem",
-          "dynamodb:DeleteItem"
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:DescribeTable"
         ]
         Resource = [
           aws_dynamodb_table.orders.arn,
-          "${aws_dynamodb_table.orders.arn}/index/*"
+          "${aws_dynamodb_table.orders.arn}/index/*",
+          aws_dynamodb_table.order_stats.arn,
+          aws_dynamodb_table.order_idempotency.arn
         ]
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Resource = "${aws_dynamodb_table.orders.arn}/stream/*"
+      },
       {
         Effect = "Allow"
         Action = [
@@ -74,6 +89,21 @@ resource "aws_iam_role_policy_attachment" "lambda_dynamodb_s3" {
   role       = aws_iam_role.lambda_execution_role.name
 }
 
+# Secret used to sign list_orders pagination cursors
+resource "random_password" "cursor_secret" {
+  length  = 32
+  special = false
+}
+
+# Lambda Layer - shared orders_common package and its dependencies, built by
+# null_resource.common_layer_build (lambda_source.tf)
+resource "aws_lambda_layer_version" "common" {
+  filename            = "lambda/common_layer.zip"
+  layer_name          = "${var.project_name}-common"
+  source_code_hash    = data.archive_file.common_layer_zip.output_base64sha256
+  compatible_runtimes = [var.lambda_runtime]
+}
+
 # Lambda Function - Orders CRUD
 resource "aws_lambda_function" "orders_crud" {
   filename         = "lambda/orders_crud.zip"
@@ -82,12 +112,32 @@ resource "aws_lambda_function" "orders_crud" {
   handler         = "lambda_function.lambda_handler"
   source_code_hash = data.archive_file.orders_crud_zip.output_base64sha256
   runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
   timeout         = 30
 
   environment {
     variables = {
       DYNAMODB_TABLE = aws_dynamodb_table.orders.name
       S3_BUCKET      = aws_s3_bucket.invoices.bucket
+      STATS_TABLE    = aws_dynamodb_table.order_stats.name
+      CURSOR_SECRET  = random_password.cursor_secret.result
+      MAX_PAGE_SIZE  = "100"
+      SCAN_SEGMENTS  = "4"
+      STATUS_SHARDS  = var.enable_status_sharding ? tostring(var.status_shards) : "1"
+
+      # Writes from other containers show up after the cache TTL, or after this check
+      ORDER_CACHE_VERIFY_AFTER_SECONDS = tostring(var.order_cache_verify_after_seconds)
+
+      CREATED_DAY_SHARDS      = tostring(var.created_day_shards)
+      ORDER_CACHE_TTL_SECONDS = "10"
+      IDEMPOTENCY_TABLE       = aws_dynamodb_table.order_idempotency.name
+      IDEMPOTENCY_TTL_SECONDS = "86400"
+      COMPRESSION_MIN_BYTES   = "1024"
+      METRICS_NAMESPACE       = local.metrics_namespace
+      PROFILE_ONE_IN          = tostring(var.profile_one_in)
+      PROFILE_BUCKET          = aws_s3_bucket.invoices.bucket
+      # Provisioned concurrency runs init ahead of traffic: open connections there
+      PRIME_CLIENTS           = "true"
     }
   }
 
@@ -104,11 +154,15 @@ resource "aws_lambda_function" "pdf_generator" {
   handler         = "lambda_function.lambda_handler"
   source_code_hash = data.archive_file.pdf_generator_zip.output_base64sha256
   runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
   timeout         = 60
 
   environment {
     variables = {
-      S3_BUCKET = aws_s3_bucket.invoices.bucket
+      S3_BUCKET         = aws_s3_bucket.invoices.bucket
+      METRICS_NAMESPACE = local.metrics_namespace
+      PROFILE_ONE_IN    = tostring(var.profile_one_in)
+      PROFILE_BUCKET    = aws_s3_bucket.invoices.bucket
     }
   }
 
@@ -117,6 +171,199 @@ resource "aws_lambda_function" "pdf_generator" {
   })
 }
 
+# Lambda Function - Nightly orders export (gzip'd NDJSON to S3)
+# Shares the orders_crud package; exports/<date>/ holds the data object and
+# its resume checkpoint
+resource "aws_lambda_function" "orders_export" {
+  filename         = "lambda/orders_crud.zip"
+  function_name    = "${var.project_name}-orders-export"
+  role            = aws_iam_role.lambda_execution_role.arn
+  handler         = "orders_export.lambda_handler"
+  source_code_hash = data.archive_file.orders_crud_zip.output_base64sha256
+  runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
+  timeout         = 900
+  memory_size     = 1024
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE           = aws_dynamodb_table.orders.name
+      S3_BUCKET                = aws_s3_bucket.invoices.bucket
+      EXPORT_SEGMENTS          = "8"
+      EXPORT_CAPACITY_FRACTION = "0.25"
+      METRICS_NAMESPACE        = local.metrics_namespace
+    }
+  }
+
+  tags = merge(local.common_tags, {
+    Name = "${var.project_name}-orders-export-lambda"
+  })
+}
+
+resource "aws_cloudwatch_event_rule" "orders_export_nightly" {
+  name                = "${var.project_name}-orders-export-nightly"
+  description         = "Nightly export of all orders for finance"
+  schedule_expression = "cron(0 3 * * ? *)"  # 03:00 UTC
+
+  tags = local.common_tags
+}
+
+resource "aws_cloudwatch_event_target" "orders_export_nightly" {
+  rule = aws_cloudwatch_event_rule.orders_export_nightly.name
+  arn  = aws_lambda_function.orders_export.arn
+}
+
+resource "aws_lambda_permission" "orders_export_schedule" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.orders_export.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.orders_export_nightly.arn
+}
+
+# Lets a paused export hand over to a fresh invocation of itself
+resource "aws_iam_role_policy" "orders_export_continue" {
+  name = "${var.project_name}-orders-export-continue"
+  role = aws_iam_role.lambda_execution_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["lambda:InvokeFunction"]
+        Resource = "arn:aws:lambda:*:*:function:${var.project_name}-orders-export"
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_function" "orders_import" {
+  filename         = "lambda/orders_crud.zip"
+  function_name    = "${var.project_name}-orders-import"
+  role            = aws_iam_role.lambda_execution_role.arn
+  handler         = "orders_import.lambda_handler"
+  source_code_hash = data.archive_file.orders_crud_zip.output_base64sha256
+  runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
+  timeout         = 900
+  memory_size     = 1024
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE           = aws_dynamodb_table.orders.name
+      S3_BUCKET                = aws_s3_bucket.invoices.bucket
+      IMPORT_CAPACITY_FRACTION = "0.5"
+      STATUS_SHARDS            = var.enable_status_sharding ? tostring(var.status_shards) : "1"
+      CREATED_DAY_SHARDS       = tostring(var.created_day_shards)
+      METRICS_NAMESPACE        = local.metrics_namespace
+    }
+  }
+
+  tags = merge(local.common_tags, {
+    Name = "${var.project_name}-orders-import-lambda"
+  })
+}
+
+# A retried S3 event would import the whole object a second time under new IDs
+resource "aws_lambda_function_event_invoke_config" "orders_import" {
+  function_name          = aws_lambda_function.orders_import.function_name
+  maximum_retry_attempts = 0
+}
+
+resource "aws_lambda_permission" "orders_import_s3" {
+  statement_id  = "AllowExecutionFromS3"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.orders_import.function_name
+  principal     = "s3.amazonaws.com"
+  source_arn    = aws_s3_bucket.invoices.arn
+}
+
+# Order statistics counters from the table's change stream. A consumer of
+# its own, so a failed counter update is retried (from the failed record,
+# without re-sending notifications) instead of being dropped
+resource "aws_lambda_function" "order_stats" {
+  filename         = "lambda/orders_crud.zip"
+  function_name    = "${var.project_name}-order-stats"
+  role            = aws_iam_role.lambda_execution_role.arn
+  handler         = "order_stats.lambda_handler"
+  source_code_hash = data.archive_file.orders_crud_zip.output_base64sha256
+  runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
+  timeout         = 60
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE    = aws_dynamodb_table.orders.name
+      STATS_TABLE       = aws_dynamodb_table.order_stats.name
+      METRICS_NAMESPACE = local.metrics_namespace
+    }
+  }
+
+  tags = merge(local.common_tags, {
+    Name = "${var.project_name}-order-stats-lambda"
+  })
+}
+
+resource "aws_lambda_event_source_mapping" "order_stats_stream" {
+  event_source_arn        = aws_dynamodb_table.orders.stream_arn
+  function_name           = aws_lambda_function.order_stats.arn
+  starting_position       = "LATEST"
+  batch_size              = 100
+  function_response_types = ["ReportBatchItemFailures"]
+  maximum_retry_attempts  = 10
+
+  # Records still failing after the retries are recorded here rather than lost
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.order_stats_dlq.arn
+    }
+  }
+}
+
+resource "aws_sqs_queue" "order_stats_dlq" {
+  name                      = "${var.project_name}-order-stats-dlq"
+  message_retention_seconds = 1209600  # 14 days
+
+  tags = local.common_tags
+}
+
+resource "aws_iam_role_policy" "order_stats_dlq" {
+  name = "${var.project_name}-order-stats-dlq"
+  role = aws_iam_role.lambda_execution_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["sqs:SendMessage"]
+        Resource = aws_sqs_queue.order_stats_dlq.arn
+      }
+    ]
+  })
+}
+
+# The counters are off by the records that land here
+resource "aws_cloudwatch_metric_alarm" "order_stats_dlq_messages" {
+  alarm_name          = "${var.project_name}-order-stats-dlq-messages"
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = "1"
+  metric_name         = "ApproximateNumberOfVisibleMessages"
+  namespace           = "AWS/SQS"
+  period              = "300"
+  statistic           = "Average"
+  threshold           = "0"
+  alarm_description   = "Order stream records whose counter updates could not be applied"
+  alarm_actions       = [aws_sns_topic.alerts.arn]
+
+  dimensions = {
+    QueueName = aws_sqs_queue.order_stats_dlq.name
+  }
+
+  tags = local.common_tags
+}
+
 # Lambda Provisioned Concurrency (for peak hours)
 resource "aws_lambda_provisioned_concurrency_config" "orders_crud_provisioned" {
   function_name                     = aws_lambda_function.orders_crud.function_name
@@ -1,7 +1,7 @@
 # Data sources for Lambda function code
 data "archive_file" "orders_crud_zip" {
   type        = "zip"
-  source_file = "lambda/orders_crud/lambda_function.py"
+  source_dir  = "lambda/orders_crud"
   output_path = "lambda/orders_crud.zip"
 }
 
@@ -21,4 +21,38 @@ data "archive_file" "sns_notification_zip" {
   type        = "zip"
   source_file = "lambda/sns_notification/lambda_function.py"
   output_path = "lambda/sns_notification.zip"
-}
\ No newline at end of file
+}
+# Shared code layer (orders_common) plus its pip dependencies (orjson, ...),
+# rebuilt for the Lambda runtime whenever the package or requirements change
+resource "null_resource" "common_layer_build" {
+  triggers = {
+    requirements = filesha1("lambda/layers/common/requirements.txt")
+    sources = sha1(join("", [
+      for name in sort(fileset("lambda/layers/common/python", "**/*.py")) :
+      filesha1("lambda/layers/common/python/${name}")
+    ]))
+    runtime = var.lambda_runtime
+  }
+
+  provisioner "local-exec" {
+    command = <<-EOT
+      set -e
+      rm -rf lambda/build/common_layer
+      mkdir -p lambda/build/common_layer
+      cp -R lambda/layers/common/python lambda/build/common_layer/python
+      find lambda/build/common_layer -name __pycache__ -type d -prune -exec rm -rf {} +
+      pip install -r lambda/layers/common/requirements.txt -t lambda/build/common_layer/python \
+        --platform manylinux2014_x86_64 --implementation cp \
+        --python-version ${trimprefix(var.lambda_runtime, "python")} --only-binary=:all:
+    EOT
+  }
+}
+
+# Installed under /opt/python
+data "archive_file" "common_layer_zip" {
+  type        = "zip"
+  source_dir  = "lambda/build/common_layer"
+  output_path = "lambda/common_layer.zip"
+
+  depends_on = [null_resource.common_layer_build]
+}
@@ -9,6 +9,10 @@ terraform {
       source  = "hashicorp/random"
       version = "~> 3.4"
     }
+    null = {
+      source  = "hashicorp/null"
+      version = "~> 3.2"
+    }
   }
 }
 
@@ -37,6 +41,9 @@ data "aws_region" "current" {}
 locals {
   account_id = data.aws_caller_identity.current.account_id
   region     = data.aws_region.current.name
+
+  # CloudWatch namespace of the functions' embedded-format (EMF) metrics
+  metrics_namespace = var.project_name
   
   common_tags = {
     Project     = "Serverless-AWS-Academy"
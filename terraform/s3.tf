@@ -78,6 +78,33 @@ resource "aws_s3_bucket_lifecycle_configuration" "invoices" {
       days_after_initiation = 7
     }
   }
+
+  # Sampled invocation profiles (PROFILE_ONE_IN) are only useful for a while
+  rule {
+    id     = "profiles_expiration"
+    status = "Enabled"
+
+    filter {
+      prefix = "profiles/"
+    }
+
+    expiration {
+      days = 14
+    }
+  }
+}
+
+# Bulk order imports: files dropped under imports/ are loaded into the orders table
+resource "aws_s3_bucket_notification" "invoices" {
+  bucket = aws_s3_bucket.invoices.id
+
+  lambda_function {
+    lambda_function_arn = aws_lambda_function.orders_import.arn
+    events              = ["s3:ObjectCreated:*"]
+    filter_prefix       = "imports/"
+  }
+
+  depends_on = [aws_lambda_permission.orders_import_s3]
 }
 
 # CloudWatch Alarms for S3
@@ -153,12 +153,14 @@ resource "aws_lambda_function" "sns_notification" {
   handler         = "lambda_function.lambda_handler"
   source_code_hash = data.archive_file.sns_notification_zip.output_base64sha256
   runtime         = var.lambda_runtime
+  layers          = [aws_lambda_layer_version.common.arn]
   timeout         = 30
 
   environment {
     variables = {
-      SNS_TOPIC_ARN  = aws_sns_topic.order_events.arn
-      DYNAMODB_TABLE = aws_dynamodb_table.orders.name
+      SNS_TOPIC_ARN     = aws_sns_topic.order_events.arn
+      DYNAMODB_TABLE    = aws_dynamodb_table.orders.name
+      METRICS_NAMESPACE = local.metrics_namespace
     }
   }
 
@@ -167,6 +169,14 @@ resource "aws_lambda_function" "sns_notification" {
   })
 }
 
+# Order notifications from the table's change stream
+resource "aws_lambda_event_source_mapping" "sns_notification_stream" {
+  event_source_arn  = aws_dynamodb_table.orders.stream_arn
+  function_name     = aws_lambda_function.sns_notification.arn
+  starting_position = "LATEST"
+  batch_size        = 100
+}
+
 # IAM Role for Lambda SNS function
 resource "aws_iam_role" "lambda_sns_role" {
   name = "${var.project_name}-lambda-sns-role"
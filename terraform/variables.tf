@@ -44,4 +44,39 @@ variable "enable_contributor_insights" {
   description = "Enable DynamoDB contributor insights"
   type        = bool
   default     = true
-}
\ No newline at end of file
+}
+variable "created_day_shards" {
+  description = "Write shards per UTC day on CreatedDayIndex; run scripts/backfill_created_days.py after changing it"
+  type        = number
+  default     = 4
+}
+
+variable "status_shards" {
+  description = "Write shards per order status on StatusShardIndex (1 = no sharded index)"
+  type        = number
+  default     = 1
+}
+
+variable "enable_status_sharding" {
+  description = "Write and read the sharded status key; enable after backfilling existing orders"
+  type        = bool
+  default     = false
+}
+
+variable "profile_one_in" {
+  description = "Profile about one in N invocations of orders_crud and pdf_generator (0 = off)"
+  type        = number
+  default     = 0
+}
+
+variable "keep_status_index" {
+  description = "Keep the unsharded StatusIndex; drop it once sharded listing is live to remove the hot partition"
+  type        = bool
+  default     = true
+}
+
+variable "order_cache_verify_after_seconds" {
+  description = "Check a cached order's updatedAt against the table once the entry is this old (0 = TTL only)"
+  type        = number
+  default     = 0
+}
@@ -0,0 +1,121 @@
+"""
+Fixtures for the handler benchmarks (pytest -m benchmark).
+
+Results are compared with tests/benchmark/baselines.json: a benchmark fails
+when its p50 is more than BENCHMARK_TOLERANCE (default 50%) slower than its
+baseline, or its p95 more than BENCHMARK_TAIL_TOLERANCE (default 300%; tail
+latencies on a shared runner are noisy). Run with BENCHMARK_UPDATE=1 to record new baselines, on
+the machine the suite is normally run on.
+"""
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../benchmarks'))
+
+from local_stack import LocalStack
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# Orders seeded per dataset, e.g. BENCHMARK_ORDERS=10000,100000
+DATASET_SIZES = [int(size) for size in os.environ.get('BENCHMARK_ORDERS', '10000').split(',')]
+ITERATIONS = int(os.environ.get('BENCHMARK_ITERATIONS', 100))
+WARMUP = int(os.environ.get('BENCHMARK_WARMUP', 5))
+TOLERANCE = float(os.environ.get('BENCHMARK_TOLERANCE', 0.5))
+TAIL_TOLERANCE = float(os.environ.get('BENCHMARK_TAIL_TOLERANCE', 3.0))
+# Differences below this are noise whatever the ratio
+MIN_REGRESSION_MS = float(os.environ.get('BENCHMARK_MIN_REGRESSION_MS', 1.0))
+UPDATE_BASELINES = os.environ.get('BENCHMARK_UPDATE', '').lower() in ('1', 'true')
+
+_results = {}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES_FILE):
+        return {}
+    with open(BASELINES_FILE) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='session', params=DATASET_SIZES, ids=lambda size: f'{size // 1000}k')
+def stack(request):
+    """moto stack seeded with a dataset of the parametrized size"""
+    local = LocalStack().start()
+    local.size = request.param
+    local.keys = local.seed(request.param)
+    yield local
+    local.stop()
+
+
+@pytest.fixture
+def bench(request, stack):
+    """
+    bench(name, call, iterations=ITERATIONS): time call(i) for each
+    iteration after a warm-up, record p50/p95/p99 and fail on regression
+    against the stored baseline.
+    """
+    def run(name, call, iterations=ITERATIONS):
+        key = f"{name} [{stack.size // 1000}k]"
+        for i in range(WARMUP):
+            call(i)
+
+        latencies = []
+        start = time.perf_counter()
+        for i in range(WARMUP, WARMUP + iterations):
+            call_start = time.perf_counter()
+            call(i)
+            latencies.append((time.perf_counter() - call_start) * 1000)
+        elapsed = time.perf_counter() - start
+
+        result = {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'perSecond': round(iterations / elapsed, 1)
+        }
+        _results[key] = result
+
+        baseline = load_baselines().get(key)
+        if baseline is None or UPDATE_BASELINES:
+            return result
+        regressions = [
+            f"{stat} {result[stat]:.2f} ms vs baseline {baseline[stat]:.2f} ms"
+            for stat, tolerance in (('p50', TOLERANCE), ('p95', TAIL_TOLERANCE))
+            if result[stat] > baseline[stat] * (1 + tolerance) and result[stat] - baseline[stat] > MIN_REGRESSION_MS
+        ]
+        if regressions:
+            pytest.fail(f"{key} regressed: {'; '.join(regressions)}")
+        return result
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if UPDATE_BASELINES and _results:
+        baselines = load_baselines()
+        baselines.update(_results)
+        with open(BASELINES_FILE, 'w') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write('\n')
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    baselines = load_baselines()
+    terminalreporter.section('handler benchmarks (ms)')
+    terminalreporter.write_line(f"{'benchmark':<52} {'p50':>8} {'p95':>8} {'p99':>8} {'calls/s':>8} {'base p95':>9}")
+    for key, result in sorted(_results.items()):
+        baseline = baselines.get(key, {}).get('p95')
+        terminalreporter.write_line(
+            f"{key:<52} {result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f}"
+            f" {result['perSecond']:>8.1f} {baseline if baseline is not None else '-':>9}"
+        )
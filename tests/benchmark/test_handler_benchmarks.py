@@ -0,0 +1,151 @@
+"""
+Latency benchmarks of every handler against moto, by route.
+
+Run with:
+    pytest -m benchmark tests/benchmark
+    BENCHMARK_ORDERS=10000,100000 BENCHMARK_ITERATIONS=200 pytest -m benchmark tests/benchmark
+"""
+import json
+import random
+
+import pytest
+
+from local_stack import LocalApi, load_function, make_order_data, make_orders, stream_records
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope='module')
+def api():
+    # Routes are benchmarked without the authorizer; it has its own benchmark
+    return LocalApi(authorize=False)
+
+
+def ok(response, status=200):
+    assert response['statusCode'] == status, response.get('body')
+    return response
+
+
+class TestOrdersCrudBenchmarks:
+    """Benchmarks for the orders_crud routes"""
+
+    def test_get_order(self, bench, stack, api):
+        # Arrange: a different order on every call, so the warm cache never answers
+        keys = stack.keys
+
+        # Act & Assert
+        bench('GET /orders/{orderId}', lambda i: ok(
+            api.request('GET', f"/orders/{keys[i % len(keys)]['orderId']}")[1]
+        ))
+
+    def test_get_orders_by_ids(self, bench, stack, api):
+        # Arrange
+        keys = stack.keys
+
+        def call(i):
+            ids = ','.join(key['orderId'] for key in keys[i * 25 % len(keys):][:25])
+            ok(api.request('GET', '/orders', query={'ids': ids})[1])
+
+        # Act & Assert
+        bench('GET /orders?ids= (25)', call)
+
+    def test_list_orders_by_status(self, bench, stack, api):
+        # Act & Assert
+        bench('GET /orders?status=', lambda i: ok(
+            api.request('GET', '/orders', query={'status': 'pending', 'limit': '50'})[1]
+        ))
+
+    def test_list_orders(self, bench, stack, api):
+        # Act & Assert
+        bench('GET /orders', lambda i: ok(
+            api.request('GET', '/orders', query={'limit': '50'})[1]
+        ))
+
+    def test_order_stats(self, bench, stack, api):
+        # Act & Assert
+        bench('GET /orders/stats', lambda i: ok(api.request('GET', '/orders/stats')[1]))
+
+    def test_create_order(self, bench, stack, api):
+        # Arrange
+        rng = random.Random(1)
+
+        # Act & Assert
+        bench('POST /orders', lambda i: ok(
+            api.request('POST', '/orders', body=make_order_data(rng))[1], 201
+        ))
+
+    def test_create_orders_batch(self, bench, stack, api):
+        # Arrange
+        rng = random.Random(2)
+
+        # Act & Assert
+        bench('POST /orders/batch (100)', lambda i: ok(
+            api.request('POST', '/orders/batch', body={'orders': [make_order_data(rng) for _ in range(100)]})[1],
+            201
+        ), iterations=20)
+
+    def test_update_order(self, bench, stack, api):
+        # Arrange
+        keys = stack.keys
+        statuses = ['pending', 'processing', 'completed']
+
+        # Act & Assert
+        bench('PUT /orders/{orderId}', lambda i: ok(api.request(
+            'PUT', f"/orders/{keys[-1 - i % len(keys)]['orderId']}", body={'status': statuses[i % 3]}
+        )[1]))
+
+    def test_delete_order(self, bench, stack, api):
+        # Arrange: delete freshly created orders, leaving the dataset intact
+        rng = random.Random(3)
+        created = [
+            json.loads(ok(api.request('POST', '/orders', body=make_order_data(rng, 5))[1], 201)['body'])['orderId']
+            for _ in range(105)
+        ]
+
+        # Act & Assert
+        bench('DELETE /orders/{orderId}', lambda i: ok(
+            api.request('DELETE', f"/orders/{created[i % len(created)]}")[1]
+        ))
+
+
+class TestPdfGeneratorBenchmarks:
+    """Benchmarks for the invoice route"""
+
+    def test_generate_invoice(self, bench, stack, api):
+        # Arrange
+        keys = stack.keys
+
+        # Act & Assert
+        bench('GET /orders/{orderId}/pdf', lambda i: ok(
+            api.request('GET', f"/orders/{keys[i * 7 % len(keys)]['orderId']}/pdf")[1]
+        ))
+
+
+class TestNotificationBenchmarks:
+    """Benchmarks for the stream consumer"""
+
+    def test_stream_batch(self, bench, stack):
+        # Arrange: a full stream batch of new orders
+        handler = load_function('sns_notification').lambda_handler
+        event = {'Records': stream_records(list(make_orders(100, seed=4)))}
+
+        # Act & Assert
+        bench('sns_notification (100 INSERT records)', lambda i: ok(handler(event, None)), iterations=20)
+
+
+class TestAuthorizerBenchmarks:
+    """Benchmarks for the custom authorizer"""
+
+    def test_authorize(self, bench, stack):
+        # Arrange
+        pytest.importorskip('jwt')
+        api = LocalApi()
+        handler = api.handler('cognito_authorizer')
+        event = {
+            'type': 'REQUEST',
+            'methodArn': 'arn:aws:execute-api:us-east-1:123456789012:local/dev/GET/orders',
+            'headers': {'Authorization': f'Bearer {api.token}'}
+        }
+
+        # Act & Assert
+        bench('cognito_authorizer', lambda i: handler(event, None), iterations=500)
@@ -0,0 +1,10 @@
+"""Environment the Lambda modules read at import time"""
+import os
+
+# Region of the moto resources the tests create, and the names of the table
+# and bucket the handlers are configured with
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('DYNAMODB_TABLE', 'test-orders')
+os.environ.setdefault('S3_BUCKET', 'test-bucket')
+# Pagination cursors are refused without a signing key
+os.environ.setdefault('CURSOR_SECRET', 'test-cursor-secret')
@@ -0,0 +1,58 @@
+"""Orders tables shared by the unit tests: a moto table and a fake segmented scan"""
+import zlib
+from unittest.mock import Mock
+
+import boto3
+
+
+def create_orders_table(**indexes):
+    """
+    Create the orders table (orderId + createdAt) in moto, inside an active
+    mock_dynamodb. indexes maps a GSI name to its hash key; every index uses
+    createdAt as range key, as in terraform/dynamodb.tf.
+    """
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    kwargs = {
+        'TableName': 'test-orders',
+        'KeySchema': [
+            {'AttributeName': 'orderId', 'KeyType': 'HASH'},
+            {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': name, 'AttributeType': 'S'}
+            for name in ['orderId', 'createdAt'] + sorted(set(indexes.values()))
+        ],
+        'BillingMode': 'PAY_PER_REQUEST'
+    }
+    if indexes:
+        kwargs['GlobalSecondaryIndexes'] = [{
+            'IndexName': name,
+            'KeySchema': [
+                {'AttributeName': hash_key, 'KeyType': 'HASH'},
+                {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+            ],
+            'Projection': {'ProjectionType': 'ALL'}
+        } for name, hash_key in indexes.items()]
+    return dynamodb.create_table(**kwargs)
+
+
+def make_segmented_table(items, page_size=3):
+    """Build a fake table whose client honours Segment/TotalSegments and Limit (page_size without one)"""
+    def scan(TableName, Segment, TotalSegments, Limit=None, ExclusiveStartKey=None, **kwargs):
+        limit = Limit or page_size
+        segment_items = sorted(
+            (item for item in items if zlib.crc32(item['orderId'].encode()) % TotalSegments == Segment),
+            key=lambda item: item['orderId']
+        )
+        if ExclusiveStartKey:
+            segment_items = [item for item in segment_items if item['orderId'] > ExclusiveStartKey['orderId']]
+        page = segment_items[:limit]
+        response = {'Items': page, 'ConsumedCapacity': {'CapacityUnits': 0.5}}
+        if len(segment_items) > limit:
+            response['LastEvaluatedKey'] = {'orderId': page[-1]['orderId'], 'createdAt': page[-1]['createdAt']}
+        return response
+
+    table = Mock()
+    table.name = 'test-orders'
+    table.meta.client.scan.side_effect = scan
+    return table
@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add lambda and layer directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from botocore.exceptions import ClientError
+
+from orders_common.dynamodb import AdaptiveRateLimiter, RetryCounters
+from batch_write import backoff_delay, batch_put_items, chunked
+from batch_get import batch_get_items
+
+class TestBatchWrite(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table = Mock()
+        self.table.name = 'test-orders'
+        self.items = [{'orderId': f'ORD-{i:08d}', 'createdAt': '2025-01-18T10:30:00Z'} for i in range(60)]
+        # Unprocessed items count as throttles: keep the shared limiter out of it
+        self.counters = RetryCounters()
+        for name, value in [('rate_limiter', AdaptiveRateLimiter()), ('retry_counters', self.counters)]:
+            patcher = patch(f'orders_common.dynamodb.{name}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_chunked_respects_batch_limit(self):
+        """Test items are split into 25-item chunks"""
+        self.assertEqual([len(chunk) for chunk in chunked(self.items, 25)], [25, 25, 10])
+
+    def test_backoff_delay_is_bounded(self):
+        """Test jittered backoff never exceeds the cap"""
+        for attempt in range(20):
+            self.assertLessEqual(backoff_delay(attempt), 2.0)
+
+    @patch('batch_write.time.sleep')
+    def test_unprocessed_items_are_retried(self, mock_sleep):
+        """Test UnprocessedItems are resent until DynamoDB accepts them"""
+        # Arrange
+        unprocessed = {'test-orders': [{'PutRequest': {'Item': self.items[0]}}]}
+        self.table.meta.client.batch_write_item.side_effect = [
+            {'UnprocessedItems': unprocessed},
+            {'UnprocessedItems': {}}
+        ]
+
+        # Act
+        failed = batch_put_items(self.table, self.items[:10])
+
+        # Assert
+        self.assertEqual(failed, [])
+        self.assertEqual(self.table.meta.client.batch_write_item.call_count, 2)
+        mock_sleep.assert_called_once()
+        self.assertEqual(self.counters.snapshot()['throttles'], 1)
+
+    @patch('batch_write.time.sleep')
+    def test_exhausted_retries_return_failed_items(self, mock_sleep):
+        """Test items still unprocessed after all retries are returned"""
+        # Arrange
+        unprocessed = {'test-orders': [{'PutRequest': {'Item': self.items[0]}}]}
+        self.table.meta.client.batch_write_item.return_value = {'UnprocessedItems': unprocessed}
+
+        # Act
+        failed = batch_put_items(self.table, self.items[:10], max_retries=2)
+
+        # Assert
+        self.assertEqual(failed, [self.items[0]])
+        self.assertEqual(self.table.meta.client.batch_write_item.call_count, 3)
+
+    @patch('batch_get.time.sleep')
+    def test_batch_get_retries_unprocessed_keys(self, mock_sleep):
+        """Test UnprocessedKeys are re-requested and all items returned"""
+        # Arrange
+        keys = self.items[:3]
+        self.table.meta.client.batch_get_item.side_effect = [
+            {'Responses': {'test-orders': keys[:2]},
+             'UnprocessedKeys': {'test-orders': {'Keys': keys[2:]}}},
+            {'Responses': {'test-orders': keys[2:]}}
+        ]
+
+        # Act
+        items, unprocessed = batch_get_items(self.table, keys)
+
+        # Assert
+        self.assertEqual(items, keys)
+        self.assertEqual(unprocessed, [])
+        retry = self.table.meta.client.batch_get_item.call_args_list[1].kwargs
+        self.assertEqual(retry['RequestItems']['test-orders']['Keys'], keys[2:])
+
+    @patch('batch_get.time.sleep')
+    def test_batch_get_returns_keys_left_unprocessed(self, mock_sleep):
+        """Test keys still unprocessed after the last retry are returned, not dropped"""
+        # Arrange
+        keys = self.items[:3]
+        self.table.meta.client.batch_get_item.return_value = {
+            'Responses': {'test-orders': []},
+            'UnprocessedKeys': {'test-orders': {'Keys': keys}}
+        }
+
+        # Act
+        items, unprocessed = batch_get_items(self.table, keys, max_retries=2)
+
+        # Assert
+        self.assertEqual(items, [])
+        self.assertEqual(unprocessed, keys)
+        self.assertEqual(self.table.meta.client.batch_get_item.call_count, 3)
+
+    def test_batch_get_raises_client_errors(self):
+        """Test a failed BatchGetItem call is raised instead of read as missing items"""
+        # Arrange
+        self.table.meta.client.batch_get_item.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Slow down'}}, 'BatchGetItem'
+        )
+
+        # Act / Assert
+        with self.assertRaises(ClientError):
+            batch_get_items(self.table, self.items[:3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add layer directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from orders_common.clients import Lazy, client, client_config, prime
+from orders_common.dynamodb import dynamodb_resource
+
+class TestLazyClients(unittest.TestCase):
+
+    def test_client_is_built_on_first_use(self):
+        """Test the factory only runs when an attribute is first used"""
+        # Arrange
+        client = Mock()
+        factory = Mock(return_value=client)
+
+        # Act
+        lazy = Lazy(factory)
+        factory.assert_not_called()
+        lazy.get_item(Key={'orderId': 'ORD-1'})
+        lazy.get_item(Key={'orderId': 'ORD-2'})
+
+        # Assert
+        factory.assert_called_once_with()
+        self.assertEqual(client.get_item.call_count, 2)
+
+    def test_concurrent_first_use_builds_once(self):
+        """Test threads racing on a cold client share one instance"""
+        factory = Mock(side_effect=lambda: Mock(name='client'))
+        lazy = Lazy(factory)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            names = set(executor.map(lambda _: id(lazy.meta), range(64)))
+
+        factory.assert_called_once_with()
+        self.assertEqual(len(names), 1)
+
+    def test_priming_is_opt_in_and_never_fails(self):
+        """Test priming calls only run with PRIME_CLIENTS and their errors are swallowed"""
+        # Arrange
+        failing = Mock(side_effect=RuntimeError('no network'))
+        succeeding = Mock()
+
+        # Act
+        prime(failing, succeeding)
+        with patch('orders_common.clients.PRIME_CLIENTS', True):
+            prime(failing, succeeding)
+
+        # Assert
+        failing.assert_called_once_with()
+        succeeding.assert_called_once_with()
+
+class TestClientFactory(unittest.TestCase):
+
+    def test_shared_settings_apply_to_every_client(self):
+        """Test clients get the tuned pool, keepalive, timeouts and retry mode"""
+        config = client('s3', region_name='us-east-1').meta.config
+
+        self.assertEqual(config.max_pool_connections, 50)
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.connect_timeout, 2)
+        self.assertEqual(config.read_timeout, 10)
+        self.assertEqual(config.retries, {'mode': 'standard', 'total_max_attempts': 3})
+
+    def test_overrides_take_precedence(self):
+        """Test per-client settings override the shared ones"""
+        config = client_config(max_pool_connections=8, read_timeout=3)
+
+        self.assertEqual(config.max_pool_connections, 8)
+        self.assertEqual(config.read_timeout, 3)
+        self.assertTrue(config.tcp_keepalive)
+
+    @patch('orders_common.clients.AWS_MAX_POOL_CONNECTIONS', 16)
+    def test_dynamodb_resource_uses_shared_pool(self):
+        """Test the DynamoDB resource keeps the shared pool and leaves retries to the adaptive hook"""
+        config = dynamodb_resource().meta.client.meta.config
+
+        self.assertEqual(config.max_pool_connections, 16)
+        self.assertEqual(config.retries['total_max_attempts'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
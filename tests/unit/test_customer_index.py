@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+import itertools
+import json
+import sys
+import os
+from moto import mock_dynamodb
+
+# Add lambda, layer and scripts directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../scripts'))
+
+from lambda_function import create_order, list_orders
+from order_model import normalize_email
+from order_ids import OrderIdGenerator
+from backfill_customer_index import backfill
+from table_fixtures import create_orders_table
+
+class TestCustomerIndex(unittest.TestCase):
+
+    def test_normalize_email(self):
+        """Test emails are matched regardless of case and surrounding spaces"""
+        self.assertEqual(normalize_email(' Ana.Gomez@Example.COM '), 'ana.gomez@example.com')
+        self.assertEqual(normalize_email(None), '')
+
+    @mock_dynamodb
+    def test_customer_orders_are_paged(self):
+        """Test GET /orders?customerEmail= pages through exactly that customer's orders"""
+        # Arrange
+        table = create_orders_table(CustomerIndex='customerEmailKey')
+        # One second per order: equal createdAt sort keys page in no fixed order
+        with patch('lambda_function.table', table), patch('order_ids._generator', OrderIdGenerator()), \
+                patch('order_ids.time') as clock:
+            clock.time.side_effect = itertools.count(1737196200)
+            created = []
+            for n in range(5):
+                created.append(json.loads(create_order({'customerEmail': 'Ana@Example.com', 'amount': n})['body']))
+                create_order({'customerEmail': 'luis@example.com', 'amount': n})
+
+            # Act
+            first = json.loads(list_orders({'customerEmail': 'ana@example.com', 'limit': '3'})['body'])
+            second = json.loads(list_orders({
+                'customerEmail': 'ana@example.com', 'limit': '3', 'nextToken': first['nextToken']
+            })['body'])
+
+        # Assert
+        orders = first['orders'] + second['orders']
+        self.assertEqual([first['count'], second['count']], [3, 2])
+        self.assertIsNone(second['nextToken'])
+        self.assertTrue(all(order['customerEmail'] == 'Ana@Example.com' for order in orders))
+        self.assertEqual(sorted(order['orderId'] for order in orders), sorted(order['orderId'] for order in created))
+
+    @mock_dynamodb
+    def test_backfill_tags_existing_orders(self):
+        """Test the backfill sets missing customer keys, skips orders without email and is idempotent"""
+        # Arrange
+        table = create_orders_table(CustomerIndex='customerEmailKey')
+        for n in range(3):
+            table.put_item(Item={'orderId': f'ORD-{n}', 'createdAt': f'2025-01-18T10:0{n}:00Z',
+                                 'customerEmail': f'Customer{n}@Example.com'})
+        table.put_item(Item={'orderId': 'ORD-8', 'createdAt': '2025-01-18T11:00:00Z', 'customerEmail': ''})
+        table.put_item(Item={'orderId': 'ORD-9', 'createdAt': '2025-01-18T12:00:00Z',
+                             'customerEmail': 'ana@example.com', 'customerEmailKey': 'ana@example.com'})
+
+        # Act
+        first = backfill(table, total_segments=1)
+        second = backfill(table, total_segments=1)
+
+        # Assert
+        self.assertEqual(first, {'scanned': 5, 'updated': 3, 'unchanged': 2, 'conflicts': 0})
+        self.assertEqual(second['unchanged'], 5)
+        item = table.get_item(Key={'orderId': 'ORD-1', 'createdAt': '2025-01-18T10:01:00Z'})['Item']
+        self.assertEqual(item['customerEmailKey'], 'customer1@example.com')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+from moto import mock_dynamodb
+
+# Add lambda, layer and scripts directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../scripts'))
+
+from lambda_function import list_orders
+from day_buckets import created_day_key, created_day_partitions
+from backfill_created_days import backfill
+from table_fixtures import create_orders_table
+
+class TestDayBuckets(unittest.TestCase):
+
+    def test_orders_of_a_day_spread_over_shards(self):
+        """Test one day's orders land on every shard of that day"""
+        keys = {created_day_key(f'ORD-{n:026d}', '2025-01-18T10:30:00+00:00', 4) for n in range(200)}
+
+        self.assertEqual(keys, set(created_day_partitions('2025-01-18', 4)))
+
+    @mock_dynamodb
+    @patch('lambda_function.CREATED_DAY_SHARDS', 4)
+    @patch('day_buckets.CREATED_DAY_SHARDS', 4)
+    def test_created_range_reads_every_shard(self):
+        """Test from/to listings read every shard of every day in the window, newest first"""
+        # Arrange
+        table = create_orders_table(CreatedDayIndex='createdDay')
+        for n in range(30):
+            created_at = f'2025-01-{16 + n % 4}T10:{n:02d}:00+00:00'
+            order_id = f'ORD-{n:08d}'
+            table.put_item(Item={'orderId': order_id, 'createdAt': created_at,
+                                 'createdDay': created_day_key(order_id, created_at, 4)})
+
+        # Act
+        with patch('lambda_function.table', table):
+            page = json.loads(list_orders({'from': '2025-01-16T00:00:00Z', 'to': '2025-01-18T23:59:59Z'})['body'])
+
+        # Assert: the orders of the 19th are outside the window
+        created = [order['createdAt'] for order in page['orders']]
+        self.assertEqual(len(created), 23)
+        self.assertEqual(created, sorted(created, reverse=True))
+        self.assertIsNone(page['nextToken'])
+
+    @mock_dynamodb
+    def test_backfill_tags_existing_orders(self):
+        """Test the backfill shards missing or plain day keys and is idempotent"""
+        # Arrange
+        table = create_orders_table()
+        table.put_item(Item={'orderId': 'ORD-1', 'createdAt': '2025-01-18T10:00:00+00:00'})
+        table.put_item(Item={'orderId': 'ORD-2', 'createdAt': '2025-01-18T11:00:00+00:00', 'createdDay': '2025-01-18'})
+        table.put_item(Item={'orderId': 'ORD-3', 'createdAt': '2025-01-18T12:00:00+00:00',
+                             'createdDay': created_day_key('ORD-3', '2025-01-18T12:00:00+00:00', 4)})
+
+        # Act
+        first = backfill(table, 4, total_segments=1)
+        second = backfill(table, 4, total_segments=1)
+
+        # Assert
+        self.assertEqual(first, {'scanned': 3, 'updated': 2, 'unchanged': 1, 'conflicts': 0})
+        self.assertEqual(second['unchanged'], 3)
+        item = table.get_item(Key={'orderId': 'ORD-2', 'createdAt': '2025-01-18T11:00:00+00:00'})['Item']
+        self.assertEqual(item['createdDay'], created_day_key('ORD-2', '2025-01-18T11:00:00+00:00', 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError, EndpointConnectionError
+from moto import mock_dynamodb
+
+# Add layer directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from orders_common import dynamodb as dynamodb_access
+from orders_common.dynamodb import (
+    AdaptiveRateLimiter, RetryCounters, capacity_error_response, dynamodb_resource, error_kind
+)
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class RawBody:
+
+    def __init__(self, data):
+        self.data = data
+
+    def stream(self, **kwargs):
+        yield self.data
+
+def throttled_response(request):
+    """A DynamoDB ProvisionedThroughputExceededException response"""
+    body = json.dumps({
+        '__type': 'com.amazonaws.dynamodb.v20120810#ProvisionedThroughputExceededException',
+        'message': 'The level of configured provisioned throughput for the table was exceeded.'
+    }).encode('utf-8')
+    return AWSResponse(request.url, 400, {'Content-Type': 'application/x-amz-json-1.0'}, RawBody(body))
+
+def client_error(code, status_code):
+    return ClientError({
+        'Error': {'Code': code, 'Message': code},
+        'ResponseMetadata': {'HTTPStatusCode': status_code}
+    }, 'GetItem')
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a limiter driven by a fake clock"""
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(increase=5.0, min_rate=1.0, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_unlimited_until_first_throttle(self):
+        """Test calls are not delayed before DynamoDB throttles"""
+        for _ in range(1000):
+            self.assertEqual(self.limiter.acquire(), 0.0)
+        self.assertIsNone(self.limiter.rate)
+
+    def test_throttle_halves_measured_rate(self):
+        """Test the first throttle limits to half the rate measured in the last second"""
+        # Arrange: 40 calls/s for a little over a second
+        for _ in range(45):
+            self.limiter.acquire()
+            self.clock.now += 0.025
+
+        # Act
+        self.limiter.on_throttle()
+
+        # Assert
+        self.assertAlmostEqual(self.limiter.rate, 20.0, delta=1.0)
+
+    def test_limited_calls_are_paced(self):
+        """Test a limited bucket spaces calls 1/rate apart"""
+        # Arrange
+        self.limiter.rate = 10.0
+
+        # Act
+        for _ in range(11):
+            self.limiter.acquire()
+
+        # Assert: the bucket starts empty, each call waits a tenth of a second
+        self.assertEqual(len(self.clock.slept), 11)
+        self.assertAlmostEqual(self.clock.now, 1.1)
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """Test successes add about `increase` per second and throttles halve the rate"""
+        # Arrange
+        self.limiter.rate = 10.0
+
+        # Act: one second of calls at the current rate
+        for _ in range(10):
+            self.limiter.on_success()
+        increased = self.limiter.rate
+        self.limiter.on_throttle()
+
+        # Assert
+        self.assertAlmostEqual(increased, 14.3, delta=0.3)
+        self.assertAlmostEqual(self.limiter.rate, increased / 2)
+
+    def test_rate_never_drops_below_minimum(self):
+        """Test repeated throttles stop at the minimum rate"""
+        self.limiter.rate = 4.0
+        for _ in range(10):
+            self.limiter.on_throttle()
+        self.assertEqual(self.limiter.rate, 1.0)
+
+class TestCapacityErrors(unittest.TestCase):
+
+    def test_error_kinds(self):
+        """Test throttling, server and connection errors are told apart from other failures"""
+        cases = [
+            (client_error('ProvisionedThroughputExceededException', 400), 'throttled'),
+            (client_error('ThrottlingException', 400), 'throttled'),
+            (client_error('RequestLimitExceeded', 400), 'throttled'),
+            (client_error('InternalServerError', 500), 'unavailable'),
+            (EndpointConnectionError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com'), 'unavailable'),
+            (client_error('ConditionalCheckFailedException', 400), None),
+            (client_error('ValidationException', 400), None),
+            (ValueError('bad input'), None)
+        ]
+        for error, kind in cases:
+            with self.subTest(error=error):
+                self.assertEqual(error_kind(error), kind)
+
+    def test_throttling_maps_to_429_with_retry_after(self):
+        """Test an exhausted throttle becomes a 429 the client can retry"""
+        response = capacity_error_response(client_error('ProvisionedThroughputExceededException', 400))
+
+        self.assertEqual(response['statusCode'], 429)
+        self.assertGreaterEqual(int(response['headers']['Retry-After']), 1)
+        self.assertIn('Retry-After', response['headers']['Access-Control-Expose-Headers'])
+
+    def test_unavailable_maps_to_503(self):
+        """Test server-side failures become 503 and other errors are left alone"""
+        self.assertEqual(capacity_error_response(client_error('InternalServerError', 500))['statusCode'], 503)
+        self.assertIsNone(capacity_error_response(client_error('ConditionalCheckFailedException', 400)))
+
+@mock_dynamodb
+@patch('orders_common.dynamodb.BACKOFF_BASE_SECONDS', 0.001)
+class TestAdaptiveRetry(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a table behind a client with adaptive retry"""
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='test-orders',
+            KeySchema=[{'AttributeName': 'orderId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'orderId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        self.counters = RetryCounters()
+        # A high floor keeps the throttled limiter from slowing the test down
+        limiter = AdaptiveRateLimiter(min_rate=1000.0)
+        for name, value in [('rate_limiter', limiter), ('retry_counters', self.counters)]:
+            patcher = patch.object(dynamodb_access, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.table = dynamodb_resource().Table('test-orders')
+        self.table.put_item(Item={'orderId': 'ORD-1'})
+
+    def throttle(self, times):
+        """Make the next `times` DynamoDB calls fail with a throttling error"""
+        remaining = [times]
+
+        def before_send(request, **kwargs):
+            if remaining[0] > 0:
+                remaining[0] -= 1
+                return throttled_response(request)
+            return None
+
+        self.table.meta.client.meta.events.register_first('before-send.dynamodb', before_send)
+
+    def test_throttled_call_is_retried(self):
+        """Test a throttled call is retried with backoff and then succeeds"""
+        # Arrange
+        self.throttle(2)
+
+        # Act
+        item = self.table.get_item(Key={'orderId': 'ORD-1'})['Item']
+
+        # Assert
+        self.assertEqual(item['orderId'], 'ORD-1')
+        counters = self.counters.snapshot()
+        self.assertEqual(counters['throttles'], 2)
+        self.assertEqual(counters['retries'], 2)
+        self.assertEqual(counters['exhausted'], 0)
+        self.assertIsNotNone(dynamodb_access.rate_limiter.rate)
+
+    @patch('orders_common.dynamodb.DYNAMODB_MAX_ATTEMPTS', 3)
+    def test_exhausted_retries_raise_throttling_error(self):
+        """Test the throttling error surfaces once every attempt was throttled"""
+        # Arrange
+        self.throttle(10)
+
+        # Act
+        with self.assertRaises(ClientError) as raised:
+            self.table.get_item(Key={'orderId': 'ORD-1'})
+
+        # Assert
+        self.assertEqual(error_kind(raised.exception), 'throttled')
+        self.assertEqual(self.counters.snapshot(), {'throttles': 3, 'transientErrors': 0, 'retries': 2, 'exhausted': 1})
+
+    def test_client_errors_are_not_retried(self):
+        """Test a failed condition is returned at once and not counted"""
+        with self.assertRaises(ClientError):
+            self.table.put_item(Item={'orderId': 'ORD-1'}, ConditionExpression='attribute_not_exists(orderId)')
+
+        self.assertEqual(self.counters.snapshot()['retries'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
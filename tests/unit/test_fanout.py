@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+
+# Add lambda directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+
+from fanout import merge_partitions
+
+def make_fetcher(items, calls=None):
+    """Paginated fetch_page over a newest-first item list, keyed by createdAt"""
+    def fetch_page(limit, exclusive_start_key):
+        if calls is not None:
+            calls.append((limit, exclusive_start_key))
+        start = 0
+        if exclusive_start_key:
+            start = next(i for i, item in enumerate(items) if item['createdAt'] == exclusive_start_key['createdAt']) + 1
+        page = items[start:start + limit]
+        response = {'Items': page}
+        if start + limit < len(items):
+            response['LastEvaluatedKey'] = {'createdAt': page[-1]['createdAt']}
+        return response
+    return fetch_page
+
+def sort_key(item):
+    return item['createdAt']
+
+def resume_key(item):
+    return {'createdAt': item['createdAt']}
+
+class TestFanout(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.partitions = {
+            'pending': [{'orderId': f'P{n}', 'createdAt': f'2025-01-18T10:{n:02d}:00Z'} for n in (50, 30, 10)],
+            'processing': [{'orderId': f'R{n}', 'createdAt': f'2025-01-18T10:{n:02d}:00Z'} for n in (40, 20)]
+        }
+        self.fetchers = {name: make_fetcher(items) for name, items in self.partitions.items()}
+
+    def test_merge_is_newest_first(self):
+        """Test items from every partition are interleaved by descending createdAt"""
+        items, positions = merge_partitions(
+            self.fetchers, {'pending': None, 'processing': None}, 10, sort_key, resume_key
+        )
+
+        self.assertEqual([item['orderId'] for item in items], ['P50', 'R40', 'P30', 'R20', 'P10'])
+        self.assertEqual(positions, {})
+
+    def test_pages_resume_exactly(self):
+        """Test positions from one page continue every partition without gaps or duplicates"""
+        positions = {'pending': None, 'processing': None}
+        seen = []
+        while positions:
+            items, positions = merge_partitions(self.fetchers, positions, 2, sort_key, resume_key)
+            seen.extend(item['orderId'] for item in items)
+
+        self.assertEqual(seen, ['P50', 'R40', 'P30', 'R20', 'P10'])
+
+    def test_untouched_partition_keeps_position(self):
+        """Test a partition that contributed nothing to a page is resumed from its old position"""
+        partitions = {
+            'pending': [{'orderId': f'P{n}', 'createdAt': f'2025-01-18T10:{n:02d}:00Z'} for n in (50, 45, 40)],
+            'cancelled': [{'orderId': 'C1', 'createdAt': '2025-01-17T10:00:00Z'}]
+        }
+        fetchers = {name: make_fetcher(items) for name, items in partitions.items()}
+
+        items, positions = merge_partitions(fetchers, {'pending': None, 'cancelled': None}, 2, sort_key, resume_key)
+
+        self.assertEqual([item['orderId'] for item in items], ['P50', 'P45'])
+        self.assertEqual(positions, {'pending': {'createdAt': '2025-01-18T10:45:00Z'}, 'cancelled': None})
+
+    def test_short_pages_are_refilled(self):
+        """Test a partition returning short pages is read again during the merge"""
+        calls = []
+        fetch_page = make_fetcher(self.partitions['pending'], calls)
+        fetchers = {'pending': lambda limit, key: fetch_page(1, key), 'processing': self.fetchers['processing']}
+
+        items, positions = merge_partitions(fetchers, {'pending': None, 'processing': None}, 4, sort_key, resume_key)
+
+        self.assertEqual([item['orderId'] for item in items], ['P50', 'R40', 'P30', 'R20'])
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(positions, {'pending': {'createdAt': '2025-01-18T10:30:00Z'}})
+
+    def test_first_reads_are_a_share_of_the_page(self):
+        """Test each partition first reads its share of the page and a skewed one is refilled"""
+        calls = {}
+        partitions = {
+            f'shard{shard}': [{'orderId': f'S{shard}-{n}', 'createdAt': f'2025-01-{18 - shard:02d}T10:{59 - n:02d}:00Z'}
+                              for n in range(30)]
+            for shard in range(4)
+        }
+        fetchers = {name: make_fetcher(items, calls.setdefault(name, [])) for name, items in partitions.items()}
+
+        items, positions = merge_partitions(fetchers, dict.fromkeys(partitions), 20, sort_key, resume_key)
+
+        # Assert: shard0 holds the 20 newest orders; it is read again once its first 6 are used
+        self.assertEqual([item['orderId'] for item in items], [f'S0-{n}' for n in range(20)])
+        self.assertEqual([limit for limit, _ in calls['shard0']], [6, 14])
+        self.assertEqual([limit for limit, _ in calls['shard3']], [6])
+        self.assertEqual(positions['shard0'], {'createdAt': '2025-01-18T10:40:00Z'})
+        self.assertIsNone(positions['shard3'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import Mock
+import json
+import sys
+import os
+import boto3
+from moto import mock_dynamodb
+
+# Add lambda and layer directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from idempotency import IDEMPOTENCY_LOCK_SECONDS, idempotent_call, parse_idempotency_key, request_fingerprint
+from orders_common.responses import json_response
+
+@mock_dynamodb
+class TestIdempotency(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        self.table = dynamodb.create_table(
+            TableName='test-orders-idempotency',
+            KeySchema=[{'AttributeName': 'idempotencyKey', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'idempotencyKey', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        self.operation = Mock(return_value=json_response(201, {'orderId': 'ORD-12345678'}))
+        self.fingerprint = request_fingerprint('{"customerName": "Juan"}')
+
+    def test_repeated_request_is_replayed(self):
+        """Test a retry returns the stored response without running the operation again"""
+        first = idempotent_call(self.table, 'key-1', self.fingerprint, self.operation, now=1000)
+        second = idempotent_call(self.table, 'key-1', self.fingerprint, self.operation, now=1001)
+
+        self.operation.assert_called_once()
+        self.assertEqual(second['statusCode'], 201)
+        self.assertEqual(json.loads(second['body']), json.loads(first['body']))
+        self.assertEqual(second['headers']['Idempotent-Replayed'], 'true')
+
+    def test_key_reused_with_other_body(self):
+        """Test a key cannot be reused for a different request"""
+        idempotent_call(self.table, 'key-1', self.fingerprint, self.operation, now=1000)
+
+        result = idempotent_call(self.table, 'key-1', request_fingerprint('{}'), self.operation, now=1001)
+
+        self.assertEqual(result['statusCode'], 422)
+        self.operation.assert_called_once()
+
+    def test_in_progress_request_conflicts(self):
+        """Test a concurrent retry is told to wait, and can take over once the claim expires"""
+        def operation():
+            nested = idempotent_call(self.table, 'key-1', self.fingerprint, self.operation, now=1001)
+            self.assertEqual(nested['statusCode'], 409)
+            retried = idempotent_call(
+                self.table, 'key-1', self.fingerprint, self.operation, now=1001 + IDEMPOTENCY_LOCK_SECONDS
+            )
+            self.assertEqual(retried['statusCode'], 201)
+            return json_response(201, {})
+
+        idempotent_call(self.table, 'key-1', self.fingerprint, operation, now=1000)
+
+        self.operation.assert_called_once()
+
+    def test_server_errors_release_the_key(self):
+        """Test a failed attempt does not block the retry"""
+        failing = Mock(return_value=json_response(500, {'error': 'Internal server error'}))
+
+        idempotent_call(self.table, 'key-1', self.fingerprint, failing, now=1000)
+        result = idempotent_call(self.table, 'key-1', self.fingerprint, self.operation, now=1001)
+
+        self.assertEqual(result['statusCode'], 201)
+        self.operation.assert_called_once()
+
+    def test_key_validation(self):
+        """Test malformed Idempotency-Key values are rejected"""
+        self.assertEqual(parse_idempotency_key('3f1c-retry'), '3f1c-retry')
+        for value in ['', 'has space', 'x' * 256]:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_idempotency_key(value)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import Mock, patch
+import json
+import sys
+import os
+
+import boto3
+from moto import mock_dynamodb
+
+# Add layer directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from orders_common import metrics
+from orders_common.metrics import InvocationMetrics, instrument_client, invocation_route, record_invocation
+
+def emitted_records(mock_print):
+    """EMF records written through print, one per line"""
+    lines = []
+    for call in mock_print.call_args_list:
+        lines.extend(call.args[0].split('\n'))
+    return [json.loads(line) for line in lines]
+
+class TestInvocationMetrics(unittest.TestCase):
+
+    @patch('builtins.print')
+    def test_flush_writes_one_emf_record_per_invocation(self, mock_print):
+        """Test the invocation record carries route, duration, cold start and the AWS call records"""
+        # Arrange
+        buffer = InvocationMetrics()
+        buffer.record_call('dynamodb', 'GetItem', 4.0, 120, 800, 0.5, 0)
+        buffer.record_call('dynamodb', 'GetItem', 6.0, 120, 900, 0.5, 0)
+
+        # Act
+        buffer.flush('GET /orders/{orderId}', 12.5, 200, 0, 1024, 'request-1')
+        buffer.flush('GET /orders/{orderId}', 3.0, 200, 0, 1024, 'request-2')
+
+        # Assert: one print per flush
+        self.assertEqual(mock_print.call_count, 2)
+        first, call, second = emitted_records(mock_print)
+        directive = first['_aws']['CloudWatchMetrics'][0]
+        self.assertEqual(directive['Dimensions'], [['FunctionName'], ['FunctionName', 'Route']])
+        self.assertIn({'Name': 'Duration', 'Unit': 'Milliseconds'}, directive['Metrics'])
+        self.assertEqual(first['Route'], 'GET /orders/{orderId}')
+        self.assertEqual(first['ColdStart'], 1)
+        self.assertEqual(first['ResponseBytes'], 1024)
+        self.assertEqual(first['requestId'], 'request-1')
+        self.assertEqual(call['Operation'], 'GetItem')
+        self.assertEqual(call['Latency'], [4.0, 6.0])
+        self.assertEqual(call['Calls'], 2)
+        self.assertEqual(call['ResponseBytes'], 1700)
+        self.assertEqual(call['ConsumedCapacity'], 1.0)
+        self.assertEqual(second['ColdStart'], 0)
+
+    @patch('builtins.print')
+    def test_full_batches_are_emitted_early(self, mock_print):
+        """Test an operation is written as soon as it holds the 100 values EMF allows"""
+        buffer = InvocationMetrics()
+
+        for _ in range(metrics.MAX_VALUES + 1):
+            buffer.record_call('s3', 'UploadPart', 1.0, 0, 0, 0, 0)
+        buffer.flush('invoke', 1.0)
+
+        early, invocation, rest = emitted_records(mock_print)
+        self.assertEqual(len(early['Latency']), metrics.MAX_VALUES)
+        self.assertNotIn('ConsumedCapacity', early)
+        self.assertEqual(invocation['Route'], 'invoke')
+        self.assertEqual(rest['Calls'], 1)
+
+    @patch('builtins.print')
+    def test_registered_counters_are_taken_on_flush(self, mock_print):
+        """Test counters such as DynamoDB retries are emitted with the invocation"""
+        buffer = InvocationMetrics()
+        take = Mock(return_value={'throttles': 2, 'retries': 3})
+        buffer.register_counters('DynamoDB', take)
+
+        buffer.flush('stream', 8.0)
+
+        record, = emitted_records(mock_print)
+        self.assertEqual(record['DynamoDBThrottles'], 2)
+        self.assertEqual(record['DynamoDBRetries'], 3)
+        take.assert_called_once_with()
+
+class TestInstrumentation(unittest.TestCase):
+
+    @mock_dynamodb
+    @patch('builtins.print')
+    def test_client_calls_are_timed_with_consumed_capacity(self, mock_print):
+        """Test instrumented DynamoDB calls record latency and the capacity they now ask for"""
+        # Arrange
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        table = dynamodb.create_table(
+            TableName='test-orders',
+            KeySchema=[{'AttributeName': 'orderId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'orderId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        instrument_client(dynamodb.meta.client)
+        buffer = InvocationMetrics()
+
+        # Act
+        with patch('orders_common.metrics.invocation_metrics', buffer):
+            table.put_item(Item={'orderId': 'ORD-1', 'amount': 10})
+            response = table.get_item(Key={'orderId': 'ORD-1'})
+            buffer.flush('invoke', 1.0)
+
+        # Assert
+        self.assertIn('ConsumedCapacity', response)
+        records = {record.get('Operation'): record for record in emitted_records(mock_print)}
+        self.assertEqual(records['GetItem']['Service'], 'dynamodb')
+        self.assertEqual(records['GetItem']['Calls'], 1)
+        self.assertGreater(records['GetItem']['ConsumedCapacity'], 0)
+        self.assertGreater(records['PutItem']['RequestBytes'], 0)
+        self.assertGreater(records['GetItem']['ResponseBytes'], 0)
+
+    def test_invocation_routes(self):
+        """Test routes name the API resource or the event source"""
+        self.assertEqual(
+            invocation_route({'httpMethod': 'GET', 'resource': '/orders/{orderId}', 'path': '/orders/ORD-1'}),
+            'GET /orders/{orderId}'
+        )
+        self.assertEqual(invocation_route({'Records': [{'eventSource': 'aws:dynamodb'}]}), 'stream')
+        self.assertEqual(invocation_route({'Records': [{'eventSource': 'aws:s3'}]}), 's3')
+        self.assertEqual(invocation_route({'type': 'REQUEST', 'methodArn': 'arn'}), 'authorize')
+        self.assertEqual(invocation_route({'exportId': '2024-01-01'}), 'invoke')
+
+    @patch('builtins.print')
+    def test_handler_that_raises_is_recorded_as_502(self, mock_print):
+        """Test the decorator flushes even when the handler raises"""
+        # Arrange
+        buffer = InvocationMetrics()
+
+        @record_invocation
+        def handler(event, context):
+            raise RuntimeError('boom')
+
+        # Act
+        with patch('orders_common.metrics.invocation_metrics', buffer):
+            with self.assertRaises(RuntimeError):
+                handler({'httpMethod': 'GET', 'resource': '/orders', 'body': None}, Mock(aws_request_id='req-1'))
+
+        # Assert
+        record, = emitted_records(mock_print)
+        self.assertEqual(record['statusCode'], 502)
+        self.assertEqual(record['Errors'], 1)
+        self.assertEqual(record['requestId'], 'req-1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add lambda directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+
+from order_cache import OrderCache
+
+class TestOrderCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.order = {'orderId': 'ORD-12345678', 'items': ['Laptop', 'Mouse'], 'amount': 299.99}
+
+    def test_entries_expire_after_ttl(self):
+        """Test items are not served past their TTL"""
+        cache = OrderCache(ttl=5)
+
+        with patch('order_cache.time.monotonic', return_value=100.0):
+            cache.put('ORD-12345678', self.order)
+        with patch('order_cache.time.monotonic', return_value=104.0):
+            self.assertEqual(cache.get('ORD-12345678'), self.order)
+        with patch('order_cache.time.monotonic', return_value=106.0):
+            self.assertIsNone(cache.get('ORD-12345678'))
+
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the entry bound evicts the least recently used order"""
+        cache = OrderCache(max_entries=2)
+        cache.put('A', self.order)
+        cache.put('B', self.order)
+        cache.get('A')
+        cache.put('C', self.order)
+
+        self.assertIsNotNone(cache.get('A'))
+        self.assertIsNone(cache.get('B'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_memory_bound_is_enforced(self):
+        """Test the byte bound keeps the cache footprint under the limit"""
+        cache = OrderCache(max_bytes=150)
+        for key in 'ABCD':
+            cache.put(key, self.order)
+
+        self.assertLessEqual(cache.stats()['bytes'], 150)
+        self.assertIsNotNone(cache.get('D'))
+
+    def test_entries_are_due_for_a_check_after_verify_after(self):
+        """Test lookup flags aged entries until they are verified again"""
+        cache = OrderCache(ttl=60, verify_after=5)
+
+        with patch('order_cache.time.monotonic', return_value=100.0):
+            cache.put('ORD-12345678', self.order)
+            self.assertEqual(cache.lookup('ORD-12345678'), (self.order, False))
+        with patch('order_cache.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.lookup('ORD-12345678'), (self.order, True))
+            cache.verified('ORD-12345678')
+            self.assertEqual(cache.lookup('ORD-12345678'), (self.order, False))
+
+    def test_entries_are_never_due_without_verify_after(self):
+        """Test the version check is opt-in"""
+        cache = OrderCache(ttl=60, verify_after=0)
+
+        with patch('order_cache.time.monotonic', return_value=100.0):
+            cache.put('ORD-12345678', self.order)
+        with patch('order_cache.time.monotonic', return_value=159.0):
+            self.assertEqual(cache.lookup('ORD-12345678'), (self.order, False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from datetime import datetime, timezone
+import sys
+import os
+
+# Add lambda directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+
+from order_ids import OrderIdGenerator, created_at_from_order_id, new_order_key, order_id_timestamp
+
+class TestOrderIds(unittest.TestCase):
+
+    def test_created_at_round_trips(self):
+        """Test the createdAt sort key is recovered exactly from the ID"""
+        for now in [datetime(2025, 1, 18, 10, 30, tzinfo=timezone.utc),
+                    datetime(2025, 1, 18, 10, 30, 0, 123000, tzinfo=timezone.utc)]:
+            with self.subTest(now=now):
+                key = new_order_key(now)
+                self.assertEqual(len(key['orderId']), 30)
+                self.assertEqual(created_at_from_order_id(key['orderId']), key['createdAt'])
+                self.assertEqual(order_id_timestamp(key['orderId']), now)
+
+    def test_ids_are_monotonic(self):
+        """Test IDs generated in the same millisecond or after a clock step back still increase"""
+        generator = OrderIdGenerator()
+        ids = [generator.new_id(1737196200000)[0] for _ in range(1000)]
+        ids.append(generator.new_id(1737196199000)[0])
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_ids_sort_by_time(self):
+        """Test IDs from later milliseconds sort after earlier ones"""
+        generator = OrderIdGenerator()
+        earlier, _ = generator.new_id(1737196200000)
+        later, _ = generator.new_id(1737196200001)
+
+        self.assertLess(earlier, later)
+
+    def test_legacy_ids_are_not_decoded(self):
+        """Test legacy random IDs fall back to a lookup"""
+        self.assertIsNone(created_at_from_order_id('ORD-12345678'))
+        self.assertIsNone(created_at_from_order_id(None))
+
+    def test_out_of_range_ids_are_not_decoded(self):
+        """Test IDs matching the pattern with an impossible timestamp resolve to None, not an error"""
+        for order_id in ['ORD-ZZZZZZZZZZ0000000000000000', 'ORD-8' + '0' * 25, 'ORD-7ZZZZZZZZZ0000000000000000']:
+            with self.subTest(order_id=order_id):
+                self.assertIsNone(created_at_from_order_id(order_id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import Mock, patch
+import sys
+import os
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_dynamodb
+
+# Add lambda and layer directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from orders_common.stats import (DAY_STATS, STATUS_STATS, apply_stat_deltas, apply_stream_records,
+                                 collect_stat_deltas, first_stat_group)
+import order_stats
+
+def image(status, amount, created_at='2025-01-18T10:30:00Z'):
+    """Build a DynamoDB Stream image of an order"""
+    return {
+        'orderId': {'S': 'ORD-12345678'},
+        'createdAt': {'S': created_at},
+        'createdDay': {'S': created_at[:10]},
+        'status': {'S': status},
+        'amount': {'N': str(amount)}
+    }
+
+def record(event_name, old_image=None, new_image=None, sequence=1):
+    """Build a DynamoDB Stream record"""
+    images = {'SequenceNumber': str(sequence)}
+    if old_image:
+        images['OldImage'] = old_image
+    if new_image:
+        images['NewImage'] = new_image
+    return {'eventSource': 'aws:dynamodb', 'eventID': f'event-{sequence}', 'eventName': event_name,
+            'dynamodb': images}
+
+def inserts(first, last, status='pending'):
+    """INSERT records of orders of 10.00 with sequence numbers first..last"""
+    return [record('INSERT', new_image=image(status, '10'), sequence=n) for n in range(first, last + 1)]
+
+def create_stats_table():
+    """Create the stats table (statType + statKey) in moto"""
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    return dynamodb.create_table(
+        TableName='test-orders-stats',
+        KeySchema=[
+            {'AttributeName': 'statType', 'KeyType': 'HASH'},
+            {'AttributeName': 'statKey', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'statType', 'AttributeType': 'S'},
+            {'AttributeName': 'statKey', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+def counter(table, stat_type, stat_key):
+    item = table.get_item(Key={'statType': stat_type, 'statKey': stat_key})['Item']
+    return item['orderCount'], item['revenue']
+
+class TestOrderStats(unittest.TestCase):
+
+    def test_insert_counts_status_and_day(self):
+        """Test a new order adds to its status and creation-day counters"""
+        deltas = collect_stat_deltas([record('INSERT', new_image=image('pending', '299.99'))])
+
+        self.assertEqual(deltas, {
+            (STATUS_STATS, 'pending'): (1, Decimal('299.99')),
+            (DAY_STATS, '2025-01-18'): (1, Decimal('299.99'))
+        })
+
+    def test_status_change_moves_between_counters(self):
+        """Test a status change leaves the day counter untouched"""
+        deltas = collect_stat_deltas([
+            record('MODIFY', image('pending', '100'), image('processing', '100'))
+        ])
+
+        self.assertEqual(deltas, {
+            (STATUS_STATS, 'pending'): (-1, Decimal('-100')),
+            (STATUS_STATS, 'processing'): (1, Decimal('100'))
+        })
+
+    def test_batch_deltas_are_coalesced(self):
+        """Test records touching the same counters fold into one delta each"""
+        deltas = collect_stat_deltas([
+            record('INSERT', new_image=image('pending', '10')),
+            record('INSERT', new_image=image('pending', '20')),
+            record('REMOVE', old_image=image('pending', '10')),
+            {'eventSource': 'aws:sqs'}
+        ])
+
+        self.assertEqual(deltas, {
+            (STATUS_STATS, 'pending'): (1, Decimal('20')),
+            (DAY_STATS, '2025-01-18'): (1, Decimal('20'))
+        })
+
+    def test_apply_uses_atomic_add(self):
+        """Test each counter is updated once with an ADD expression"""
+        table = Mock()
+
+        apply_stat_deltas(table, {(STATUS_STATS, 'pending'): (2, Decimal('50'))})
+
+        table.update_item.assert_called_once_with(
+            Key={'statType': 'status', 'statKey': 'pending'},
+            UpdateExpression='ADD orderCount :count, revenue :revenue',
+            ExpressionAttributeValues={':count': 2, ':revenue': Decimal('50')}
+        )
+
+    @mock_dynamodb
+    @patch('builtins.print')
+    def test_replayed_records_are_not_counted_twice(self, mock_print):
+        """Test a batch retried from its first record only counts the records not applied yet"""
+        # Arrange
+        table = create_stats_table()
+
+        # Act: the retry carries the applied records 1-3 again, plus record 4
+        with patch('order_stats.stats_table', table):
+            first = order_stats.lambda_handler({'Records': inserts(1, 3)}, None)
+            retry = order_stats.lambda_handler({'Records': inserts(1, 4)}, None)
+
+        # Assert
+        self.assertEqual(first, {'batchItemFailures': []})
+        self.assertEqual(retry, {'batchItemFailures': []})
+        self.assertEqual(counter(table, STATUS_STATS, 'pending'), (4, Decimal('40')))
+        self.assertEqual(counter(table, DAY_STATS, '2025-01-18'), (4, Decimal('40')))
+
+    @mock_dynamodb
+    def test_batches_larger_than_a_transaction_are_split(self):
+        """Test records are grouped so each transaction stays within its item limit"""
+        # Arrange: every record touches a day counter of its own
+        table = create_stats_table()
+        records = [record('INSERT', new_image=image('pending', '10', f'2025-{1 + n // 28:02d}-{1 + n % 28:02d}T10:00:00Z'),
+                          sequence=n + 1) for n in range(120)]
+
+        # Act
+        groups = first_stat_group(records), first_stat_group(records[98:])
+        failed = apply_stream_records(table, records)
+
+        # Assert: 98 days plus the status counter fill the first transaction
+        self.assertEqual([len(group) for group in groups], [98, 22])
+        self.assertIsNone(failed)
+        self.assertEqual(counter(table, STATUS_STATS, 'pending'), (120, Decimal('1200')))
+
+    @patch('builtins.print')
+    def test_failure_reports_the_first_record_not_applied(self, mock_print):
+        """Test a failed counter update is reported so Lambda retries from that record"""
+        # Arrange
+        table = Mock()
+        table.name = 'test-orders-stats'
+        table.meta.client.transact_write_items.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Slow down'}},
+            'TransactWriteItems'
+        )
+
+        # Act
+        with patch('order_stats.stats_table', table):
+            result = order_stats.lambda_handler({'Records': inserts(7, 9)}, None)
+
+        # Assert
+        self.assertEqual(result, {'batchItemFailures': [{'itemIdentifier': '7'}]})
+        mock_print.assert_any_call("Error applying order stats: An error occurred "
+                                   "(ProvisionedThroughputExceededException) when calling the "
+                                   "TransactWriteItems operation: Slow down")
+
+if __name__ == '__main__':
+    unittest.main()
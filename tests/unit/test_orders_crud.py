@@ -1,18 +1,25 @@
 import unittest
+from decimal import Decimal
+import base64
+import gzip
 from unittest.mock import Mock, patch, MagicMock
 import json
 import sys
 import os
+from botocore.exceptions import ClientError
 
 # Add lambda directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
 
-from lambda_function import lambda_handler, get_order, list_orders, create_order, update_order, delete_order
+from lambda_function import lambda_handler, get_order, list_orders, create_order, create_orders_batch, get_orders_batch, update_order, delete_order, order_cache
+from order_cache import OrderCache
 
 class TestOrdersCRUD(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures before each test method."""
+        order_cache.clear()
         self.mock_table = Mock()
         self.sample_order = {
             'orderId': 'ORD-12345678',
@@ -52,6 +59,106 @@ class TestOrdersCRUD(unittest.TestCase):
         response_body = json.loads(result['body'])
         self.assertEqual(response_body['error'], 'Order not found')
         
+    @patch('lambda_function.table')
+    def test_get_order_served_from_cache(self, mock_table):
+        """Test repeated reads of the same order hit the warm cache"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order]}
+        
+        # Act
+        first = get_order('ORD-12345678')
+        second = get_order('ORD-12345678')
+        
+        # Assert
+        self.assertEqual(first['headers']['X-Cache'], 'MISS')
+        self.assertEqual(second['headers']['X-Cache'], 'HIT')
+        self.assertEqual(json.loads(second['body'])['orderId'], 'ORD-12345678')
+        mock_table.query.assert_called_once()
+        
+    @patch('lambda_function.table')
+    def test_update_order_invalidates_cache(self, mock_table):
+        """Test updating an order drops it from the cache"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order]}
+        mock_table.update_item.return_value = {'Attributes': {**self.sample_order, 'status': 'completed'}}
+        get_order('ORD-12345678')
+        
+        # Act
+        update_order('ORD-12345678', {'status': 'completed', 'createdAt': '2025-01-18T10:30:00Z'})
+        get_order('ORD-12345678')
+        
+        # Assert
+        self.assertEqual(mock_table.query.call_count, 2)
+        
+    @patch('lambda_function.table')
+    def test_aged_cache_entry_is_version_checked(self, mock_table):
+        """Test an entry past verify_after is checked against updatedAt and dropped when changed elsewhere"""
+        # Arrange
+        order = {**self.sample_order, 'updatedAt': '2025-01-18T10:30:00Z'}
+        mock_table.query.return_value = {'Items': [order]}
+        mock_table.get_item.side_effect = [
+            {'Item': {'updatedAt': '2025-01-18T10:30:00Z'}},
+            {'Item': {'updatedAt': '2025-01-18T11:00:00Z'}}
+        ]
+        cache = OrderCache(ttl=60, verify_after=5)
+        
+        # Act
+        with patch('lambda_function.order_cache', cache):
+            with patch('order_cache.time.monotonic', return_value=100.0):
+                get_order('ORD-12345678')
+                fresh = get_order('ORD-12345678')
+            with patch('order_cache.time.monotonic', return_value=106.0):
+                unchanged = get_order('ORD-12345678')
+            with patch('order_cache.time.monotonic', return_value=112.0):
+                changed = get_order('ORD-12345678')
+        
+        # Assert
+        self.assertEqual(fresh['headers']['X-Cache'], 'HIT')
+        self.assertEqual(unchanged['headers']['X-Cache'], 'HIT')
+        self.assertEqual(changed['headers']['X-Cache'], 'MISS')
+        self.assertEqual(mock_table.get_item.call_count, 2)
+        mock_table.get_item.assert_called_with(
+            Key={'orderId': 'ORD-12345678', 'createdAt': '2025-01-18T10:30:00Z'},
+            ProjectionExpression='updatedAt'
+        )
+        self.assertEqual(mock_table.query.call_count, 2)
+        
+    @patch('lambda_function.table')
+    def test_get_orders_batch_keeps_requested_order(self, mock_table):
+        """Test fetching many orders returns them in the requested order"""
+        # Arrange
+        orders = {
+            order_id: {**self.sample_order, 'orderId': order_id}
+            for order_id in ['ORD-00000001', 'ORD-00000002', 'ORD-00000003']
+        }
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.query.side_effect = lambda **kwargs: {
+            'Items': [{'orderId': order_id, 'createdAt': '2025-01-18T10:30:00Z'}
+                      for order_id in [kwargs['ExpressionAttributeValues'][':order_id']] if order_id in orders]
+        }
+        mock_table.meta.client.batch_get_item.return_value = {
+            'Responses': {'test-orders': list(reversed(list(orders.values())))}
+        }
+        
+        # Act
+        result = get_orders_batch('ORD-00000002,ORD-00000001,ORD-MISSING,ORD-00000003,ORD-00000002')
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 200)
+        response_body = json.loads(result['body'])
+        self.assertEqual([order['orderId'] for order in response_body['orders']],
+                         ['ORD-00000002', 'ORD-00000001', 'ORD-00000003'])
+        self.assertEqual(response_body['notFound'], ['ORD-MISSING'])
+        mock_table.meta.client.batch_get_item.assert_called_once()
+        
+    def test_get_orders_batch_limits_ids(self):
+        """Test too many IDs are rejected with 400"""
+        # Act
+        result = get_orders_batch(','.join(f'ORD-{i:08d}' for i in range(101)))
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 400)
+        
     @patch('lambda_function.table')
     def test_create_order_success(self, mock_table):
         """Test successful order creation"""
@@ -73,6 +180,51 @@ class TestOrdersCRUD(unittest.TestCase):
         self.assertEqual(response_body['customerName'], 'María García')
         self.assertEqual(response_body['status'], 'pending')
         
+    @patch('lambda_function.batch_put_items')
+    def test_create_orders_batch_reports_per_item(self, mock_batch_put):
+        """Test batch creation validates each order and reports unprocessed writes"""
+        # Arrange
+        orders = [
+            {'customerName': 'Ana', 'items': ['Laptop'], 'amount': 100},
+            {'customerName': 'Luis', 'items': 'Mouse', 'amount': 20},
+            {'customerName': 'Eva', 'items': ['Monitor'], 'amount': 'abc'},
+            {'customerName': 'Sofía', 'items': ['Teclado'], 'amount': 45.5}
+        ]
+        mock_batch_put.side_effect = lambda table, items: [items[1]]
+        
+        # Act
+        result = create_orders_batch({'orders': orders})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 207)
+        response_body = json.loads(result['body'])
+        statuses = [item['status'] for item in response_body['results']]
+        self.assertEqual(statuses, ['created', 'invalid', 'invalid', 'failed'])
+        self.assertEqual(response_body['created'], 1)
+        self.assertEqual(len(mock_batch_put.call_args.args[1]), 2)
+        
+    def test_create_orders_batch_requires_list(self):
+        """Test batch creation rejects a body without an orders list"""
+        # Act
+        result = create_orders_batch({'orders': {}})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 400)
+        
+    @patch('lambda_function.create_orders_batch')
+    def test_lambda_handler_routes_batch(self, mock_create_batch):
+        """Test POST /orders/batch is routed to batch creation"""
+        # Arrange
+        mock_create_batch.return_value = {'statusCode': 201}
+        event = {'httpMethod': 'POST', 'resource': '/orders/batch', 'body': json.dumps({'orders': []})}
+        
+        # Act
+        result = lambda_handler(event, {})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 201)
+        mock_create_batch.assert_called_once_with({'orders': []})
+        
     @patch('lambda_function.table')
     def test_list_orders_with_status_filter(self, mock_table):
         """Test listing orders with status filter"""
@@ -88,6 +240,335 @@ class TestOrdersCRUD(unittest.TestCase):
         response_body = json.loads(result['body'])
         self.assertEqual(len(response_body['orders']), 1)
         
+    @patch('lambda_function.table')
+    def test_list_orders_returns_next_token(self, mock_table):
+        """Test listing orders returns a cursor that resumes every scan segment"""
+        # Arrange
+        last_key = {'orderId': 'ORD-12345678', 'createdAt': '2025-01-18T10:30:00Z'}
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.scan.return_value = {
+            'Items': [self.sample_order],
+            'LastEvaluatedKey': last_key
+        }
+        
+        # Act
+        first = json.loads(list_orders({'limit': '8'})['body'])
+        mock_table.meta.client.scan.reset_mock()
+        list_orders({'limit': '8', 'nextToken': first['nextToken']})
+        
+        # Assert
+        self.assertEqual(first['count'], 8)
+        self.assertEqual(first['orders'][0]['orderId'], 'ORD-12345678')
+        resumed = mock_table.meta.client.scan.call_args_list
+        self.assertEqual({call.kwargs['Segment'] for call in resumed}, {0, 1, 2, 3})
+        self.assertTrue(all(call.kwargs['ExclusiveStartKey'] == last_key for call in resumed))
+        
+    @patch('lambda_function.table')
+    def test_list_orders_invalid_token(self, mock_table):
+        """Test an invalid cursor is rejected with 400"""
+        # Act
+        result = list_orders({'nextToken': 'not-a-token'})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 400)
+        mock_table.meta.client.scan.assert_not_called()
+        
+    @patch('lambda_function.CREATED_DAY_SHARDS', 2)
+    @patch('day_buckets.CREATED_DAY_SHARDS', 2)
+    @patch('lambda_function.table')
+    def test_list_orders_by_created_range(self, mock_table):
+        """Test a time window is read day by day from the CreatedDayIndex shards, newest first"""
+        # Arrange
+        orders = {
+            '2025-01-18#0': [{'orderId': 'ORD-A', 'createdAt': '2025-01-18T12:00:00+00:00', 'createdDay': '2025-01-18#0'}],
+            '2025-01-18#1': [{'orderId': 'ORD-B', 'createdAt': '2025-01-18T15:00:00+00:00', 'createdDay': '2025-01-18#1'}],
+            '2025-01-16#1': [{'orderId': 'ORD-C', 'createdAt': '2025-01-16T09:00:00+00:00', 'createdDay': '2025-01-16#1'}]
+        }
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.query.side_effect = lambda **kwargs: {
+            'Items': orders.get(kwargs['ExpressionAttributeValues'][':day'], [])
+        }
+        query_params = {'from': '2025-01-16T00:00:00Z', 'to': '2025-01-18T23:59:59Z', 'limit': '2'}
+        
+        # Act
+        first = json.loads(list_orders(query_params)['body'])
+        second = json.loads(list_orders(dict(query_params, nextToken=first['nextToken']))['body'])
+        
+        # Assert
+        self.assertEqual([order['orderId'] for order in first['orders']], ['ORD-B', 'ORD-A'])
+        self.assertEqual([order['orderId'] for order in second['orders']], ['ORD-C'])
+        self.assertIsNone(second['nextToken'])
+        calls = mock_table.meta.client.query.call_args_list
+        days = sorted(call.kwargs['ExpressionAttributeValues'][':day'] for call in calls)
+        self.assertEqual(days, ['2025-01-16#0', '2025-01-16#1', '2025-01-17#0', '2025-01-17#1',
+                                '2025-01-18#0', '2025-01-18#1'])
+        self.assertTrue(all(call.kwargs['IndexName'] == 'CreatedDayIndex' for call in calls))
+        
+    @patch('lambda_function.table')
+    def test_list_orders_by_status_and_range(self, mock_table):
+        """Test status listings narrow the StatusIndex key range to the window"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order]}
+        
+        # Act
+        list_orders({'status': 'pending', 'from': '2025-01-18T00:00:00Z', 'to': '2025-01-19T00:00:00Z'})
+        
+        # Assert
+        kwargs = mock_table.query.call_args.kwargs
+        self.assertIn('createdAt BETWEEN :from AND :to', kwargs['KeyConditionExpression'])
+        self.assertEqual(kwargs['ExpressionAttributeValues'][':from'], '2025-01-18T00:00:00+00:00')
+        self.assertEqual(kwargs['ExpressionAttributeValues'][':to'], '2025-01-19T00:00:00+00:00')
+        
+    @patch('lambda_function.table')
+    def test_list_orders_multiple_statuses(self, mock_table):
+        """Test several statuses fan out to one StatusIndex query each and merge newest-first"""
+        # Arrange
+        def query(**kwargs):
+            status = kwargs['ExpressionAttributeValues'][':status']
+            created = {'pending': ['2025-01-18T12:00:00Z', '2025-01-18T09:00:00Z'], 'processing': ['2025-01-18T10:00:00Z']}
+            return {'Items': [
+                dict(self.sample_order, orderId=f'ORD-{status}-{index}', status=status, createdAt=created_at)
+                for index, created_at in enumerate(created[status])
+            ]}
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.query.side_effect = query
+        
+        # Act
+        result = list_orders({
+            'status': 'pending,processing', 'limit': '2',
+            'from': '2025-01-18T00:00:00Z', 'to': '2025-01-19T00:00:00Z'
+        })
+        
+        # Assert
+        body = json.loads(result['body'])
+        self.assertEqual([order['orderId'] for order in body['orders']], ['ORD-pending-0', 'ORD-processing-0'])
+        self.assertIsNotNone(body['nextToken'])
+        self.assertEqual(mock_table.meta.client.query.call_count, 2)
+        kwargs = mock_table.meta.client.query.call_args.kwargs
+        self.assertEqual(kwargs['IndexName'], 'StatusIndex')
+        self.assertIn('createdAt BETWEEN :from AND :to', kwargs['KeyConditionExpression'])
+        mock_table.query.assert_not_called()
+        
+    @patch('lambda_function.STATUS_SHARDS', 3)
+    @patch('status_shards.STATUS_SHARDS', 3)
+    @patch('lambda_function.table')
+    def test_list_orders_scatter_gathers_shards(self, mock_table):
+        """Test a sharded status is read from every shard of StatusShardIndex"""
+        # Arrange
+        def query(**kwargs):
+            shard = kwargs['ExpressionAttributeValues'][':status']
+            return {'Items': [dict(self.sample_order, orderId=f'ORD-{shard}', statusShard=shard,
+                                   createdAt=f'2025-01-18T1{shard[-1]}:00:00Z')]}
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.query.side_effect = query
+        
+        # Act
+        result = list_orders({'status': 'pending'})
+        
+        # Assert
+        body = json.loads(result['body'])
+        self.assertEqual([order['orderId'] for order in body['orders']], ['ORD-pending#2', 'ORD-pending#1', 'ORD-pending#0'])
+        kwargs = mock_table.meta.client.query.call_args.kwargs
+        self.assertEqual(kwargs['IndexName'], 'StatusShardIndex')
+        self.assertEqual(kwargs['ExpressionAttributeNames'], {'#status': 'statusShard'})
+        
+    @patch('status_shards.STATUS_SHARDS', 4)
+    @patch('lambda_function.table')
+    def test_sharded_status_key_written(self, mock_table):
+        """Test create and status updates keep statusShard on the order's shard"""
+        # Arrange
+        mock_table.update_item.return_value = {'Attributes': {}}
+        
+        # Act
+        order = json.loads(create_order({'customerName': 'Juan'})['body'])
+        update_order(order['orderId'], {'status': 'shipped', 'createdAt': order['createdAt']})
+        
+        # Assert
+        shard = order['statusShard'].split('#')[1]
+        self.assertTrue(order['statusShard'].startswith('pending#'))
+        values = mock_table.update_item.call_args.kwargs['ExpressionAttributeValues']
+        self.assertEqual(values[':status_shard'], f'shipped#{shard}')
+        
+    def test_list_orders_limits_statuses(self):
+        """Test the number of statuses in one request is capped"""
+        # Act
+        result = list_orders({'status': ','.join(f'status{n}' for n in range(20))})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 400)
+        
+    def test_list_orders_rejects_bad_range(self):
+        """Test invalid time windows are rejected with 400"""
+        for query_params in [{'to': '2025-01-18T00:00:00Z'}, {'from': 'yesterday'},
+                             {'from': '2020-01-01T00:00:00Z', 'to': '2025-01-18T00:00:00Z'},
+                             {'from': '2025-01-18T00:00:00Z', 'to': '2025-01-17T00:00:00Z'}]:
+            with self.subTest(query_params=query_params):
+                self.assertEqual(list_orders(query_params)['statusCode'], 400)
+
+    @patch('lambda_function.table')
+    def test_customer_key_written(self, mock_table):
+        """Test new orders carry the normalized email used by CustomerIndex"""
+        # Act
+        with_email = json.loads(create_order({'customerEmail': '  Juan@Example.COM '})['body'])
+        without_email = json.loads(create_order({'customerName': 'Juan'})['body'])
+
+        # Assert
+        self.assertEqual(with_email['customerEmailKey'], 'juan@example.com')
+        self.assertNotIn('customerEmailKey', without_email)
+
+    @patch('lambda_function.table')
+    def test_list_orders_by_customer(self, mock_table):
+        """Test a customer listing queries CustomerIndex, filters statuses and resumes from its cursor"""
+        # Arrange
+        last_key = {'orderId': 'ORD-12345678', 'createdAt': '2025-01-18T10:30:00Z', 'customerEmailKey': 'juan@example.com'}
+        mock_table.query.return_value = {'Items': [self.sample_order], 'LastEvaluatedKey': last_key}
+        query_params = {'customerEmail': 'Juan@Example.com', 'status': 'pending,shipped', 'limit': '1'}
+
+        # Act
+        first = json.loads(list_orders(query_params)['body'])
+        resumed = list_orders(dict(query_params, nextToken=first['nextToken']))
+        other_customer = list_orders({'customerEmail': 'ana@example.com', 'nextToken': first['nextToken']})
+
+        # Assert
+        kwargs = mock_table.query.call_args.kwargs
+        self.assertEqual(kwargs['IndexName'], 'CustomerIndex')
+        self.assertEqual(kwargs['KeyConditionExpression'], '#customer = :customer')
+        self.assertEqual(kwargs['ExpressionAttributeValues'][':customer'], 'juan@example.com')
+        self.assertEqual(kwargs['FilterExpression'], '#status IN (:s0, :s1)')
+        self.assertFalse(kwargs['ScanIndexForward'])
+        self.assertEqual(kwargs['ExclusiveStartKey'], last_key)
+        self.assertEqual(resumed['statusCode'], 200)
+        self.assertEqual(other_customer['statusCode'], 400)
+
+    def test_list_orders_rejects_empty_customer(self):
+        """Test a blank customerEmail is rejected instead of scanning the table"""
+        self.assertEqual(list_orders({'customerEmail': '  '})['statusCode'], 400)
+
+    @patch('lambda_function.table')
+    def test_list_orders_with_fields(self, mock_table):
+        """Test fields= becomes an aliased ProjectionExpression on the status index"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [
+            {'orderId': 'ORD-12345678', 'status': 'pending', 'updatedAt': '2025-01-18T10:30:00Z'}
+        ]}
+        
+        # Act
+        result = list_orders({'status': 'pending', 'fields': 'customerName,amount,status'})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 200)
+        kwargs = mock_table.query.call_args.kwargs
+        self.assertEqual(kwargs['ProjectionExpression'], '#p0, #p1, #p2, #p3, #p4')
+        self.assertEqual(kwargs['ExpressionAttributeNames'], {
+            '#status': 'status', '#p0': 'orderId', '#p1': 'customerName', '#p2': 'amount', '#p3': 'status',
+            '#p4': 'updatedAt'
+        })
+        self.assertEqual(json.loads(result['body'])['orders'], [{'orderId': 'ORD-12345678', 'status': 'pending'}])
+        
+    @patch('lambda_function.table')
+    def test_get_order_with_fields_uses_cache(self, mock_table):
+        """Test a projected read of a cached order is trimmed in memory"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order]}
+        get_order('ORD-12345678')
+        
+        # Act
+        result = get_order('ORD-12345678', 'status')
+        
+        # Assert
+        self.assertEqual(json.loads(result['body']), {'orderId': 'ORD-12345678', 'status': 'pending'})
+        mock_table.query.assert_called_once()
+        
+    @patch('lambda_function.table')
+    def test_get_order_not_modified(self, mock_table):
+        """Test a matching If-None-Match is answered with an empty 304"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order]}
+        etag = get_order('ORD-12345678')['headers']['ETag']
+        
+        # Act
+        result = get_order('ORD-12345678', None, f'W/{etag}')
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 304)
+        self.assertEqual(result['body'], '')
+        self.assertEqual(result['headers']['ETag'], etag)
+        mock_table.query.assert_called_once()
+        
+    @patch('lambda_function.table')
+    def test_get_order_etag_changes_on_update(self, mock_table):
+        """Test the ETag follows updatedAt and the requested fields"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order]}
+        etag = get_order('ORD-12345678')['headers']['ETag']
+        order_cache.clear()
+        mock_table.query.return_value = {'Items': [dict(self.sample_order, updatedAt='2025-01-19T08:00:00Z')]}
+        
+        # Act
+        result = get_order('ORD-12345678', None, etag)
+        projected = get_order('ORD-12345678', 'status', result['headers']['ETag'])
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 200)
+        self.assertNotEqual(result['headers']['ETag'], etag)
+        self.assertEqual(projected['statusCode'], 200)
+        
+    @patch('lambda_function.table')
+    def test_list_orders_not_modified(self, mock_table):
+        """Test an unchanged list page is answered with 304 via the handler"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [dict(self.sample_order, updatedAt='2025-01-18T10:30:00Z')]}
+        event = {'httpMethod': 'GET', 'queryStringParameters': {'status': 'pending'}}
+        etag = lambda_handler(event, None)['headers']['ETag']
+        
+        # Act
+        unchanged = lambda_handler(dict(event, headers={'if-none-match': etag}), None)
+        mock_table.query.return_value = {'Items': [dict(self.sample_order, updatedAt='2025-01-19T08:00:00Z')]}
+        changed = lambda_handler(dict(event, headers={'If-None-Match': etag}), None)
+        
+        # Assert
+        self.assertEqual(unchanged['statusCode'], 304)
+        self.assertEqual(unchanged['body'], '')
+        self.assertEqual(changed['statusCode'], 200)
+        self.assertNotEqual(changed['headers']['ETag'], etag)
+        
+    def test_invalid_fields_rejected(self):
+        """Test malformed field names are rejected with 400"""
+        # Act
+        result = list_orders({'fields': 'status,items[0]'})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 400)
+        
+    @patch('lambda_function.stats_table')
+    def test_get_order_stats(self, mock_stats_table):
+        """Test /orders/stats reads the counter items instead of scanning orders"""
+        # Arrange
+        mock_stats_table.query.side_effect = [
+            {'Items': [
+                {'statType': 'status', 'statKey': 'pending', 'orderCount': Decimal('3'), 'revenue': Decimal('300.5')},
+                {'statType': 'status', 'statKey': 'completed', 'orderCount': Decimal('1'), 'revenue': Decimal('99.5')}
+            ]},
+            {'Items': [{'statType': 'day', 'statKey': '2025-01-18', 'orderCount': Decimal('4'), 'revenue': Decimal('400')}]}
+        ]
+        event = {
+            'httpMethod': 'GET',
+            'resource': '/orders/stats',
+            'queryStringParameters': {'from': '2025-01-18T00:00:00Z', 'to': '2025-01-19T00:00:00Z'}
+        }
+        
+        # Act
+        result = lambda_handler(event, None)
+        
+        # Assert
+        body = json.loads(result['body'])
+        self.assertEqual(body['byStatus']['pending'], {'count': 3, 'revenue': 300.5})
+        self.assertEqual(body['total'], {'count': 4, 'revenue': 400})
+        self.assertEqual(body['byDay'], [{'day': '2025-01-18', 'count': 4, 'revenue': 400}])
+        day_query = mock_stats_table.query.call_args.kwargs
+        self.assertEqual(day_query['ExpressionAttributeValues'][':from'], '2025-01-18')
+        self.assertEqual(day_query['ExpressionAttributeValues'][':to'], '2025-01-19')
+        
     @patch('lambda_function.table')
     def test_update_order_success(self, mock_table):
         """Test successful order update"""
@@ -132,5 +613,172 @@ class TestOrdersCRUD(unittest.TestCase):
         response_body = json.loads(result['body'])
         self.assertEqual(response_body['error'], 'Order not found')
 
+    @patch('lambda_function.table')
+    def test_delete_order_with_out_of_range_id(self, mock_table):
+        """Test an ID-shaped value with an impossible timestamp is a 404, not a 500"""
+        # Arrange
+        mock_table.query.return_value = {'Items': []}
+
+        # Act
+        result = delete_order('ORD-ZZZZZZZZZZ0000000000000000')
+
+        # Assert
+        self.assertEqual(result['statusCode'], 404)
+
+    @patch('lambda_function.table')
+    def test_delete_order_without_read(self, mock_table):
+        """Test deleting an order with a time-encoded ID is a single conditional call"""
+        # Arrange
+        order = create_order({'customerName': 'Ana'})
+        order_id = json.loads(order['body'])['orderId']
+        created_at = json.loads(order['body'])['createdAt']
+        
+        # Act
+        result = delete_order(order_id)
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 200)
+        mock_table.query.assert_not_called()
+        mock_table.delete_item.assert_called_once_with(
+            Key={'orderId': order_id, 'createdAt': created_at},
+            ConditionExpression='attribute_exists(orderId)'
+        )
+        
+    @patch('lambda_function.table')
+    def test_update_order_missing_returns_404(self, mock_table):
+        """Test a failed existence condition on update maps to 404"""
+        # Arrange
+        order_id = json.loads(create_order({'customerName': 'Ana'})['body'])['orderId']
+        mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+            'UpdateItem'
+        )
+        
+        # Act
+        result = update_order(order_id, {'status': 'completed'})
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 404)
+        mock_table.query.assert_not_called()
+
+    @patch('lambda_function.table')
+    def test_lambda_handler_throttling_returns_429(self, mock_table):
+        """Test DynamoDB throttling that outlasted the retries maps to 429 with Retry-After"""
+        # Arrange
+        mock_table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Throughput exceeded'},
+             'ResponseMetadata': {'HTTPStatusCode': 400}},
+            'PutItem'
+        )
+        event = {'httpMethod': 'POST', 'body': json.dumps({'customerName': 'Ana'})}
+
+        # Act
+        result = lambda_handler(event, None)
+
+        # Assert
+        self.assertEqual(result['statusCode'], 429)
+        self.assertIn('Retry-After', result['headers'])
+
+    @patch('lambda_function.table')
+    def test_throttled_batch_get_returns_429(self, mock_table):
+        """Test a throttled GET /orders?ids= is a 429, not a page of notFound IDs"""
+        # Arrange
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.query.return_value = {
+            'Items': [{'orderId': 'ORD-00000001', 'createdAt': '2025-01-18T10:30:00Z'}]
+        }
+        mock_table.meta.client.batch_get_item.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Throughput exceeded'},
+             'ResponseMetadata': {'HTTPStatusCode': 400}},
+            'BatchGetItem'
+        )
+        event = {'httpMethod': 'GET', 'queryStringParameters': {'ids': 'ORD-00000001'}}
+
+        # Act
+        result = lambda_handler(event, None)
+
+        # Assert
+        self.assertEqual(result['statusCode'], 429)
+
+    @patch('batch_get.time.sleep')
+    @patch('lambda_function.table')
+    def test_get_orders_batch_reports_unprocessed_ids(self, mock_table, mock_sleep):
+        """Test IDs DynamoDB left unprocessed are reported apart from missing ones"""
+        # Arrange
+        mock_table.name = 'test-orders'
+        mock_table.meta.client.query.side_effect = lambda **kwargs: {
+            'Items': [{'orderId': kwargs['ExpressionAttributeValues'][':order_id'], 'createdAt': '2025-01-18T10:30:00Z'}]
+        }
+        mock_table.meta.client.batch_get_item.return_value = {
+            'Responses': {'test-orders': [{**self.sample_order, 'orderId': 'ORD-00000001'}]},
+            'UnprocessedKeys': {'test-orders': {'Keys': [{'orderId': 'ORD-00000002', 'createdAt': '2025-01-18T10:30:00Z'}]}}
+        }
+
+        # Act
+        result = get_orders_batch('ORD-00000001,ORD-00000002')
+
+        # Assert
+        response_body = json.loads(result['body'])
+        self.assertEqual([order['orderId'] for order in response_body['orders']], ['ORD-00000001'])
+        self.assertEqual(response_body['unprocessed'], ['ORD-00000002'])
+        self.assertEqual(response_body['notFound'], [])
+
+    @patch('lambda_function.table')
+    def test_lambda_handler_compresses_large_lists(self, mock_table):
+        """Test list responses are gzipped when the client accepts it"""
+        # Arrange
+        mock_table.query.return_value = {'Items': [self.sample_order] * 50}
+        event = {
+            'httpMethod': 'GET',
+            'headers': {'accept-encoding': 'gzip'},
+            'queryStringParameters': {'status': 'pending'}
+        }
+        
+        # Act
+        result = lambda_handler(event, {})
+        
+        # Assert
+        self.assertTrue(result['isBase64Encoded'])
+        response_body = json.loads(gzip.decompress(base64.b64decode(result['body'])))
+        self.assertEqual(response_body['count'], 50)
+        
+    @patch('lambda_function.idempotent_call')
+    @patch('lambda_function.create_order')
+    def test_lambda_handler_idempotent_create(self, mock_create_order, mock_idempotent_call):
+        """Test POST with Idempotency-Key goes through the idempotency store, scoped per caller"""
+        # Arrange
+        mock_idempotent_call.side_effect = lambda table, key, fingerprint, operation: operation()
+        mock_create_order.return_value = {'statusCode': 201, 'headers': {}, 'body': '{}'}
+        event = {
+            'httpMethod': 'POST',
+            'resource': '/orders',
+            'headers': {'idempotency-key': 'retry-1'},
+            'requestContext': {'authorizer': {'principalId': 'user-1'}},
+            'body': '{"customerName": "Juan"}'
+        }
+        
+        # Act
+        result = lambda_handler(event, None)
+        invalid = lambda_handler(dict(event, headers={'Idempotency-Key': 'not valid'}), None)
+        
+        # Assert
+        self.assertEqual(result['statusCode'], 201)
+        self.assertEqual(mock_idempotent_call.call_args.args[1], 'user-1#/orders#retry-1')
+        mock_create_order.assert_called_once_with({'customerName': 'Juan'})
+        self.assertEqual(invalid['statusCode'], 400)
+        
+    @patch('lambda_function.create_order')
+    def test_lambda_handler_decodes_base64_body(self, mock_create_order):
+        """Test base64 encoded request bodies are decoded before parsing"""
+        # Arrange
+        mock_create_order.return_value = {'statusCode': 201, 'body': '{}'}
+        body = base64.b64encode(json.dumps({'customerName': 'Ana'}).encode('utf-8')).decode('ascii')
+        
+        # Act
+        lambda_handler({'httpMethod': 'POST', 'body': body, 'isBase64Encoded': True}, {})
+        
+        # Assert
+        mock_create_order.assert_called_once_with({'customerName': 'Ana'})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
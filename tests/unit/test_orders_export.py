@@ -0,0 +1,98 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import Mock, patch
+import gzip
+import hashlib
+import json
+import sys
+import os
+import boto3
+from moto import mock_s3
+
+# Add lambda and layer directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+import orders_export
+from orders_export import gzip_parts, run_export, target_read_rate
+from table_fixtures import make_segmented_table
+
+@mock_s3
+@patch('moto.s3.models.S3_UPLOAD_PART_MIN_SIZE', 1)
+@patch('orders_export.EXPORT_PART_BYTES', 16 * 1024)
+@patch('orders_export.EXPORT_SEGMENTS', 3)
+class TestOrdersExport(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a bucket and a fake orders table"""
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.s3.create_bucket(Bucket=orders_export.S3_BUCKET)
+        orders_export.s3 = self.s3
+        # Incompressible notes so the compressor emits data well before the end
+        self.order_ids = [f'ORD-{i:08d}' for i in range(600)]
+        self.table = make_segmented_table([
+            {'orderId': order_id, 'createdAt': '2025-01-18T10:30:00Z', 'amount': Decimal('10.5'),
+             'notes': hashlib.sha512(order_id.encode()).hexdigest()}
+            for order_id in self.order_ids
+        ], page_size=50)
+        self.table.meta.client.describe_table.return_value = {'Table': {}}
+
+    def read_export(self, export_id):
+        body = self.s3.get_object(Bucket=orders_export.S3_BUCKET, Key=f'exports/{export_id}/orders.ndjson.gz')['Body'].read()
+        return [json.loads(line) for line in gzip.decompress(body).decode('utf-8').splitlines()]
+
+    def test_gzip_parts_are_complete_members(self):
+        """Test each part decompresses on its own and progress follows the pages"""
+        pages = [('0', [{'orderId': 'A', 'amount': Decimal('1')}], {'orderId': 'A'}), ('0', [], None)]
+
+        parts = list(gzip_parts(pages, part_bytes=1))
+
+        self.assertEqual(len(parts), 2)
+        self.assertEqual(json.loads(gzip.decompress(parts[0][0])), {'orderId': 'A', 'amount': 1})
+        self.assertEqual([part[1] for part in parts], [[('0', {'orderId': 'A'})], [('0', None)]])
+
+    def test_export_writes_every_order(self):
+        """Test a full export is one gzip'd NDJSON object with every order once"""
+        with patch('orders_export.table', self.table):
+            summary = run_export('2025-01-18')
+
+        self.assertEqual(summary['status'], 'complete')
+        self.assertGreater(summary['parts'], 1)
+        orders = self.read_export('2025-01-18')
+        self.assertEqual(sorted(order['orderId'] for order in orders), self.order_ids)
+        self.assertEqual(orders[0]['amount'], 10.5)
+
+    def test_scan_is_paced_to_a_share_of_read_capacity(self):
+        """Test the export budget defaults to a fraction of the table's RCUs, or of the on-demand reference"""
+        with patch('orders_export.table', self.table):
+            on_demand = target_read_rate()
+            self.table.meta.client.describe_table.return_value = {
+                'Table': {'ProvisionedThroughput': {'ReadCapacityUnits': 400}}
+            }
+            provisioned = target_read_rate()
+            with patch('orders_export.EXPORT_READ_CAPACITY', 50.0):
+                explicit = target_read_rate()
+
+        self.assertEqual(on_demand, 250.0)
+        self.assertEqual(provisioned, 100.0)
+        self.assertEqual(explicit, 50.0)
+
+    @patch('orders_export.lambda_client')
+    def test_export_resumes_from_checkpoint(self, mock_lambda_client):
+        """Test a paused export hands over and the next invocation finishes it exactly"""
+        context = Mock(invoked_function_arn='arn:aws:lambda:us-east-1:123456789012:function:export')
+        context.get_remaining_time_in_millis.return_value = 0
+
+        with patch('orders_export.table', self.table):
+            paused = run_export('2025-01-19', context)
+            finished = run_export('2025-01-19')
+
+        self.assertEqual(paused['status'], 'running')
+        self.assertEqual(paused['parts'], 1)
+        self.assertEqual(json.loads(mock_lambda_client.invoke.call_args.kwargs['Payload']), {'exportId': '2025-01-19'})
+        self.assertEqual(finished['status'], 'complete')
+        self.assertEqual(finished['orders'], len(self.order_ids))
+        self.assertEqual(sorted(order['orderId'] for order in self.read_export('2025-01-19')), self.order_ids)
+
+if __name__ == '__main__':
+    unittest.main()
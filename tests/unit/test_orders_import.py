@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+import gzip
+import json
+import sys
+import os
+import boto3
+from moto import mock_dynamodb, mock_s3
+
+# Add lambda and layer directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+import orders_import
+from orders_import import lambda_handler
+from table_fixtures import create_orders_table
+
+@mock_s3
+@mock_dynamodb
+@patch('orders_import.IMPORT_WRITE_CAPACITY', 10000)
+class TestOrdersImport(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a bucket and an orders table"""
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.s3.create_bucket(Bucket='test-bucket')
+        self.table = create_orders_table()
+        orders_import.s3 = self.s3
+        patcher = patch('orders_import.table', self.table)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_import(self, key, body):
+        self.s3.put_object(Bucket='test-bucket', Key=key, Body=body)
+        event = {'Records': [{'s3': {'bucket': {'name': 'test-bucket'}, 'object': {'key': key}}}]}
+        return lambda_handler(event, None)['imports'][0]
+
+    def read_report(self, key):
+        body = self.s3.get_object(Bucket='test-bucket', Key=key)['Body'].read().decode('utf-8')
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_ndjson_import_with_error_report(self):
+        """Test valid lines are imported and rejected lines land in the error report"""
+        lines = [
+            json.dumps({'customerName': 'Juan', 'items': ['Laptop'], 'amount': 299.99}),
+            '{not json',
+            '',
+            json.dumps({'customerName': 'Ana', 'amount': 'lots'}),
+            json.dumps({'customerName': 'Luis', 'amount': 10, 'createdAt': '2024-03-01T12:00:00Z'})
+        ]
+
+        result = self.run_import('imports/legacy.ndjson', '\n'.join(lines).encode('utf-8'))
+
+        self.assertEqual((result['imported'], result['rejected'], result['failed']), (2, 2, 0))
+        self.assertEqual([row['line'] for row in self.read_report(result['errorReport'])], [2, 4])
+        orders = self.table.scan()['Items']
+        self.assertEqual(sorted(order['customerName'] for order in orders), ['Juan', 'Luis'])
+        self.assertEqual(min(order['createdAt'] for order in orders)[:10], '2024-03-01')
+        self.assertTrue(all(order['status'] == 'pending' for order in orders))
+
+    def test_gzipped_csv_import(self):
+        """Test gzip'd CSV rows are normalized like create_order input"""
+        rows = 'customerName,customerEmail,items,amount\nJuan,juan@example.com,Laptop|Mouse,299.99\n'
+
+        result = self.run_import('imports/legacy.csv.gz', gzip.compress(rows.encode('utf-8')))
+
+        self.assertEqual(result['imported'], 1)
+        self.assertIsNone(result['errorReport'])
+        order = self.table.scan()['Items'][0]
+        self.assertEqual(order['items'], ['Laptop', 'Mouse'])
+        self.assertEqual(str(order['amount']), '299.99')
+
+    def test_source_status_and_updated_at_are_kept(self):
+        """Test a valid source status/updatedAt is imported as is and invalid ones are rejected"""
+        lines = [
+            json.dumps({'customerName': 'Juan', 'amount': 10, 'status': 'completed',
+                        'createdAt': '2024-03-01T12:00:00Z', 'updatedAt': '2024-03-05T09:00:00Z'}),
+            json.dumps({'customerName': 'Ana', 'amount': 10, 'status': 'pending#1'}),
+            json.dumps({'customerName': 'Luis', 'amount': 10,
+                        'createdAt': '2024-03-01T12:00:00Z', 'updatedAt': '2024-02-01T12:00:00Z'})
+        ]
+
+        result = self.run_import('imports/legacy.ndjson', '\n'.join(lines).encode('utf-8'))
+
+        self.assertEqual((result['imported'], result['rejected']), (1, 2))
+        order = self.table.scan()['Items'][0]
+        self.assertEqual(order['status'], 'completed')
+        self.assertEqual(order['updatedAt'], '2024-03-05T09:00:00+00:00')
+        self.assertEqual(order['source'], 'import')
+
+    @patch('orders_import.IMPORT_CHUNK_SIZE', 2)
+    @patch('orders_import.batch_put_items')
+    def test_unwritten_orders_are_reported(self, mock_batch_put):
+        """Test orders left unprocessed after retries are reported as failed"""
+        mock_batch_put.side_effect = lambda table, items, **kwargs: items[:1]
+        lines = [json.dumps({'customerName': f'Customer {n}', 'amount': n}) for n in range(3)]
+
+        result = self.run_import('imports/legacy.ndjson', '\n'.join(lines).encode('utf-8'))
+
+        self.assertEqual((result['imported'], result['failed']), (1, 2))
+        self.assertEqual(mock_batch_put.call_count, 2)
+        self.assertIsNotNone(mock_batch_put.call_args.kwargs['capacity_budget'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add lambda directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+
+from pagination import (
+    InvalidCursorError, MAX_PAGE_SIZE, collect_page, decode_cursor, encode_cursor, parse_page_size
+)
+
+class TestPagination(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.last_key = {'orderId': 'ORD-12345678', 'createdAt': '2025-01-18T10:30:00Z'}
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes back to the original key"""
+        token = encode_cursor(self.last_key, 'scan')
+
+        self.assertEqual(decode_cursor(token, 'scan'), self.last_key)
+
+    def test_cursor_rejects_tampering(self):
+        """Test a modified cursor is rejected"""
+        token = encode_cursor(self.last_key, 'scan')
+        tampered = token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB')
+
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor(tampered, 'scan')
+
+    def test_cursor_rejects_other_scope(self):
+        """Test a cursor issued for one query cannot be used for another"""
+        token = encode_cursor(self.last_key, 'status:pending')
+
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor(token, 'status:completed')
+
+    def test_cursors_fail_closed_without_secret(self):
+        """Test cursors are neither issued nor accepted when CURSOR_SECRET is not set"""
+        token = encode_cursor(self.last_key, 'scan')
+
+        with patch('pagination.CURSOR_SECRET', b''):
+            with self.assertRaises(RuntimeError):
+                encode_cursor(self.last_key, 'scan')
+            with self.assertRaises(RuntimeError):
+                decode_cursor(token, 'scan')
+
+    def test_cursor_signature_may_contain_separator(self):
+        """Test keys round-trip whatever bytes their signature contains"""
+        for n in range(200):
+            key = {'orderId': f'ORD-{n:08d}', 'createdAt': '2025-01-18T10:30:00Z'}
+            self.assertEqual(decode_cursor(encode_cursor(key, 'scan'), 'scan'), key)
+
+    def test_no_cursor_when_exhausted(self):
+        """Test no token is emitted without a LastEvaluatedKey"""
+        self.assertIsNone(encode_cursor(None, 'scan'))
+        self.assertIsNone(decode_cursor(None, 'scan'))
+
+    def test_parse_page_size_is_capped(self):
+        """Test page size is clamped to the server-side cap"""
+        self.assertEqual(parse_page_size('100000'), MAX_PAGE_SIZE)
+        self.assertEqual(parse_page_size('0'), 1)
+        with self.assertRaises(ValueError):
+            parse_page_size('abc')
+
+    def test_collect_page_fills_short_pages(self):
+        """Test short DynamoDB pages are topped up until the page is full"""
+        # Arrange
+        calls = []
+        pages = [
+            {'Items': [{'n': 1}], 'LastEvaluatedKey': {'k': 1}},
+            {'Items': [{'n': 2}, {'n': 3}], 'LastEvaluatedKey': {'k': 3}},
+        ]
+
+        def fetch_page(limit, start_key):
+            calls.append((limit, start_key))
+            return pages[len(calls) - 1]
+
+        # Act
+        items, last_key = collect_page(fetch_page, 3)
+
+        # Assert
+        self.assertEqual(len(items), 3)
+        self.assertEqual(last_key, {'k': 3})
+        self.assertEqual(calls, [(3, None), (2, {'k': 1})])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add lambda directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+
+from parallel_scan import CapacityBudget, new_scan_state, parallel_scan, scan_all, scan_page
+from table_fixtures import make_segmented_table
+
+class TestParallelScan(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a fake table with a few dozen orders"""
+        self.order_ids = [f'ORD-{i:08d}' for i in range(40)]
+        self.table = make_segmented_table([
+            {'orderId': order_id, 'createdAt': '2025-01-18T10:30:00Z'} for order_id in self.order_ids
+        ])
+
+    def test_scan_all_reads_every_item(self):
+        """Test every item is returned exactly once across segments"""
+        items = scan_all(self.table, total_segments=4, max_workers=2)
+
+        self.assertEqual(sorted(item['orderId'] for item in items), self.order_ids)
+
+    def test_parallel_scan_can_stop_early(self):
+        """Test closing the stream early stops the workers"""
+        stream = parallel_scan(self.table, total_segments=4)
+        first = next(stream)
+        stream.close()
+
+        self.assertIn('orderId', first)
+
+    def test_scan_page_resumes_exactly(self):
+        """Test paging with segment state visits every item once"""
+        state = new_scan_state(3)
+        seen = []
+
+        while state:
+            items, state = scan_page(self.table, 7, state, 3)
+            self.assertLessEqual(len(items), 7)
+            seen.extend(item['orderId'] for item in items)
+
+        self.assertEqual(sorted(seen), self.order_ids)
+
+    def test_parallel_scan_requests_consumed_capacity_with_budget(self):
+        """Test a capacity budget asks DynamoDB to report consumed capacity"""
+        scan_all(self.table, total_segments=2, read_capacity_budget=100)
+
+        for call in self.table.meta.client.scan.call_args_list:
+            self.assertEqual(call.kwargs['ReturnConsumedCapacity'], 'TOTAL')
+
+    def test_capacity_budget_throttles(self):
+        """Test consuming beyond the budget makes the worker wait"""
+        budget = CapacityBudget(1000)
+        budget.consume(1000)
+
+        with patch('parallel_scan.time.sleep') as mock_sleep:
+            budget.consume(100)
+
+        mock_sleep.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
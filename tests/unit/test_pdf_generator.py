@@ -6,6 +6,7 @@ import os
 
 # Add lambda directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/pdf_generator'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
 
 from lambda_function import lambda_handler, get_order_data, generate_pdf_content
 
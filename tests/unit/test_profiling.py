@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import Mock, patch
+import json
+import marshal
+import sys
+import os
+
+import boto3
+from moto import mock_s3
+
+# Add layer directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from orders_common import profiling
+from orders_common.profiling import profile_invocations
+
+def allocate_orders(event, context):
+    """Stand-in handler with some CPU work and allocations to profile"""
+    orders = [{'orderId': f'ORD-{i}', 'items': ['Laptop'] * 5} for i in range(2000)]
+    return {'statusCode': 200, 'body': json.dumps(orders[:10])}
+
+def logged_profiles(mock_print):
+    return [
+        json.loads(call.args[0])['profile'] for call in mock_print.call_args_list
+        if call.args and str(call.args[0]).startswith('{"profile"')
+    ]
+
+class TestProfiling(unittest.TestCase):
+
+    def test_disabled_profiling_returns_the_handler_itself(self):
+        """Test there is no wrapper at all when PROFILE_ONE_IN is 0"""
+        with patch('orders_common.profiling.PROFILE_ONE_IN', 0):
+            self.assertIs(profile_invocations(allocate_orders), allocate_orders)
+
+    @patch('builtins.print')
+    def test_one_in_n_invocations_are_profiled(self, mock_print):
+        """Test only sampled invocations are profiled, and every response is unchanged"""
+        # Arrange
+        with patch('orders_common.profiling.PROFILE_ONE_IN', 4):
+            handler = profile_invocations(allocate_orders)
+
+        # Act: random() * 4 < 1 only for the first draw
+        with patch('orders_common.profiling.random.random', side_effect=[0.1, 0.5, 0.9]):
+            responses = [handler({}, Mock(aws_request_id=f'req-{i}')) for i in range(3)]
+
+        # Assert
+        self.assertTrue(all(response['statusCode'] == 200 for response in responses))
+        profile, = logged_profiles(mock_print)
+        self.assertEqual(profile['requestId'], 'req-0')
+        self.assertTrue(any('allocate_orders' in entry['function'] for entry in profile['cpu']))
+        self.assertTrue(any('test_profiling.py' in entry['line'] for entry in profile['allocations']))
+        self.assertGreater(profile['peakKb'], 0)
+        self.assertNotIn('pstats', profile)
+
+    @mock_s3
+    @patch('builtins.print')
+    def test_profiles_are_uploaded_when_a_bucket_is_set(self, mock_print):
+        """Test the pstats and folded allocation stacks are written to S3"""
+        # Arrange
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        settings = {'PROFILE_ONE_IN': 1, 'PROFILE_BUCKET': 'test-bucket', 's3': s3}
+        with patch.multiple('orders_common.profiling', **settings):
+            handler = profile_invocations(allocate_orders)
+
+            # Act
+            handler({}, Mock(aws_request_id='req-1'))
+
+        # Assert
+        profile, = logged_profiles(mock_print)
+        keys = [obj['Key'] for obj in s3.list_objects_v2(Bucket='test-bucket')['Contents']]
+        self.assertEqual(len(keys), 2)
+        self.assertTrue(all(key.startswith('profiles/local/') for key in keys))
+        pstats_key = next(key for key in keys if key.endswith('req-1.pstats'))
+        self.assertEqual(profile['pstats'], f's3://test-bucket/{pstats_key}')
+        stats = marshal.loads(s3.get_object(Bucket='test-bucket', Key=pstats_key)['Body'].read())
+        self.assertTrue(any(name == 'allocate_orders' for (_, _, name) in stats))
+        folded = s3.get_object(Bucket='test-bucket', Key=pstats_key.replace('.pstats', '.alloc.folded'))
+        first_line = folded['Body'].read().decode('utf-8').splitlines()[0]
+        stack, size = first_line.rsplit(' ', 1)
+        self.assertIn(';', stack)
+        self.assertGreater(int(size), 0)
+
+    @patch('builtins.print')
+    def test_profile_errors_never_fail_the_invocation(self, mock_print):
+        """Test a failed upload is logged and the handler's response still returned"""
+        failing_s3 = Mock()
+        failing_s3.put_object.side_effect = RuntimeError('access denied')
+        settings = {'PROFILE_ONE_IN': 1, 'PROFILE_BUCKET': 'test-bucket', 's3': failing_s3}
+        with patch.multiple('orders_common.profiling', **settings):
+            response = profile_invocations(allocate_orders)({}, None)
+
+        self.assertEqual(response['statusCode'], 200)
+        mock_print.assert_any_call('Error writing profile: access denied')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from decimal import Decimal
+import base64
+import gzip
+import json
+import sys
+import os
+
+# Add layer directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+from orders_common import responses
+from orders_common.responses import (
+    JSON_HEADERS, compress_response, error_response, etag_matches, json_response, make_etag, negotiate_encoding,
+    not_modified_response
+)
+
+class TestResponses(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.order = {
+            'orderId': 'ORD-12345678',
+            'customerName': 'Juan Pérez',
+            'items': ['Laptop', 'Mouse'],
+            'amount': Decimal('299.99'),
+            'quantity': Decimal('2'),
+            'tags': {'vip'}
+        }
+
+    def test_decimals_are_numbers(self):
+        """Test DynamoDB Decimals are emitted as JSON numbers"""
+        body = json.loads(json_response(200, self.order)['body'])
+
+        self.assertEqual(body['amount'], 299.99)
+        self.assertIsInstance(body['quantity'], int)
+        self.assertEqual(body['tags'], ['vip'])
+        self.assertEqual(body['customerName'], 'Juan Pérez')
+
+    def test_large_integers_are_exact(self):
+        """Test integral Decimals beyond float precision and the 64-bit range are encoded exactly"""
+        value = {'big': Decimal('12345678901234567'), 'huge': Decimal('1' * 38), 'exponent': Decimal('1E+2')}
+
+        self.assertEqual(responses.dumps(value), '{"big":12345678901234567,"huge":%s,"exponent":100}' % ('1' * 38))
+        self.assertEqual(responses._encoder.encode(value), responses.dumps(value))
+
+    def test_stdlib_encoder_matches(self):
+        """Test the stdlib fallback encodes the same document as the active backend"""
+        self.assertEqual(json.loads(responses._encoder.encode(self.order)), json.loads(responses.dumps(self.order)))
+
+    def test_headers_are_shared(self):
+        """Test plain responses reuse the shared header dict and extra headers do not mutate it"""
+        self.assertIs(json_response(200, {})['headers'], JSON_HEADERS)
+
+        response = json_response(200, {}, {'X-Cache': 'HIT'})
+
+        self.assertEqual(response['headers']['X-Cache'], 'HIT')
+        self.assertNotIn('X-Cache', JSON_HEADERS)
+
+    def test_error_response(self):
+        """Test error responses wrap the message"""
+        response = error_response(404, 'Order not found')
+
+        self.assertEqual(response['statusCode'], 404)
+        self.assertEqual(json.loads(response['body']), {'error': 'Order not found'})
+
+    def test_large_responses_are_gzipped(self):
+        """Test bodies over the threshold are gzipped and base64 encoded"""
+        response = json_response(200, {'orders': [self.order] * 50})
+
+        compressed = compress_response(response, 'gzip, deflate', min_bytes=1024)
+
+        self.assertTrue(compressed['isBase64Encoded'])
+        self.assertEqual(compressed['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(base64.b64decode(compressed['body'])).decode('utf-8'), response['body'])
+        self.assertNotIn('Content-Encoding', JSON_HEADERS)
+
+    def test_small_or_unaccepted_responses_are_untouched(self):
+        """Test compression is skipped below the threshold or without a supported encoding"""
+        response = json_response(200, {'orders': [self.order] * 50})
+
+        self.assertIs(compress_response(json_response(200, self.order), 'gzip', min_bytes=1024)['headers'], JSON_HEADERS)
+        self.assertIs(compress_response(response, None, min_bytes=1024), response)
+        self.assertIs(compress_response(response, 'gzip;q=0, identity', min_bytes=1024), response)
+
+    def test_negotiate_encoding(self):
+        """Test Accept-Encoding quality values are honoured"""
+        self.assertEqual(negotiate_encoding('GZIP'), 'gzip')
+        self.assertEqual(negotiate_encoding('*'), 'br' if responses.brotli else 'gzip')
+        self.assertIsNone(negotiate_encoding('deflate'))
+        self.assertIsNone(negotiate_encoding('*;q=0'))
+        self.assertEqual(negotiate_encoding('br;q=0.1, gzip;q=1'), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip; q=0.5, *;q=0.8'), 'br' if responses.brotli else 'gzip')
+
+    @unittest.skipIf(responses.brotli is None, 'brotli is not installed')
+    def test_large_responses_are_brotli_compressed(self):
+        """Test br is used when preferred by the client and round-trips the body"""
+        response = json_response(200, {'orders': [self.order] * 50})
+
+        compressed = compress_response(response, 'gzip;q=0.8, br', min_bytes=1024)
+
+        self.assertTrue(compressed['isBase64Encoded'])
+        self.assertEqual(compressed['headers']['Content-Encoding'], 'br')
+        self.assertEqual(compressed['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(responses.brotli.decompress(base64.b64decode(compressed['body'])).decode('utf-8'),
+                         response['body'])
+
+    def test_etag_matching(self):
+        """Test If-None-Match lists, weak validators and the * wildcard"""
+        etag = make_etag('ORD-12345678', '2025-01-18T10:30:00Z')
+
+        self.assertEqual(etag, make_etag('ORD-12345678', '2025-01-18T10:30:00Z'))
+        self.assertNotEqual(etag, make_etag('ORD-12345678', '2025-01-19T10:30:00Z'))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+    def test_not_modified_response_has_no_body(self):
+        """Test 304 responses carry the ETag and are never compressed"""
+        response = not_modified_response('"abc"')
+
+        self.assertEqual(response['statusCode'], 304)
+        self.assertEqual(response['headers']['ETag'], '"abc"')
+        self.assertIs(compress_response(response, 'gzip', min_bytes=0), response)
+
+if __name__ == '__main__':
+    unittest.main()
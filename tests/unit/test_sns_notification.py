@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+import importlib.util
+import sys
+import os
+
+# Add layer directory to path; the handler is loaded under its own name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/layers/common/python'))
+
+_spec = importlib.util.spec_from_file_location(
+    'sns_notification_function',
+    os.path.join(os.path.dirname(__file__), '../../lambda/sns_notification/lambda_function.py')
+)
+sns_notification = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sns_notification)
+
+def insert_record(**attributes):
+    """Build a DynamoDB Stream INSERT record of an order"""
+    image = {'orderId': {'S': 'ORD-12345678'}, 'customerName': {'S': 'Juan Pérez'},
+             'amount': {'N': '299.99'}, 'status': {'S': 'pending'}}
+    image.update({name: {'S': value} for name, value in attributes.items()})
+    return {'eventSource': 'aws:dynamodb', 'eventName': 'INSERT', 'dynamodb': {'NewImage': image}}
+
+class TestSNSNotification(unittest.TestCase):
+
+    @patch('builtins.print')
+    def test_new_orders_are_announced(self, mock_print):
+        """Test an order created through the API triggers a notification"""
+        with patch.object(sns_notification, 'send_order_created_notification') as mock_send:
+            result = sns_notification.lambda_handler({'Records': [insert_record()]}, None)
+
+        self.assertEqual(result['statusCode'], 200)
+        mock_send.assert_called_once()
+
+    @patch('builtins.print')
+    def test_imported_orders_are_not_announced(self, mock_print):
+        """Test bulk-imported orders do not send a "New order created" message each"""
+        with patch.object(sns_notification, 'send_order_created_notification') as mock_send:
+            result = sns_notification.lambda_handler({'Records': [insert_record(source='import')]}, None)
+
+        self.assertEqual(result['statusCode'], 200)
+        mock_send.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
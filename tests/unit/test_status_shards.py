@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+from moto import mock_dynamodb
+
+# Add lambda and scripts directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lambda/orders_crud'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../scripts'))
+
+from status_shards import order_shard, status_partitions, status_shard_key
+from backfill_status_shards import backfill
+from table_fixtures import create_orders_table
+
+class TestStatusShards(unittest.TestCase):
+
+    def test_shard_is_stable_across_statuses(self):
+        """Test an order keeps its shard when its status changes"""
+        pending = status_shard_key('ORD-01JHR7Z5Q6X0000000000000', 'pending', 8)
+        shipped = status_shard_key('ORD-01JHR7Z5Q6X0000000000000', 'shipped', 8)
+
+        self.assertEqual(pending.split('#')[1], shipped.split('#')[1])
+        self.assertTrue(pending.startswith('pending#'))
+
+    def test_orders_spread_over_shards(self):
+        """Test generated IDs land on every shard"""
+        shards = {order_shard(f'ORD-{n:026d}', 8) for n in range(200)}
+
+        self.assertEqual(shards, set(range(8)))
+
+    def test_partitions(self):
+        """Test listing covers every shard, or the plain status when unsharded"""
+        self.assertEqual(status_partitions('pending', 3), ['pending#0', 'pending#1', 'pending#2'])
+        self.assertEqual(status_partitions('pending', 1), ['pending'])
+
+    @mock_dynamodb
+    def test_backfill_tags_existing_orders(self):
+        """Test the backfill sets missing or stale shard keys and is idempotent"""
+        # Arrange
+        table = create_orders_table()
+        for n in range(5):
+            table.put_item(Item={'orderId': f'ORD-{n}', 'createdAt': f'2025-01-18T10:0{n}:00Z', 'status': 'pending'})
+        table.put_item(Item={'orderId': 'ORD-9', 'createdAt': '2025-01-18T11:00:00Z', 'status': 'shipped',
+                             'statusShard': status_shard_key('ORD-9', 'shipped', 4)})
+
+        # Act
+        first = backfill(table, 4, total_segments=1)
+        second = backfill(table, 4, total_segments=1)
+
+        # Assert
+        self.assertEqual(first, {'scanned': 6, 'updated': 5, 'unchanged': 1, 'conflicts': 0})
+        self.assertEqual(second['unchanged'], 6)
+        item = table.get_item(Key={'orderId': 'ORD-3', 'createdAt': '2025-01-18T10:03:00Z'})['Item']
+        self.assertEqual(item['statusShard'], status_shard_key('ORD-3', 'pending', 4))
+
+if __name__ == '__main__':
+    unittest.main()